@@ -2,12 +2,10 @@ import logging
 from datetime import datetime
 
 import hlt
-from bot.manager import Manager
-from bot.monitor import Monitor
-from bot.influence import Influence
+from bot.rampa import Rampa
 
 # This needs to be before the logger
-game = hlt.Game("Rampa")
+game = hlt.Game("Rampa", incremental=True)
 
 logging.info("Starting Rampa Bot")
 logger = logging.getLogger("bot")
@@ -15,56 +13,17 @@ logger = logging.getLogger("bot")
 # Will catch any exception easily
 try:
 
-    first_turn = True
+    bot = Rampa()
     while True:
         START_TIME = datetime.utcnow()
-        logger.debug("START NEW TURN")
         try:
             game_map = game.update_map()
         except ValueError:
             # ValueError means game is over
             break
 
-        # Reset the list of command
-        command_queue = []
-
-
-        # Create the drone manager only once
-        if first_turn:
-            Manager.init(game_map.get_me().id)
-            Monitor.init(game_map.get_me().id)
-            Influence.init(game_map.get_me().id)
-            Manager.update_game_map(game_map, START_TIME)
-            Monitor.initial_turn()
-            first_turn = False
-        else:
-            # Update the game_map in the manager
-            Manager.update_game_map(game_map, START_TIME)
-
-        # Calculate the distance between all ships once and for all
-        Manager.calculate_all_drones_distance()
-        # Check damaged ship
-        Manager.check_damaged_drone()
-        # Check defenders timer
-        # Manager.check_defender_timer()
-        # Give role to IDLE drone
-        Manager.give_role_idle_drone()
-
-        # Order conqueror to conquer
-        Manager.order_conquerors()
-        # Order attackers to attack
-        Manager.order_assassin()
-        # Order attackers to attack
-        Manager.order_attacker()
-        # Order squads
-        Manager.order_squad()
-        # Order defender to defend
-        Manager.order_defender()
-        # Order miner to mine
-        Manager.order_miner()
-
-        # Create all commands
-        command_queue = Manager.create_command_queue()
+        # Run the whole turn: managers update & orders
+        command_queue = bot.play_turn(game_map, START_TIME)
         # Send the command
         game.send_command_queue(command_queue)
 
@@ -77,5 +36,4 @@ try:
         #if Monitor.turn == 100:
         #    raise Exception("blah")
 except:
-    logging.exception("BIG CRASH")
-
+    logging.exception("BIG CRASH")
\ No newline at end of file
@@ -0,0 +1,529 @@
+from libc.math cimport sqrt, INFINITY
+from libc.stdlib cimport malloc, free
+import numpy as np
+
+from bot.settings import SHIP_INDEX_CELL
+from hlt.entity import Ship
+
+
+cdef class ShipIndex:
+    """
+    Uniform grid of ships, split by owner & docking status: the nearest ship matching the filters is found
+    ring of cells after ring of cells around the position, the ships of the other owners or docking status
+    are never looked at. Built once per turn (see DistanceMatrix).
+
+    :ivar nb_ships: The number of ships indexed
+    """
+    cdef readonly int nb_ships
+    cdef int nb_columns
+    cdef int nb_rows
+    cdef int nb_cells
+    cdef int nb_owners
+    cdef double cell_size
+    cdef double *x
+    cdef double *y
+    # The ships of every cell of every partition (owner * 2 + docked), as in ObstacleGrid
+    cdef int *cell_starts
+    cdef int *cell_items
+    # The number of ships of every partition
+    cdef int *partition_sizes
+
+    def __cinit__(self):
+        self.x = NULL
+        self.y = NULL
+        self.cell_starts = NULL
+        self.cell_items = NULL
+        self.partition_sizes = NULL
+
+    def __init__(self, x, y, owners, docked, double width, double height, double cell_size=SHIP_INDEX_CELL):
+        """
+        :param x: The x-coordinates of the ships
+        :param y: The y-coordinates of the ships
+        :param owners: The player ids of the ships
+        :param docked: Whether every ship is docked (docking & undocking included)
+        :param width: The width of the map
+        :param height: The height of the map
+        :param cell_size: The size of a cell
+        """
+        self.nb_ships = len(x)
+        self.cell_size = cell_size
+        self.nb_columns = max(<int> (width / cell_size) + 1, 1)
+        self.nb_rows = max(<int> (height / cell_size) + 1, 1)
+        self.nb_cells = self.nb_columns * self.nb_rows
+        self.nb_owners = int(owners.max()) + 1 if self.nb_ships > 0 else 0
+        cdef int nb_keys = self.nb_owners * 2 * self.nb_cells
+        self.x = <double *> malloc(max(self.nb_ships, 1) * sizeof(double))
+        self.y = <double *> malloc(max(self.nb_ships, 1) * sizeof(double))
+        self.cell_items = <int *> malloc(max(self.nb_ships, 1) * sizeof(int))
+        self.cell_starts = <int *> malloc((nb_keys + 1) * sizeof(int))
+        self.partition_sizes = <int *> malloc(max(self.nb_owners * 2, 1) * sizeof(int))
+
+        # Counting sort of the ships by partition & cell
+        cdef int *keys = <int *> malloc(max(self.nb_ships, 1) * sizeof(int))
+        cdef int *cursors = <int *> malloc((nb_keys + 1) * sizeof(int))
+        cdef int i, key, column, row
+        try:
+            for key in range(nb_keys + 1):
+                self.cell_starts[key] = 0
+            for key in range(self.nb_owners * 2):
+                self.partition_sizes[key] = 0
+            for i, (ship_x, ship_y, owner, is_docked) in enumerate(zip(x.tolist(), y.tolist(), owners.tolist(),
+                                                                      docked.tolist())):
+                self.x[i] = ship_x
+                self.y[i] = ship_y
+                column = min(max(<int> (ship_x / cell_size), 0), self.nb_columns - 1)
+                row = min(max(<int> (ship_y / cell_size), 0), self.nb_rows - 1)
+                key = (owner * 2 + is_docked) * self.nb_cells + row * self.nb_columns + column
+                keys[i] = key
+                self.cell_starts[key + 1] += 1
+                self.partition_sizes[owner * 2 + is_docked] += 1
+            for key in range(nb_keys):
+                self.cell_starts[key + 1] += self.cell_starts[key]
+                cursors[key] = self.cell_starts[key]
+            for i in range(self.nb_ships):
+                self.cell_items[cursors[keys[i]]] = i
+                cursors[keys[i]] += 1
+        finally:
+            free(keys)
+            free(cursors)
+
+    def __dealloc__(self):
+        free(self.x)
+        free(self.y)
+        free(self.cell_starts)
+        free(self.cell_items)
+        free(self.partition_sizes)
+
+    cdef inline void search_cell(self, int column, int row, double x, double y, int first_owner, int last_owner,
+                                 bint docked_only, double max_distance, double *best, int *best_index):
+        """
+        Keep the nearest ship of a cell, for the partitions of the filters
+        """
+        cdef int owner, docked, key, k, i
+        cdef double dx, dy, distance
+        if column < 0 or row < 0 or column >= self.nb_columns or row >= self.nb_rows:
+            return
+        for owner in range(first_owner, last_owner):
+            for docked in range(1 if docked_only else 0, 2):
+                key = (owner * 2 + docked) * self.nb_cells + row * self.nb_columns + column
+                for k in range(self.cell_starts[key], self.cell_starts[key + 1]):
+                    i = self.cell_items[k]
+                    dx = x - self.x[i]
+                    dy = y - self.y[i]
+                    distance = sqrt(dx * dx + dy * dy)
+                    if distance > max_distance:
+                        continue
+                    # The first ship on ties, as an argmin
+                    if distance < best[0] or (distance == best[0] and i < best_index[0]):
+                        best[0] = distance
+                        best_index[0] = i
+
+    cpdef tuple nearest(self, double x, double y, int player_id=-1, bint docked_only=False,
+                        double max_distance=INFINITY):
+        """
+        The nearest ship of a position
+
+        :param x: The x-coordinate of the position
+        :param y: The y-coordinate of the position
+        :param player_id: Only look at the ships of this player, -1 for every player
+        :param docked_only: Only look at the docked ships
+        :param max_distance: Only look at the ships closer than this
+        :return: The distance & the index of the ship, (None, None) if no ship matches
+        :rtype: (float, int)
+        """
+        cdef int first_owner = 0
+        cdef int last_owner = self.nb_owners
+        if player_id >= 0:
+            if player_id >= self.nb_owners:
+                return None, None
+            first_owner = player_id
+            last_owner = player_id + 1
+        # No ship matching the filters: no need to look at the cells
+        cdef int owner
+        cdef int nb_matching = 0
+        for owner in range(first_owner, last_owner):
+            nb_matching += self.partition_sizes[owner * 2 + 1]
+            if not docked_only:
+                nb_matching += self.partition_sizes[owner * 2]
+        if nb_matching == 0:
+            return None, None
+        cdef int column = min(max(<int> (x / self.cell_size), 0), self.nb_columns - 1)
+        cdef int row = min(max(<int> (y / self.cell_size), 0), self.nb_rows - 1)
+        cdef double best = INFINITY
+        cdef int best_index = -1
+        cdef int ring, d
+        # The last ring with cells inside the grid
+        cdef int last_ring = max(max(column, self.nb_columns - 1 - column), max(row, self.nb_rows - 1 - row))
+        for ring in range(last_ring + 1):
+            # The cells of this ring are at least (ring - 1) cells away
+            if ring > 0 and ((ring - 1) * self.cell_size >= best or (ring - 1) * self.cell_size > max_distance):
+                break
+            if ring == 0:
+                self.search_cell(column, row, x, y, first_owner, last_owner, docked_only, max_distance,
+                                 &best, &best_index)
+                continue
+            for d in range(-ring, ring + 1):
+                self.search_cell(column + d, row - ring, x, y, first_owner, last_owner, docked_only, max_distance,
+                                 &best, &best_index)
+                self.search_cell(column + d, row + ring, x, y, first_owner, last_owner, docked_only, max_distance,
+                                 &best, &best_index)
+            for d in range(-ring + 1, ring):
+                self.search_cell(column - ring, row + d, x, y, first_owner, last_owner, docked_only, max_distance,
+                                 &best, &best_index)
+                self.search_cell(column + ring, row + d, x, y, first_owner, last_owner, docked_only, max_distance,
+                                 &best, &best_index)
+        if best_index < 0:
+            return None, None
+        return best, best_index
+
+    cpdef list within(self, double x, double y, double radius, int player_id=-1, bint docked_only=False):
+        """
+        The ships around a position
+
+        :param x: The x-coordinate of the position
+        :param y: The y-coordinate of the position
+        :param radius: The max distance of the ships
+        :param player_id: Only look at the ships of this player, -1 for every player
+        :param docked_only: Only look at the docked ships
+        :return: The indices of the ships, by partition & cell
+        :rtype: list[int]
+        """
+        cdef list indices = []
+        cdef int first_owner = 0
+        cdef int last_owner = self.nb_owners
+        if player_id >= 0:
+            if player_id >= self.nb_owners:
+                return indices
+            first_owner = player_id
+            last_owner = player_id + 1
+        cdef int first_column = max(<int> ((x - radius) / self.cell_size), 0)
+        cdef int last_column = min(<int> ((x + radius) / self.cell_size), self.nb_columns - 1)
+        cdef int first_row = max(<int> ((y - radius) / self.cell_size), 0)
+        cdef int last_row = min(<int> ((y + radius) / self.cell_size), self.nb_rows - 1)
+        cdef int owner, docked, row, column, key, k, i
+        cdef double dx, dy
+        for owner in range(first_owner, last_owner):
+            for docked in range(1 if docked_only else 0, 2):
+                for row in range(first_row, last_row + 1):
+                    for column in range(first_column, last_column + 1):
+                        key = (owner * 2 + docked) * self.nb_cells + row * self.nb_columns + column
+                        for k in range(self.cell_starts[key], self.cell_starts[key + 1]):
+                            i = self.cell_items[k]
+                            dx = x - self.x[i]
+                            dy = y - self.y[i]
+                            if dx * dx + dy * dy <= radius * radius:
+                                indices.append(i)
+        return indices
+
+    cpdef list groups(self, double distance):
+        """
+        Group the ships closer than distance to each other, or linked by a chain of such ships, whatever their
+        owner & docking status: a union-find of the ships, every ship only compared with the ships of the cells
+        within distance
+
+        :param distance: The distance under which 2 ships are in the same group
+        :return: The group of every ship: the index of the smallest ship of its group
+        :rtype: list[int]
+        """
+        cdef int *parents = <int *> malloc(max(self.nb_ships, 1) * sizeof(int))
+        cdef int reach = <int> (distance / self.cell_size) + 1
+        cdef int nb_partitions = self.nb_owners * 2
+        cdef int i, j, k, partition, key, column, row, other_column, other_row, root_i, root_j
+        cdef double dx, dy
+        cdef list result
+        try:
+            for i in range(self.nb_ships):
+                parents[i] = i
+            for i in range(self.nb_ships):
+                column = min(max(<int> (self.x[i] / self.cell_size), 0), self.nb_columns - 1)
+                row = min(max(<int> (self.y[i] / self.cell_size), 0), self.nb_rows - 1)
+                for other_row in range(max(row - reach, 0), min(row + reach, self.nb_rows - 1) + 1):
+                    for other_column in range(max(column - reach, 0), min(column + reach, self.nb_columns - 1) + 1):
+                        for partition in range(nb_partitions):
+                            key = partition * self.nb_cells + other_row * self.nb_columns + other_column
+                            for k in range(self.cell_starts[key], self.cell_starts[key + 1]):
+                                j = self.cell_items[k]
+                                if j <= i:
+                                    continue
+                                dx = self.x[i] - self.x[j]
+                                dy = self.y[i] - self.y[j]
+                                if dx * dx + dy * dy >= distance * distance:
+                                    continue
+                                root_i = find_root(parents, i)
+                                root_j = find_root(parents, j)
+                                # The smallest index is the root
+                                if root_i < root_j:
+                                    parents[root_j] = root_i
+                                elif root_j < root_i:
+                                    parents[root_i] = root_j
+            result = [find_root(parents, i) for i in range(self.nb_ships)]
+        finally:
+            free(parents)
+        return result
+
+
+cdef inline int find_root(int *parents, int i):
+    """
+    The root of a ship in the union-find of ShipIndex.groups, halving the path on the way
+    """
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+class DistanceMatrix(object):
+    """
+    The distances between my drones & every enemy ship and planet, instead of a sorted list per drone.
+    The nearest ship queries (with their owner & docking filters) go through a ShipIndex of the enemy ships,
+    the distances from a drone to all the ships or planets are only computed, in a single numpy row,
+    the first time the drone needs them (furthest ship, sorted lists, threat scores, planets).
+
+    The matrix is kept between the turns and updated with the changes of the map (see update): the row of a drone
+    that didn't move is carried to the next turn, only the distances to the enemy ships that moved or spawned
+    are computed again, planets never move. A drone nobody asks about (a docked miner) costs nothing.
+
+    :ivar ships: The enemy ships, in the order of the columns of the rows
+    :ivar planets: The planets, in the order of the columns of the planet rows
+    :ivar index: The enemy ships in a grid, indexed like ships
+    :ivar nb_served: The number of distances given since the first turn
+    :ivar nb_computed: The number of distances computed since the first turn
+    """
+
+    def __init__(self, game_map, player_id):
+        """
+        :param game_map: The game_map of the turn
+        :param int player_id: My player id, the other ships are the enemies
+        """
+        self.player_id = player_id
+        self.nb_served = 0
+        self.nb_computed = 0
+        self.__turn = None
+        self.__ship_ids = None
+        self.__planet_ids = None
+        # The rows of the drones, by ship id, as (turn, row)
+        self.__ship_rows = {}
+        self.__planet_rows = {}
+        self.update(game_map)
+
+    def update(self, game_map):
+        """
+        [EVERY TURN]
+        Move to the turn of game_map: the rows of the drones that moved are dropped, the other rows of the previous
+        turn are updated the first time they are asked for, with the columns of the enemy ships that changed
+
+        :param game_map: The game_map of the turn, its changes are the ones since the previous turn
+        :return: nothing
+        """
+        ship_table = game_map.ship_table()
+        planet_table = game_map.planet_table()
+        mine = ship_table.owner == self.player_id
+        enemies = ~mine
+        # The position of every drone, by ship id
+        self.__positions = dict(zip(ship_table.id[mine].tolist(),
+                                    zip(ship_table.x[mine].tolist(), ship_table.y[mine].tolist())))
+        all_ships = {ship.id: ship for ship in game_map.all_ships()}
+        ship_ids = ship_table.id[enemies].tolist()
+        self.ships = [all_ships[ship_id] for ship_id in ship_ids]
+        self.__ship_x = ship_table.x[enemies]
+        self.__ship_y = ship_table.y[enemies]
+        self.__ship_owners = ship_table.owner[enemies]
+        self.__ship_docked = ship_table.docking_status[enemies] != Ship.DockingStatus.UNDOCKED.value
+        self.index = ShipIndex(self.__ship_x, self.__ship_y, self.__ship_owners, self.__ship_docked,
+                               game_map.width, game_map.height)
+        all_planets = {planet.id: planet for planet in game_map.all_planets()}
+        planet_ids = planet_table.id.tolist()
+        self.planets = [all_planets[planet_id] for planet_id in planet_ids]
+        self.__planet_columns = {planet_id: column for column, planet_id in enumerate(planet_ids)}
+        self.__planet_x = planet_table.x
+        self.__planet_y = planet_table.y
+
+        if self.__turn is not None and game_map.turn == self.__turn + 1:
+            changes = game_map.changes
+            # The column of every enemy ship in the rows of the previous turn, -1 for the spawned ships,
+            # None if the enemy ships are the same, in the same order
+            old_columns = {ship_id: column for column, ship_id in enumerate(self.__ship_ids)}
+            self.__old_ship_columns = None if ship_ids == self.__ship_ids else \
+                np.array([old_columns.get(ship_id, -1) for ship_id in ship_ids], dtype=np.intp)
+            # The distances to compute again: the spawned & moved enemy ships
+            self.__dirty_ship_columns = np.array([column for column, ship_id in enumerate(ship_ids)
+                                                  if ship_id in changes.moved_ships or ship_id in changes.spawned_ships
+                                                  or ship_id not in old_columns], dtype=np.intp)
+            # Only the rows of the previous turn of the drones that didn't move are carried
+            # (a map rebuilt every turn only has spawned ships)
+            def carried(ship_id, cached):
+                return cached[0] == self.__turn and ship_id in self.__positions and \
+                    ship_id not in changes.moved_ships and ship_id not in changes.spawned_ships
+
+            self.__ship_rows = {ship_id: cached for ship_id, cached in self.__ship_rows.items()
+                                if carried(ship_id, cached)}
+            # Planets never move nor spawn, they are only destroyed
+            old_columns = {planet_id: column for column, planet_id in enumerate(self.__planet_ids)}
+            if all(planet_id in old_columns for planet_id in planet_ids):
+                self.__old_planet_columns = None if planet_ids == self.__planet_ids else \
+                    np.array([old_columns[planet_id] for planet_id in planet_ids], dtype=np.intp)
+                self.__planet_rows = {ship_id: cached for ship_id, cached in self.__planet_rows.items()
+                                      if carried(ship_id, cached)}
+            else:
+                self.__planet_rows = {}
+        else:
+            self.__ship_rows = {}
+            self.__planet_rows = {}
+        self.__turn = game_map.turn
+        self.__ship_ids = ship_ids
+        self.__planet_ids = planet_ids
+
+    def hit_rate(self):
+        """
+        :return: The part of the distances given that were carried from a previous turn instead of computed
+        :rtype: float
+        """
+        if self.nb_served == 0:
+            return 0.0
+        return 1.0 - self.nb_computed / float(self.nb_served)
+
+    def ship_row(self, ship_id):
+        """
+        :param int ship_id: The ship of the drone
+        :return: The distance between the drone & every enemy ship, in the order of ships
+        :rtype: np.ndarray
+        """
+        cached = self.__ship_rows.get(ship_id)
+        if cached is not None and cached[0] == self.__turn:
+            return cached[1]
+        x, y = self.__positions[ship_id]
+        if cached is None:
+            # Same operations as calculate_distance_between, for the same values
+            row = np.sqrt((x - self.__ship_x) ** 2 + (y - self.__ship_y) ** 2)
+            self.nb_computed += len(row)
+        else:
+            # The row of the previous turn, in the columns of this turn
+            row = cached[1] if self.__old_ship_columns is None else cached[1][self.__old_ship_columns]
+            columns = self.__dirty_ship_columns
+            if len(columns) > 0:
+                if row is cached[1]:
+                    row = row.copy()
+                row[columns] = np.sqrt((x - self.__ship_x[columns]) ** 2 + (y - self.__ship_y[columns]) ** 2)
+                self.nb_computed += len(columns)
+        self.nb_served += len(row)
+        self.__ship_rows[ship_id] = (self.__turn, row)
+        return row
+
+    def planet_row(self, ship_id):
+        """
+        :param int ship_id: The ship of the drone
+        :return: The distance between the drone & every planet, in the order of planets
+        :rtype: np.ndarray
+        """
+        cached = self.__planet_rows.get(ship_id)
+        if cached is not None and cached[0] == self.__turn:
+            return cached[1]
+        if cached is None:
+            x, y = self.__positions[ship_id]
+            row = np.sqrt((x - self.__planet_x) ** 2 + (y - self.__planet_y) ** 2)
+            self.nb_computed += len(row)
+        elif self.__old_planet_columns is None:
+            row = cached[1]
+        else:
+            row = cached[1][self.__old_planet_columns]
+        self.nb_served += len(row)
+        self.__planet_rows[ship_id] = (self.__turn, row)
+        return row
+
+    def closest_ship(self, ship_id, player_id=None, docked_only=False, furthest=False, max_distance=None):
+        """
+        :param int ship_id: The ship of the drone
+        :param player_id: Only look at the ships of this player, None for all enemies
+        :param docked_only: Only look at the docked ships
+        :param furthest: The furthest ship instead of the closest one
+        :param max_distance: Only look at the ships closer than this, None for all ships
+        :return: The distance & the closest ship, (None, None) if no ship matches
+        :rtype: (float, Ship)
+        """
+        if not furthest:
+            x, y = self.__positions[ship_id]
+            distance, column = self.index.nearest(x, y, -1 if player_id is None else player_id, docked_only,
+                                                  INFINITY if max_distance is None else max_distance)
+            if column is None:
+                return None, None
+            return distance, self.ships[column]
+
+        distances = self.ship_row(ship_id)
+        mask = np.ones(len(distances), dtype=bool) if max_distance is None else distances <= max_distance
+        if player_id is not None:
+            mask &= self.__ship_owners == player_id
+        if docked_only:
+            mask &= self.__ship_docked
+        columns = np.flatnonzero(mask)
+        if len(columns) == 0:
+            return None, None
+        column = columns[np.argmax(distances[columns])]
+        return float(distances[column]), self.ships[column]
+
+    def closest_ship_in(self, ship_id, mask):
+        """
+        :param int ship_id: The ship of the drone
+        :param np.ndarray mask: The enemy ships to look at, in the order of ships
+        :return: The distance & the closest ship of the mask (the first one on ties), (None, None) if the mask is empty
+        :rtype: (float, Ship)
+        """
+        columns = np.flatnonzero(mask)
+        if len(columns) == 0:
+            return None, None
+        distances = self.ship_row(ship_id)
+        column = columns[np.argmin(distances[columns])]
+        return float(distances[column]), self.ships[column]
+
+    def ships_within(self, ship_id, radius, player_id=None, docked_only=False):
+        """
+        :param int ship_id: The ship of the drone
+        :param radius: The max distance of the ships
+        :param player_id: Only look at the ships of this player, None for all enemies
+        :param docked_only: Only look at the docked ships
+        :return: The enemy ships around the drone
+        :rtype: list[Ship]
+        """
+        x, y = self.__positions[ship_id]
+        ships = self.ships
+        return [ships[column] for column in self.index.within(x, y, radius, -1 if player_id is None else player_id,
+                                                              docked_only)]
+
+    def ships_by_distance(self, ship_id):
+        """
+        :param int ship_id: The ship of the drone
+        :return: The enemy ships sorted by distance, as (distance, ship)
+        :rtype: list[(float, Ship)]
+        """
+        distances = self.ship_row(ship_id)
+        columns = np.argsort(distances, kind="stable")
+        ships = self.ships
+        return [(distance, ships[column]) for distance, column in zip(distances[columns].tolist(), columns.tolist())]
+
+    def threat_scores(self, ship_id, threats, double distance_weight, double threat_weight):
+        """
+        :param int ship_id: The ship of the drone
+        :param threats: The threat level of every enemy ship, in the order of ships
+        :return: The score of every enemy ship, distance * distance_weight + threat * threat_weight
+        :rtype: np.ndarray
+        """
+        return self.ship_row(ship_id) * distance_weight + np.asarray(threats, dtype=np.float64) * threat_weight
+
+    def planets_by_distance(self, ship_id):
+        """
+        :param int ship_id: The ship of the drone
+        :return: The planets sorted by distance, as (distance, planet)
+        :rtype: list[(float, Planet)]
+        """
+        distances = self.planet_row(ship_id)
+        columns = np.argsort(distances, kind="stable")
+        planets = self.planets
+        return [(distance, planets[column]) for distance, column in zip(distances[columns].tolist(), columns.tolist())]
+
+    def planet_distance(self, ship_id, planet_id):
+        """
+        :param int ship_id: The ship of the drone
+        :param int planet_id: The planet
+        :return: The distance between the drone & the planet
+        :rtype: float
+        """
+        return float(self.planet_row(ship_id)[self.__planet_columns[planet_id]])
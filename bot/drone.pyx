@@ -2,8 +2,6 @@ import hlt
 import logging
 from enum import Enum
 
-from bot.influence import Influence
-from bot.monitor import Monitor
 from bot.navigation import calculate_distance_between
 from bot.settings import MAX_TURN_DEFENDER, THREAT_WEIGHT, DISTANCE_WEIGHT, SCORE_NB_DOCKING_SPOTS, SCORE_NB_SHIP_ONGOING, SCORE_DISTANCE_CENTER
 from hlt import constants
@@ -55,9 +53,11 @@ class Drone(object):
     Drones are extension of ship that are in my control
     """
 
-    def __init__(self, ship, role=DroneRole.IDLE):
+    def __init__(self, ship, manager, role=DroneRole.IDLE):
         # Drone's ship, need to be updated each round
         self.ship = ship
+        # The manager of the drone, gives access to the monitor & the influence
+        self.manager = manager
         # Drone's ship's id
         self.ship_id = ship.id
         # Current drone role
@@ -76,14 +76,6 @@ class Drone(object):
         self.target_type = None
         # Store the distance between the drone and its target
         self.target_distance = None
-        # Store all enemy ships by distance
-        self.__enemy_by_distance = []
-        # Store all planet by distance
-        self.__planet_by_distance = []
-        # Store the distance of all enemy ships, indexed by ship.id
-        self.__enemy_distance = {}
-        # Store the distance of all planets, indexed by planet.id
-        self.__planet_distance = {}
         # Store the possible threats as a list
         self.__possibles_threats = []
         # Flag if the drone has been damaged this X turn
@@ -103,8 +95,7 @@ class Drone(object):
         self.__possibles_threats = []
 
     def is_alive(self):
-        from bot.manager import Manager
-        return Manager.get_drone(self.ship.id) is not None
+        return self.manager.get_drone(self.ship.id) is not None
 
     def add_possible_threat(self, distance, threat):
         self.__possibles_threats.append((distance, threat))
@@ -152,7 +143,7 @@ class Drone(object):
         if planet.is_full():
             return False
         # Make sure we are not too far
-        if self.__planet_distance[planet.id] > planet.pos.radius + constants.DOCK_RADIUS + constants.SHIP_RADIUS:
+        if self.manager.distances.planet_distance(self.ship_id, planet.id) > planet.pos.radius + constants.DOCK_RADIUS + constants.SHIP_RADIUS:
             return False
 
         # If we've arrived up to here, it means we can dock
@@ -256,118 +247,56 @@ class Drone(object):
 
     def get_furthest_ship(self, player_id=None, docked_only=False):
         """
-        Return the closest ship, if a player_id is sent then return the closest ship of this player
+        Return the furthest ship, if a player_id is sent then return the furthest ship of this player
         :param player_id: the player 's ship we are looking for, None for all ships
         :param docked_only: Only look for docked ships
         :return: a single ship
         """
-        for distance, enemy_ship in reversed(self.__enemy_by_distance):
-            # If we are looking for docked only ships
-            if docked_only:
-                # If the enemy ship is currently undocked, skip to next ship
-                if enemy_ship.docking_status == Ship.DockingStatus.UNDOCKED:
-                    # Skip to next ship
-                    continue
-            # If we are looking for a specific enemy's ships
-            if player_id is not None:
-                # Check if the ship's owner match the enemy we are looking after
-                if player_id != enemy_ship.owner.id:
-                    # SKip to next ship if the owners doesn't match
-                    continue
-            # If we've made up to here it means we have found the correct ship!
-            return distance, enemy_ship
-        # There are no ships matching this filter
-        return None, None
+        return self.manager.distances.closest_ship(self.ship_id, player_id=player_id, docked_only=docked_only,
+                                                   furthest=True)
 
     def get_enemy_by_distance(self):
-        return self.__enemy_by_distance
+        return self.manager.distances.ships_by_distance(self.ship_id)
 
-    def get_closest_ship(self, player_id=None, docked_only=False):
+    def get_closest_ship(self, player_id=None, docked_only=False, max_distance=None):
         """
         Return the closest ship, if a player_id is sent then return the closest ship of this player
         :param player_id: the player 's ship we are looking for, None for all ships
         :param docked_only: Only look for docked ships
+        :param max_distance: Only look for ships closer than this, None for all ships
         :return: a single ship
         """
-        for distance, enemy_ship in self.__enemy_by_distance:
-            # If we are looking for docked only ships
-            if docked_only:
-                # If the enemy ship is currently undocked, skip to next ship
-                if enemy_ship.docking_status == Ship.DockingStatus.UNDOCKED:
-                    # Skip to next ship
-                    continue
-            # If we are looking for a specific enemy's ships
-            if player_id is not None:
-                # Check if the ship's owner match the enemy we are looking after
-                if player_id != enemy_ship.owner.id:
-                    # SKip to next ship if the owners doesn't match
-                    continue
-            # If we've made up to here it means we have found the correct ship!
-            return distance, enemy_ship
-        # There are no ships matching this filter
-        return None, None
+        return self.manager.distances.closest_ship(self.ship_id, player_id=player_id, docked_only=docked_only,
+                                                   max_distance=max_distance)
 
     def get_closest_ship_in_influence(self):
         """
         Return the closest ship, inside the player influence
         :return: a single ship
         """
-        for distance, enemy_ship in self.__enemy_by_distance:
-            # Check if the ship is in the influence zone
-            if Influence.is_in_influence_zone(enemy_ship.pos):
-                # If we've made up to here it means we have found the correct ship!
-                return distance, enemy_ship
-        # There are no ships matching this filter
-        return None, None
+        # The enemy ships in the influence zone are the same for every drone, checked once per turn
+        return self.manager.distances.closest_ship_in(self.ship_id, self.manager.enemies_in_influence())
 
     def get_dangerous_ship(self):
         """
         Return the most dangerous ship, calculated by distance & threat level
         :return: a single ship
         """
-        target_score = 9999
-        target_distance = 0
-        target = None
-        for distance, enemy_ship in self.__enemy_by_distance:
-            # Simple calculate between the distance & the threat level
-            score = distance * DISTANCE_WEIGHT + Monitor.get_threat_level(enemy_ship.id) * THREAT_WEIGHT
-            if score < target_score:
-                target_score = score
-                target_distance = distance
-                target = enemy_ship
-        # There are no ships matching this filter
-        return target_distance, target_score, target
-
-    def calculate_all_ships_distance(self, all_ships):
-        """
-        Calculate all distance once and for all between all ships
-        Will probaly have collision issue with distance if 2 target are at the same distance of this ship
-        :param all_ships:
-        :return:
-        """
-        self.__enemy_by_distance = []
-        self.__enemy_distance = {}
-        for _, ship in all_ships.items():
-            # Don't calculate distance with ship of our team
-            if ship.owner == self.ship.owner:
-                # Ship to next ship
-                continue
-            # Calculate the distance between the drone and this ship
-            distance = calculate_distance_between(self.ship.pos, ship.pos)
-            # Store the enemy's distance for faster lookup
-            self.__enemy_distance[ship.id] = distance
-            # Append to the list of all distance
-            self.__enemy_by_distance.append((distance, ship))
-
-        # Sort by distance
-        self.__enemy_by_distance = sorted(self.__enemy_by_distance, key=lambda l: l[0])
+        distances = self.manager.distances
+        threats = [self.manager.monitor.get_threat_level(enemy_ship.id) for enemy_ship in distances.ships]
+        scores = distances.threat_scores(self.ship_id, threats, DISTANCE_WEIGHT, THREAT_WEIGHT)
+        if len(scores) == 0 or scores.min() >= 9999:
+            # There are no ships matching this filter
+            return 0, 9999, None
+        column = int(scores.argmin())
+        return float(distances.ship_row(self.ship_id)[column]), float(scores[column]), distances.ships[column]
 
     def get_closest_empty_planet(self):
         """
         Get the closest empty planet
         :return: distance, planet
         """
-        for distance, planet in self.__planet_by_distance:
+        for distance, planet in self.manager.distances.planets_by_distance(self.ship_id):
             # Check if it's an empty planet
             if not planet.is_owned():
                 return distance, planet
@@ -379,36 +308,22 @@ class Drone(object):
         Return our closest planet
         :return: distance, planet
         """
-        for distance, planet in self.__planet_by_distance:
+        for distance, planet in self.manager.distances.planets_by_distance(self.ship_id):
             # Check if it's our planet
             if planet.owner == self.ship.owner:
                 return distance, planet
         # We don't have an owned planet yet
         return None, None
 
-    def calculate_all_planets_distance(self, all_planets):
-        self.__planet_by_distance = []
-        self.__planet_distance = {}
-        for planet_id, planet in all_planets.items():
-            # Calculate the distance between the drone and this ship
-            distance = calculate_distance_between(self.ship.pos, planet.pos)
-            # Store the distance for faster lookup
-            self.__planet_distance[planet.id] = distance
-            # Append to the list of all distance
-            self.__planet_by_distance.append((distance, planet))
-
-        # Sort by distance
-        self.__planet_by_distance = sorted(self.__planet_by_distance, key=lambda l: l[0])
-
     def get_empty_planet_by_distance(self):
         list_distance = []
-        for distance, planet in self.__planet_by_distance:
+        for distance, planet in self.manager.distances.planets_by_distance(self.ship_id):
             if not planet.is_owned():
                 list_distance.append((distance, planet))
         return list_distance
 
     def get_planet_by_distance(self):
-        return self.__enemy_by_distance
+        return self.get_enemy_by_distance()
 
     def get_free_planet_by_distance(self):
         """
@@ -416,7 +331,7 @@ class Drone(object):
         :return: list of free planet by distance
         """
         list_distance = []
-        for distance, planet in self.__planet_by_distance:
+        for distance, planet in self.manager.distances.planets_by_distance(self.ship_id):
             # Make sure the planet is free
             if planet.is_free(self.ship.owner):
                 list_distance.append((distance, planet))
@@ -434,11 +349,11 @@ class Drone(object):
         :return: list of free planet by distance
         """
         list_score = []
-        for distance, planet in self.__planet_by_distance:
+        for distance, planet in self.manager.distances.planets_by_distance(self.ship_id):
             # Make sure the planet is free
             if planet.is_free(self.ship.owner):
                 # Don't look for planet with no available spot anymore
-                if Monitor.get_nb_spots_for_miners(planet.id) == 0:
+                if self.manager.monitor.get_nb_spots_for_miners(planet.id) == 0:
                     continue
                 # Score is relative to the distance
                 score = distance
@@ -450,7 +365,7 @@ class Drone(object):
                 """
                 """
                 # the score decrease with the distance of the planet to the center
-                score -= calculate_distance_between(planet.pos, Monitor.get_map_center()) * SCORE_DISTANCE_CENTER
+                score -= calculate_distance_between(planet.pos, self.manager.monitor.get_map_center()) * SCORE_DISTANCE_CENTER
                 """
                 list_score.append((score, planet))
         list_score = sorted(list_score, key=lambda l: l[0])
@@ -461,7 +376,7 @@ class Drone(object):
         get the closest planet that is free (empty or owner by me)
         :return:
         """
-        for distance, planet in self.__planet_by_distance:
+        for distance, planet in self.manager.distances.planets_by_distance(self.ship_id):
             if not planet.is_owned() or planet.owner == self.ship.owner:
                 return distance, planet
         return None, None
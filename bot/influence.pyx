@@ -1,144 +1,426 @@
+from libc.math cimport floor
+from libc.stdlib cimport malloc, free, llabs
+import numpy as np
 from bot.settings import SHIP_INFLUENCE, PLANET_INFLUENCE, INFLUENCE_STEP, INFLUENCE_ZONE, INFLUENCE_THRESHOLD
-from PIL import Image, ImageDraw
-from collections import defaultdict
 import os
 from hlt.entity import Ship
 import logging
 
+
+cdef int ellipse_half_widths(int a, int b, int *half_widths):
+    """
+    The filled ellipse of ImageDraw.ellipse in a box of a x b pixels, as Pillow walks a quarter of it: in
+    coordinates doubled from the center, from (a, b % 2) to (a % 2, b) by the closest of the 3 next points.
+    The row at the y-coordinate b % 2 + 2 * k spans from -half_widths[k] to half_widths[k].
+
+    :return: The number of rows of the quarter
+    """
+    cdef long long a2 = <long long> a * a
+    cdef long long b2 = <long long> b * b
+    cdef long long a2b2 = a2 * b2
+    cdef long long delta, other_delta
+    cdef int x = a
+    cdef int y = b % 2
+    cdef int next_x, next_y
+    half_widths[0] = x
+    while x != a % 2 or y != b:
+        next_x = x
+        next_y = y + 2
+        delta = llabs(a2 * next_y * next_y + b2 * next_x * next_x - a2b2)
+        if next_x > 1:
+            other_delta = llabs(a2 * (y + 2) * (y + 2) + b2 * (x - 2) * (x - 2) - a2b2)
+            if delta > other_delta:
+                next_x = x - 2
+                next_y = y + 2
+                delta = other_delta
+            other_delta = llabs(a2 * y * y + b2 * (x - 2) * (x - 2) - a2b2)
+            if delta > other_delta:
+                next_x = x - 2
+                next_y = y
+        # x only decreases: the first point of a row is the widest
+        if next_y != y:
+            half_widths[(next_y - b % 2) // 2] = next_x
+        x = next_x
+        y = next_y
+    return b // 2 + 1
+
+
+cdef class InfluenceField:
+    """
+    The influence of the sources on every pixel of the map, as a numpy array of floats.
+    A source is stamped row after row of its bounding box, a disk covers a span of every row: the pixels of the
+    ellipse PIL fills in the box (see ellipse_half_widths), so the fields are the images the influence was drawn on.
+    The overlapping sources are combined by max (the last value drawn on an image, sorted by value) or by sum.
+
+    The field can be kept between the turns (see update): only the boxes of the sources that changed are stamped
+    again, the field is the same as if all the sources were stamped on an empty field.
+
+    :ivar values: The influence of every pixel, indexed [y, x]
+    :ivar additive: Sum the overlapping sources instead of keeping the max
+    :ivar nb_stamped: The number of sources stamped by the last update
+    """
+    cdef readonly object values
+    cdef public bint additive
+    cdef public int nb_stamped
+    # The buffer of values, row after row
+    cdef float *data
+    cdef int width
+    cdef int height
+    # The sources of the field, by key, as (x, y, radius, influence, nb_steps, step_value)
+    cdef dict sources
+
+    def __init__(self, int width, int height, bint additive=False):
+        """
+        :param width: The width of the map
+        :param height: The height of the map
+        :param additive: Sum the overlapping sources instead of keeping the max
+        """
+        self.width = width
+        self.height = height
+        self.additive = additive
+        self.nb_stamped = 0
+        self.sources = {}
+        self.values = np.zeros((height, width), dtype=np.float32)
+        cdef float[:, ::1] view = self.values
+        self.data = &view[0, 0]
+
+    cpdef void clear(self):
+        """
+        Remove every source
+        """
+        self.values.fill(0)
+        self.sources = {}
+
+    cdef inline void fill_span(self, int row, int first_column, int last_column, double value):
+        """
+        Combine the value with the pixels of a row between 2 columns (included)
+        """
+        cdef int column
+        cdef float *pixels = self.data + row * self.width
+        cdef float pixel_value = <float> value
+        if self.additive:
+            for column in range(first_column, last_column + 1):
+                pixels[column] += value
+        else:
+            # Always stored, the loop is vectorized
+            for column in range(first_column, last_column + 1):
+                pixels[column] = pixel_value if pixel_value > pixels[column] else pixels[column]
+
+    cdef void stamp(self, double x, double y, double radius, double influence, int nb_steps, double step_value,
+                    int min_column, int min_row, int max_column, int max_row):
+        """
+        Stamp the nested disks of a source (see add_zone) on the pixels of a box (included)
+        """
+        cdef double outer = radius + influence * nb_steps
+        # The rows of the box of the largest disk, the smaller boxes are inside
+        cdef int top = <int> (y - outer)
+        cdef int nb_rows = <int> (y + outer) - top + 1
+        if nb_rows <= 0:
+            return
+        # The span of the smaller disk on every row, empty at first
+        cdef int *inner_firsts = <int *> malloc(nb_rows * sizeof(int))
+        cdef int *inner_lasts = <int *> malloc(nb_rows * sizeof(int))
+        cdef int *half_widths = <int *> malloc((nb_rows // 2 + 1) * sizeof(int))
+        cdef int step, k, side, row, first_column, last_column, x0, y0, a, b, dy, nb_half_rows
+        cdef double disk_radius, value
+        try:
+            for row in range(nb_rows):
+                inner_firsts[row] = 1
+                inner_lasts[row] = 0
+            # From the smallest disk, every disk only covers the pixels of its ring
+            for step in range(nb_steps - 1, -1, -1):
+                disk_radius = radius + influence * (nb_steps - step)
+                value = step_value * (step + 1)
+                # The box of PIL: the coordinates truncated
+                x0 = <int> (x - disk_radius)
+                y0 = <int> (y - disk_radius)
+                a = <int> (x + disk_radius) - x0
+                b = <int> (y + disk_radius) - y0
+                if a < 0 or b < 0 or (a == 0 and b == 0):
+                    continue
+                nb_half_rows = ellipse_half_widths(a, b, half_widths)
+                for k in range(nb_half_rows):
+                    # The coordinates of the ellipse are doubled, from its center
+                    dy = b % 2 + 2 * k
+                    first_column = x0 + (a - half_widths[k]) // 2
+                    last_column = x0 + (a + half_widths[k]) // 2
+                    for side in range(1 if dy == 0 else 2):
+                        row = y0 + (b - dy) // 2 if side == 0 else y0 + (b + dy) // 2
+                        if min_row <= row <= max_row:
+                            self.fill_ring(row, first_column, last_column, inner_firsts[row - top],
+                                           inner_lasts[row - top], min_column, max_column, value)
+                        inner_firsts[row - top] = first_column
+                        inner_lasts[row - top] = last_column
+        finally:
+            free(inner_firsts)
+            free(inner_lasts)
+            free(half_widths)
+
+    cdef inline void fill_ring(self, int row, int first_column, int last_column, int inner_first, int inner_last,
+                               int min_column, int max_column, double value):
+        """
+        Combine the value with the pixels of the span of a row outside of the inner span, between 2 columns
+        """
+        if inner_first > inner_last:
+            self.fill_span(row, max(first_column, min_column), min(last_column, max_column), value)
+        else:
+            self.fill_span(row, max(first_column, min_column), min(inner_first - 1, max_column), value)
+            self.fill_span(row, max(inner_last + 1, min_column), min(last_column, max_column), value)
+
+    cpdef void add_disk(self, double x, double y, double radius, double value):
+        """
+        Stamp a disk of a single value
+
+        :param x: The x-coordinate of the center
+        :param y: The y-coordinate of the center
+        :param radius: The radius of the disk
+        :param value: The value of the pixels inside the disk
+        """
+        self.stamp(x, y, radius, 0, 1, value, 0, 0, self.width - 1, self.height - 1)
+
+    cpdef void add_zone(self, double x, double y, double radius, double influence, int nb_steps, double step_value):
+        """
+        Stamp nb_steps nested disks: the disk i (from 0) has a radius of radius + influence * (nb_steps - i)
+        and a value of step_value * (i + 1), a pixel gets the value of the smallest disk it is in
+
+        :param x: The x-coordinate of the center
+        :param y: The y-coordinate of the center
+        :param radius: The radius of the source
+        :param influence: The width of a step
+        :param nb_steps: The number of disks
+        :param step_value: The value added by every step toward the center
+        """
+        self.stamp(x, y, radius, influence, nb_steps, step_value, 0, 0, self.width - 1, self.height - 1)
+
+    cpdef void update(self, dict sources):
+        """
+        Move the field to new sources: the pixels of the sources that disappeared or changed are cleared and the
+        sources left around them stamped again, then the sources that appeared or changed are stamped.
+        With the sources combined by sum, the floats may differ from a new field by their rounding.
+
+        :param sources: The sources of the turn, by key (the id of a ship or a planet...), as
+                        (x, y, radius, influence, nb_steps, step_value) like add_zone
+        """
+        cdef list removed = [source for key, source in self.sources.items() if sources.get(key) != source]
+        cdef list added = [(key, source) for key, source in sources.items() if self.sources.get(key) != source]
+        cdef list kept
+        cdef int min_column, min_row, max_column, max_row
+        cdef double outer
+        self.nb_stamped = 0
+        if len(removed) + len(added) >= len(sources):
+            # Most of the field changed, stamp everything again
+            self.values.fill(0)
+            for x, y, radius, influence, nb_steps, step_value in sources.values():
+                self.stamp(x, y, radius, influence, nb_steps, step_value, 0, 0, self.width - 1, self.height - 1)
+            self.nb_stamped = len(sources)
+            self.sources = dict(sources)
+            return
+
+        kept = [source for key, source in sources.items() if self.sources.get(key) == source]
+        for x, y, radius, influence, nb_steps, step_value in removed:
+            # The box of the source that left
+            outer = radius + influence * nb_steps
+            min_column = max(<int> floor(x - outer), 0)
+            min_row = max(<int> floor(y - outer), 0)
+            max_column = min(<int> floor(x + outer), self.width - 1)
+            max_row = min(<int> floor(y + outer), self.height - 1)
+            if min_column > max_column or min_row > max_row:
+                continue
+            self.values[min_row:max_row + 1, min_column:max_column + 1] = 0
+            for other_x, other_y, other_radius, other_influence, other_nb_steps, other_step_value in kept:
+                outer = other_radius + other_influence * other_nb_steps
+                if other_x + outer < min_column or other_x - outer >= max_column + 1 or \
+                        other_y + outer < min_row or other_y - outer >= max_row + 1:
+                    continue
+                self.stamp(other_x, other_y, other_radius, other_influence, other_nb_steps, other_step_value,
+                           min_column, min_row, max_column, max_row)
+                self.nb_stamped += 1
+        for key, (x, y, radius, influence, nb_steps, step_value) in added:
+            self.stamp(x, y, radius, influence, nb_steps, step_value, 0, 0, self.width - 1, self.height - 1)
+            self.nb_stamped += 1
+        self.sources = dict(sources)
+
+    cpdef double get(self, double x, double y):
+        """
+        :param x: The x-coordinate of the point
+        :param y: The y-coordinate of the point
+        :return: The influence on the pixel of the point
+        """
+        cdef int column = <int> x
+        cdef int row = <int> y
+        if column < 0 or row < 0 or column >= self.width or row >= self.height:
+            raise IndexError("(%s, %s) is outside of the influence field" % (x, y))
+        return self.data[row * self.width + column]
+
+    def get_many(self, x, y):
+        """
+        :param x: The x-coordinates of the points
+        :param y: The y-coordinates of the points
+        :return: The influence on the pixel of every point, as get
+        :rtype: np.ndarray
+        """
+        columns = np.asarray(x, dtype=np.float64).astype(np.intp)
+        rows = np.asarray(y, dtype=np.float64).astype(np.intp)
+        if len(columns) > 0 and (columns.min() < 0 or rows.min() < 0 or columns.max() >= self.width or
+                                 rows.max() >= self.height):
+            raise IndexError("A point is outside of the influence field")
+        return self.values[rows, columns]
+
+    def save(self, path):
+        """
+        Save the field as a grey image, the values capped at 255 (debug only, PIL is only needed here)
+
+        :param str path: The path of the image
+        """
+        from PIL import Image
+        Image.fromarray(np.clip(self.values, 0, 255).astype(np.uint8)).save(path)
+
+
 class Influence(object):
 
-    width = 0
-    height = 0
-    defense_img = None
-    __circle_to_draw_dict = defaultdict(list)
-    player_id = 0
-    turn = 0
-    planet_img = None
-    game_map = None
-
-    @staticmethod
-    def init(player_id):
-        # Store the player id, will be used to distinguish ships
-        Influence.player_id = player_id
-
-    @staticmethod
-    def add_circle_position(entity, influence, free_planet = False):
-        # By default empty planet have a very thin influence zone
+    def __init__(self, player_id, monitor):
+        """
+        :param int player_id: the id of the player
+        :param Monitor monitor: the monitor of the player
+        """
+        self.width = 0
+        self.height = 0
+        self.defense_field = None
+        self.player_id = player_id
+        self.turn = 0
+        self.planet_field = None
+        self.game_map = None
+        # Store the monitor, to know the planets miners
+        self.monitor = monitor
+
+    def circle_position(self, entity, influence, free_planet = False):
+        """
+        :return: The source of the influence zone of an entity, for InfluenceField.update
+        :rtype: tuple
+        """
+        # By default empty planet have a very thin influence zone, its value is the planet id + 1
         if free_planet:
-            min_x = entity.pos.x - entity.pos.radius - influence * 2
-            min_y = entity.pos.y - entity.pos.radius - influence * 2
-            max_x = entity.pos.x + entity.pos.radius + influence * 2
-            max_y = entity.pos.y + entity.pos.radius + influence * 2
-            color = entity.id + 1
-            Influence.__circle_to_draw_dict[color].append([min_x, min_y, max_x, max_y])
+            return entity.pos.x, entity.pos.y, entity.pos.radius + influence * 2, 0, 1, entity.id + 1
         else:
             # Other planets or ships have a gradient of influence zone
-            for i in range(INFLUENCE_STEP):
-                min_x = entity.pos.x - entity.pos.radius - influence * (INFLUENCE_STEP - i)
-                min_y = entity.pos.y - entity.pos.radius - influence * (INFLUENCE_STEP - i)
-                max_x = entity.pos.x + entity.pos.radius + influence * (INFLUENCE_STEP - i)
-                max_y = entity.pos.y + entity.pos.radius + influence * (INFLUENCE_STEP - i)
-                color = INFLUENCE_ZONE * (i + 1)
-                Influence.__circle_to_draw_dict[color].append([min_x, min_y, max_x, max_y])
-
-    @staticmethod
-    def update_game_map(game_map):
-        Influence.width = game_map.width
-        Influence.height = game_map.height
-        Influence.game_map = game_map
-
-        Influence.draw_defense_zone()
-        Influence.draw_free_planet_zone()
-        Influence.turn += 1
-
-    @staticmethod
-    def draw_defense_zone():
-
-        Influence.__circle_to_draw_dict = defaultdict(list)
-        Influence.defense_img = Image.new('L', (Influence.width, Influence.height))
-        draw = ImageDraw.Draw(Influence.defense_img)
+            return entity.pos.x, entity.pos.y, entity.pos.radius, influence, INFLUENCE_STEP, INFLUENCE_ZONE
+
+    def update_game_map(self, game_map):
+        if self.defense_field is None or game_map.width != self.width or game_map.height != self.height:
+            self.defense_field = InfluenceField(game_map.width, game_map.height)
+            self.planet_field = InfluenceField(game_map.width, game_map.height)
+        self.width = game_map.width
+        self.height = game_map.height
+        self.game_map = game_map
+
+        self.draw_defense_zone()
+        self.draw_free_planet_zone()
+        self.turn += 1
+
+    def draw_defense_zone(self):
+        """
+        The fields are kept between the turns, only the zones that changed are drawn again
+        """
+        sources = {}
 
         # Get the influence zone of every ships
-        for ship in Influence.game_map.get_me().all_ships():
+        for ship in self.game_map.get_me().all_ships():
             # Draw a circle for every ship that is docked
             if ship.docking_status != Ship.DockingStatus.UNDOCKED:
-                Influence.add_circle_position(ship, SHIP_INFLUENCE, free_planet=False)
+                sources["ship", ship.id] = self.circle_position(ship, SHIP_INFLUENCE, free_planet=False)
 
         # Get the influence zone of every planets
-        for planet in Influence.game_map.all_planets():
+        for planet in self.game_map.all_planets():
             # Make sure it's our planet
-            if planet.is_owned() and planet.owner.id == Influence.player_id:
-                Influence.add_circle_position(planet, PLANET_INFLUENCE, free_planet=False)
+            if planet.is_owned() and planet.owner.id == self.player_id:
+                sources["planet", planet.id] = self.circle_position(planet, PLANET_INFLUENCE, free_planet=False)
 
-        # Now draw , ordered by color
-        for color in sorted(Influence.__circle_to_draw_dict.keys()):
-            for circle in Influence.__circle_to_draw_dict[color]:
-                draw.ellipse(circle, fill=color, outline=color)
+        self.defense_field.update(sources)
 
         try:
             if os.environ['RAMPA_LOG_LEVEL'] == "DEBUG":
-                Influence.defense_img.save("influence\\defense\\defense_influence_%s.png" % Influence.turn)
+                self.defense_field.save("influence\\defense\\defense_influence_%s.png" % self.turn)
         except KeyError:
             pass
 
-    @staticmethod
-    def draw_free_planet_zone():
-        from .monitor import Monitor
-
-        Influence.__circle_to_draw_dict = defaultdict(list)
-        Influence.planet_img = Image.new('L', (Influence.width, Influence.height))
-        draw = ImageDraw.Draw(Influence.planet_img)
+    def draw_free_planet_zone(self):
+        sources = {}
 
         # Get the influence zone of every ships
-        for planet_id, planet in Monitor.get_all_planets_dict().items():
+        for planet_id, planet in self.monitor.get_all_planets_dict().items():
             # Draw a circle for every planet that is free
-            if (not planet.is_owned() or planet.owner.id == Influence.player_id) and Monitor.get_nb_spots_for_miners(planet_id) > 0:
-                Influence.add_circle_position(planet, SHIP_INFLUENCE, free_planet=True)
+            if (not planet.is_owned() or planet.owner.id == self.player_id) and self.monitor.get_nb_spots_for_miners(planet_id) > 0:
+                sources[planet_id] = self.circle_position(planet, SHIP_INFLUENCE, free_planet=True)
 
-        # Now draw , ordered by color
-        for color in sorted(Influence.__circle_to_draw_dict.keys()):
-            for circle in Influence.__circle_to_draw_dict[color]:
-                draw.ellipse(circle, fill=color, outline=color)
+        self.planet_field.update(sources)
 
         try:
             if os.environ['RAMPA_LOG_LEVEL'] == "DEBUG":
-                Influence.planet_img.save("influence\\planet\\planet_influence_%s.png" % Influence.turn)
+                self.planet_field.save("influence\\planet\\planet_influence_%s.png" % self.turn)
         except KeyError:
             pass
 
-    @staticmethod
-    def get_point_defense_influence(pos):
+    def get_point_defense_influence(self, pos):
         """
         Return the influence value of a single position (Circle)
         :param pos:
-        :return: and int between 0 and 255
+        :return: the influence of the pixel of the position
         """
-        return Influence.defense_img.getpixel((pos.x, pos.y))
-        # return Influence.img.getpixel((int(pos.x), int(pos.y)))
+        return self.defense_field.get(pos.x, pos.y)
 
-    @staticmethod
-    def get_point_planet_influence(pos):
+    def get_point_planet_influence(self, pos):
         """
         Return the influence value of a single position (Circle)
         :param pos:
-        :return: and int between 0 and 255
+        :return: the id + 1 of the free planet of the pixel of the position, 0 if none
         """
-        return Influence.planet_img.getpixel((pos.x, pos.y))
-        # return Influence.img.getpixel((int(pos.x), int(pos.y)))
+        return int(self.planet_field.get(pos.x, pos.y))
 
-    @staticmethod
-    def is_in_influence_zone(pos):
+    def is_in_influence_zone(self, pos):
         """
         Check if a position is inside the influence zone
         :param pos:
         :return:
         """
-        return Influence.get_point_defense_influence(pos) > INFLUENCE_THRESHOLD
+        return self.get_point_defense_influence(pos) > INFLUENCE_THRESHOLD
+
+    def is_in_planet_zone(self, pos):
+        return self.get_point_planet_influence(pos) > 0
+
+    def get_planet_influence(self, pos):
+        return self.get_point_planet_influence(pos) - 1
+
+    def get_points_defense_influence(self, positions):
+        """
+        Return the influence values of many positions (Circle) at once
+        :param positions:
+        :return: the influence of the pixel of every position, as a numpy array
+        """
+        return self.defense_field.get_many([pos.x for pos in positions], [pos.y for pos in positions])
 
-    @staticmethod
-    def is_in_planet_zone(pos):
-        return Influence.get_point_planet_influence(pos) > 0
+    def get_points_planet_influence(self, positions):
+        """
+        Return the influence values of many positions (Circle) at once
+        :param positions:
+        :return: the id + 1 of the free planet of the pixel of every position (0 if none), as a numpy array
+        """
+        return self.planet_field.get_many([pos.x for pos in positions],
+                                          [pos.y for pos in positions]).astype(np.int64)
 
-    @staticmethod
-    def get_planet_influence(pos):
-        return Influence.get_point_planet_influence(pos) - 1
\ No newline at end of file
+    def are_in_influence_zone(self, positions):
+        """
+        Check which positions are inside the influence zone
+        :param positions:
+        :return: a numpy mask of the positions
+        """
+        return self.get_points_defense_influence(positions) > INFLUENCE_THRESHOLD
+
+    def are_in_planet_zone(self, positions):
+        return self.get_points_planet_influence(positions) > 0
+
+    def get_planets_influence(self, positions):
+        """
+        :param positions:
+        :return: the id of the free planet of every position, -1 if none, as a numpy array
+        """
+        return self.get_points_planet_influence(positions) - 1
\ No newline at end of file
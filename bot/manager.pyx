@@ -6,12 +6,15 @@ from bot.monitor import Monitor
 from bot.drone import DroneRole, TargetType, Drone
 from bot.navigation import calculate_distance_between
 from bot.influence import Influence
+from bot.distances import DistanceMatrix
+from bot.solver import MoveRequest, solve_moves
 from bot.settings import MIN_SHIP_ATTACKERS, MAX_RATIO_SHIP_ATTACKERS, NB_SHIP_THRESHOLD, \
     MAX_TURN_DURATION, MINER_CAN_DEFEND, SAFE_ZONE_RADIUS, MIN_SCORE_DEFENSE, FOLLOW_DISTANCE, EARLY_RATIO_ASSASSIN, EARLY_RATIO_ATTACKER, \
-    EARLY_RATIO_DEFENDER, LATE_RATIO_DEFENDER, LATE_RATIO_ATTACKER, LATE_RATIO_ASSASSIN, DEFENDER_RADIUS, NB_TURN_INFLUENCE, NB_IN_INFLUENCE_RATIO, SQUAD_DISTANCE_CREATION, \
-    SQUAD_SCATTERED_THRESHOLD, SQUAD_SIZE, ENEMY_SQUAD_RADIUS, INITIAL_SAFE_DISTANCE
+    EARLY_RATIO_DEFENDER, LATE_RATIO_DEFENDER, LATE_RATIO_ATTACKER, LATE_RATIO_ASSASSIN, DEFENDER_RADIUS, NB_TURN_INFLUENCE, NB_IN_INFLUENCE_RATIO, \
+    SQUAD_SCATTERED_THRESHOLD, ENEMY_SQUAD_RADIUS, INITIAL_SAFE_DISTANCE, NAVIGATION_SOLVER, NAVIGATION_ANYTIME, \
+    ANYTIME_ANGULAR_STEP, NAVIGATION_ROUTING, NAVIGATION_FLOW
 # hlt imports
-from bot.squad import Squad
+from bot.squad import form_squads
 from hlt.constants import *
 from hlt.entity import Ship, Position
 
@@ -28,29 +31,39 @@ class Manager(object):
     The role of this class is to manage every drone
     """
 
-    # Store the player id, will be used to distinguish ships
-    player_id = None
-    # Internal counters
-    __nb_dead_drone = 0
-    # Store every  drone, indexed by ship_id
-    __all_drones = {}
-    # Store every drone indexed by role for easy lookup
-    __all_role_drones = {}
-    # Store the game_map
-    game_map = None
-    # Store the start_time of the current_turn
-    turn_start_time = None
-
-    @staticmethod
-    def init(player_id):
+    def __init__(self, player_id):
+        """
+        :param int player_id: the id of the player
+        """
         # Store the player id, will be used to distinguish ships
-        Manager.player_id = player_id
+        self.player_id = player_id
+        # Internal counters
+        self.__nb_dead_drone = 0
+        # Store every  drone, indexed by ship_id
+        self.__all_drones = {}
+        # Store every drone indexed by role for easy lookup
+        self.__all_role_drones = {}
+        # Store the game_map
+        self.game_map = None
+        # Store the start_time of the current_turn
+        self.turn_start_time = None
+        # The distances between the drones & the enemy ships and planets, see calculate_all_drones_distance
+        self.distances = None
+        # Which enemy ships of distances are in the influence zone, see enemies_in_influence
+        self.__enemies_in_influence = None
+        # The navigations of the turn, solved together at the end of create_command_queue
+        self.__move_requests = []
+        # Once the turn is over MAX_TURN_DURATION, the navigations are coarse (see NAVIGATION_ANYTIME)
+        self.__coarse_navigation = False
         # Initialise the dictionnay of role
         for role in DroneRole:
-            Manager.__all_role_drones[role] = []
+            self.__all_role_drones[role] = []
+        # Every player has its own monitor & influence, so several bots can run in one process
+        self.monitor = Monitor(player_id, self)
+        self.influence = Influence(player_id, self.monitor)
+        self.monitor.influence = self.influence
 
-    @staticmethod
-    def update_game_map(game_map, start_time):
+    def update_game_map(self, game_map, start_time):
         """
         [EVERY TURN]
         # Update the game map for the manager
@@ -59,112 +72,110 @@ class Manager(object):
         :return:
         """
         # Update the turn start_time
-        Manager.turn_start_time = start_time
+        self.turn_start_time = start_time
         # update the game map itself
-        Manager.game_map = game_map
+        self.game_map = game_map
         # Send the game_map to the monitor
-        Monitor.update_game(game_map)
+        self.monitor.update_game(game_map)
         # Check for dead drone
-        Manager.check_for_dead_drones()
+        self.check_for_dead_drones()
         # Check for squad life
-        Manager.check_squads()
+        self.check_squads()
         # Check/Update drone's targets
-        Manager.check_drone_target()
+        self.check_drone_target()
         # Check for newly created ship, convert them to drone
-        Manager.check_for_new_ship()
+        self.check_for_new_ship()
         # Check miners
-        Monitor.check_planets_miners()
+        self.monitor.check_planets_miners()
         # Update influence of the game map
-        Influence.update_game_map(game_map)
+        self.influence.update_game_map(game_map)
         # Check for new threat
-        Monitor.calculate_threat_level()
+        self.monitor.calculate_threat_level()
         # Calculate the number of ship in the influence zone everyturn
-        Monitor.nb_ship_in_influence()
+        self.monitor.nb_ship_in_influence()
 
     # Return the role of a single ship
-    @staticmethod
-    def get_ship_role(ship_id):
+    def get_ship_role(self, ship_id):
         try:
-            return Manager.__all_drones[ship_id].role
+            return self.__all_drones[ship_id].role
         except KeyError:
             return DroneRole.UNKNOWN
 
     # Change the role of a single drone
-    @staticmethod
-    def change_drone_role(drone, role):
+    def change_drone_role(self, drone, role):
         # Reset drone target, invalid if changing role
         drone.reset_target()
         # Store the old role
         old_role = drone.role
         # Remove from the old list
-        Manager.__all_role_drones[old_role].remove(drone.ship_id)
+        self.__all_role_drones[old_role].remove(drone.ship_id)
         # Add to the new list
         try:
-            Manager.__all_role_drones[role].append(drone.ship_id)
+            self.__all_role_drones[role].append(drone.ship_id)
         except KeyError:
-            Manager.__all_role_drones[role] = [drone.ship_id]
+            self.__all_role_drones[role] = [drone.ship_id]
         # Change internal drone role
         drone.role = role
 
     # Add a new ship to the fleet
-    @staticmethod
-    def add_ship(ship, role=DroneRole.IDLE):
+    def add_ship(self, ship, role=DroneRole.IDLE):
         # First check if the drone exist
         try:
-            drone = Manager.__all_drones[ship.id]
+            drone = self.__all_drones[ship.id]
             # Remove the drone from the old list
             logging.warning("Drone already exist, changing role instead")
-            Manager.change_drone_role(drone, role)
+            self.change_drone_role(drone, role)
         except KeyError:
-            Manager.__all_drones[ship.id] = Drone(ship=ship, role=role)
+            self.__all_drones[ship.id] = Drone(ship=ship, manager=self, role=role)
             try:
-                Manager.__all_role_drones[role].append(ship.id)
+                self.__all_role_drones[role].append(ship.id)
             except KeyError:
-                Manager.__all_role_drones[role] = [ship.id]
-            logging.info("Added a new ship with the role: %s" % Manager.get_ship_role(ship.id))
+                self.__all_role_drones[role] = [ship.id]
+            logging.info("Added a new ship with the role: %s" % self.get_ship_role(ship.id))
 
-    @staticmethod
-    def add_possible_threat(ship_id, distance, threat_id):
-        Manager.__all_drones[ship_id].add_possible_threat(distance, threat_id)
+    def add_possible_threats(self, possible_threats):
+        """
+        Give the enemy ships going toward them to the drones
+        :param list possible_threats: (ship_id of the drone, distance, ship_id of the threat)
+        """
+        for ship_id, distance, threat_id in possible_threats:
+            self.__all_drones[ship_id].add_possible_threat(distance, threat_id)
 
-    @staticmethod
-    def get_drone(ship_id):
+    def get_drone(self, ship_id):
         try:
-            return Manager.__all_drones[ship_id]
+            return self.__all_drones[ship_id]
         except KeyError:
             return None
 
-    @staticmethod
-    def check_for_dead_drones():
+    def check_for_dead_drones(self):
         """
         [EVERY TURN]
         Loop through all drone to remove dead drone from the list
             - If the drone's ship can't be found in the current list of ship it means it's dead
         :return:
         """
-        for ship_id in list(Manager.__all_drones.keys()):
-            drone = Manager.__all_drones[ship_id]
+        for ship_id in list(self.__all_drones.keys()):
+            drone = self.__all_drones[ship_id]
             try:
                 # If we can find the ship
-                ship = Monitor.get_ship(ship_id)
+                ship = self.monitor.get_ship(ship_id)
                 # Update it in the drone
                 drone.update_ship(ship)
             except KeyError:
                 # Ship can't be found, so drone is dead
-                Manager.__nb_dead_drone += 1
+                self.__nb_dead_drone += 1
                 # Get the old role
                 old_role = drone.role
                 # Remove from the list of current role
-                Manager.__all_role_drones[old_role].remove(ship_id)
+                self.__all_role_drones[old_role].remove(ship_id)
                 # Remove from the list of all drone
-                del Manager.__all_drones[ship_id]
-        logging.info("In total %s drone died" % Manager.__nb_dead_drone)
+                del self.__all_drones[ship_id]
+        logging.info("In total %s drone died" % self.__nb_dead_drone)
 
-    @staticmethod
-    def check_squads():
+    def check_squads(self):
         squad_done = {}
-        for ship_id in list(Manager.__all_drones.keys()):
-            drone = Manager.__all_drones[ship_id]
+        for ship_id in list(self.__all_drones.keys()):
+            drone = self.__all_drones[ship_id]
             # If the drone is not in a squad, skip it
             if drone.squad is None:
                 # Skip to next drone
@@ -182,8 +193,7 @@ class Manager(object):
 
 
 
-    @staticmethod
-    def check_for_new_ship():
+    def check_for_new_ship(self):
         """
         [EVERY TURN]
         Look for newly created ship, convert them to drone
@@ -192,26 +202,38 @@ class Manager(object):
         :return:
         """
 
-        for ship_id in Monitor.get_team_ships():
+        for ship_id in self.monitor.get_team_ships():
             # Get the ship
-            ship = Monitor.get_ship(ship_id)
+            ship = self.monitor.get_ship(ship_id)
             # If the current ship has no role, assign it as IDLE (new ship)
-            if Manager.get_ship_role(ship_id) == DroneRole.UNKNOWN:
-                Manager.add_ship(ship=ship, role=DroneRole.IDLE)
+            if self.get_ship_role(ship_id) == DroneRole.UNKNOWN:
+                self.add_ship(ship=ship, role=DroneRole.IDLE)
 
-    @staticmethod
-    def calculate_all_drones_distance():
+    def calculate_all_drones_distance(self):
         """
         Calculate between all drones and all ships, once and for all!
+        A single matrix for all the drones, the drones only sort the distances they look at (see DistanceMatrix)
+        The matrix is kept between the turns, only the distances that changed are computed again
         :return:
         """
-        for _, drone in Manager.__all_drones.items():
-            if drone.role != DroneRole.MINER:
-                drone.calculate_all_ships_distance(Monitor.get_all_ships_dict())
-                drone.calculate_all_planets_distance(Monitor.get_all_planets_dict())
+        if self.distances is None:
+            self.distances = DistanceMatrix(self.game_map, self.player_id)
+        else:
+            self.distances.update(self.game_map)
+        self.__enemies_in_influence = None
+        logging.info("Distance cache hit rate: %.2f" % self.distances.hit_rate())
+
+    def enemies_in_influence(self):
+        """
+        Check which enemy ships are in the influence zone, once per turn for all the drones
+        :return: a numpy mask of the enemy ships, in the order of the distances' ships
+        """
+        if self.__enemies_in_influence is None:
+            self.__enemies_in_influence = self.influence.are_in_influence_zone(
+                [ship.pos for ship in self.distances.ships])
+        return self.__enemies_in_influence
 
-    @staticmethod
-    def check_defender_timer():
+    def check_defender_timer(self):
         """
         [EVERY TURN]
         Decrease the timer for every defenders
@@ -219,9 +241,9 @@ class Manager(object):
         :return:
         """
         # Loop through all defenders
-        for ship_id in list(Manager.__all_role_drones[DroneRole.DEFENDER]):
+        for ship_id in list(self.__all_role_drones[DroneRole.DEFENDER]):
             # Get the drone
-            drone = Manager.__all_drones[ship_id]
+            drone = self.__all_drones[ship_id]
             # If there is no defense time left
             if drone.defender_timer <= 0:
                 # Change the drone back to it's previous role
@@ -229,13 +251,12 @@ class Manager(object):
                 previous_role = drone.get_previous_role()
                 # Drone can't return to Miner, so switch it to IDLE it was a miner
                 if previous_role != DroneRole.MINER:
-                    Manager.change_drone_role(drone, DroneRole.IDLE)
+                    self.change_drone_role(drone, DroneRole.IDLE)
                 else:
                     # Change if back to its previous role
-                    Manager.change_drone_role(drone, previous_role)
+                    self.change_drone_role(drone, previous_role)
 
-    @staticmethod
-    def check_damaged_drone():
+    def check_damaged_drone(self):
         """
         [EVERY TURN]
         Loop through all drone to check if they are damaged
@@ -243,86 +264,80 @@ class Manager(object):
         :return:
         """
         nb_damaged = 0
-        for ship_id, drone in Manager.__all_drones.items():
-            drone = Manager.__all_drones[ship_id]
-            if Monitor.get_ship(ship_id).health < drone.max_health / 2:
+        for ship_id, drone in self.__all_drones.items():
+            drone = self.__all_drones[ship_id]
+            if self.monitor.get_ship(ship_id).health < drone.max_health / 2:
                 nb_damaged += 1
-                logging.debug("ship: %s damaged: %s" % (ship_id, Monitor.get_ship(ship_id).health))
+                logging.debug("ship: %s damaged: %s" % (ship_id, self.monitor.get_ship(ship_id).health))
                 drone.is_damaged = True
         logging.info("Found %s damaged ship" % nb_damaged)
 
-    @staticmethod
-    def role_status():
+    def role_status(self):
         """
         Return the number of drone for each role, for debug purpose
         :return: a dictionnay with the role as index containing the number of drone for each role
         """
         role_counter = {}
         for role in DroneRole:
-            role_counter[role] = Manager.nb_drone_role(role)
+            role_counter[role] = self.nb_drone_role(role)
             logging.info("Role: %s, count: %s" % (role, role_counter[role]))
         return role_counter
 
-    @staticmethod
-    def nb_drone_role(role):
+    def nb_drone_role(self, role):
         """
         Count the number of drone of specific role
         :param role:
         :return: the number of drone of the role
         """
         try:
-            return len(Manager.__all_role_drones[role])
+            return len(self.__all_role_drones[role])
         except KeyError:
             return 0
 
-    @staticmethod
-    def nb_offense():
-        return Manager.nb_drone_role(DroneRole.ATTACKER) + Manager.nb_drone_role(DroneRole.ASSASSIN) + Manager.nb_drone_role(DroneRole.DEFENDER)
+    def nb_offense(self):
+        return self.nb_drone_role(DroneRole.ATTACKER) + self.nb_drone_role(DroneRole.ASSASSIN) + self.nb_drone_role(DroneRole.DEFENDER)
 
-    @staticmethod
-    def ratio_offense():
+    def ratio_offense(self):
         """
         Calcul the ratio between offensive drone vs all drones
         :return: a float between 0 and 1
         """
-        ratio = Manager.nb_offense() / float(len(Manager.__all_drones))
+        ratio = self.nb_offense() / float(len(self.__all_drones))
         logging.debug("ratio_offense: %s" % ratio)
         return ratio
 
-    @staticmethod
-    def future_ratio_offense():
+    def future_ratio_offense(self):
         """
         Calcul the ratio between offensive drone vs all drones, AFTER the drone would be assigned
         :return: a float between 0 and 1
         """
-        ratio = (Manager.nb_offense() + 1) / float(len(Manager.__all_drones))
+        ratio = (self.nb_offense() + 1) / float(len(self.__all_drones))
         logging.debug("future_ratio_offense: %s" % ratio)
         return ratio
 
-    @staticmethod
-    def get_next_offensive_role():
+    def get_next_offensive_role(self):
         """
         This function will return the next offensive DroneRole
         :return:
         """
-        if Monitor.map_has_available_spots():
+        if self.monitor.map_has_available_spots():
             """
             # By default our first offensive drone is an assassin
-            if Manager.nb_drone_role(DroneRole.ASSASSIN) == 0:
+            if self.nb_drone_role(DroneRole.ASSASSIN) == 0:
                 return DroneRole.ASSASSIN
             """
             # Make sure there are enough attackers
-            ratio_attacker = Manager.nb_drone_role(DroneRole.ATTACKER) / float(Manager.nb_offense() + 1)
+            ratio_attacker = self.nb_drone_role(DroneRole.ATTACKER) / float(self.nb_offense() + 1)
             if ratio_attacker < EARLY_RATIO_ATTACKER:
                 return DroneRole.ATTACKER
 
             # Make sure there are enough assassins
-            ratio_assassin = Manager.nb_drone_role(DroneRole.ASSASSIN) / float(Manager.nb_offense() + 1)
+            ratio_assassin = self.nb_drone_role(DroneRole.ASSASSIN) / float(self.nb_offense() + 1)
             if ratio_assassin < EARLY_RATIO_ASSASSIN:
                 return DroneRole.ASSASSIN
 
             # Make sure there are enough defenders
-            ratio_defender = Manager.nb_drone_role(DroneRole.DEFENDER) / float(Manager.nb_offense() + 1)
+            ratio_defender = self.nb_drone_role(DroneRole.DEFENDER) / float(self.nb_offense() + 1)
             if ratio_defender < EARLY_RATIO_DEFENDER:
                 return DroneRole.DEFENDER
 
@@ -331,39 +346,38 @@ class Manager(object):
         else:
             """
             # By default our first offensive drone is an assassin
-            if Manager.nb_drone_role(DroneRole.ASSASSIN) == 0:
+            if self.nb_drone_role(DroneRole.ASSASSIN) == 0:
                 return DroneRole.ASSASSIN
             """
             # Make sure there are enough attackers
-            ratio_attacker = Manager.nb_drone_role(DroneRole.ATTACKER) / float(Manager.nb_offense() + 1)
+            ratio_attacker = self.nb_drone_role(DroneRole.ATTACKER) / float(self.nb_offense() + 1)
             if ratio_attacker < LATE_RATIO_ATTACKER:
                 return DroneRole.ATTACKER
 
             # Make sure there are enough assassins
-            ratio_assassin = Manager.nb_drone_role(DroneRole.ASSASSIN) / float(Manager.nb_offense() + 1)
+            ratio_assassin = self.nb_drone_role(DroneRole.ASSASSIN) / float(self.nb_offense() + 1)
             if ratio_assassin < LATE_RATIO_ASSASSIN:
                 return DroneRole.ASSASSIN
 
             # Make sure there are enough defenders
-            ratio_defender = Manager.nb_drone_role(DroneRole.DEFENDER) / float(Manager.nb_offense() + 1)
+            ratio_defender = self.nb_drone_role(DroneRole.DEFENDER) / float(self.nb_offense() + 1)
             if ratio_defender < LATE_RATIO_DEFENDER:
                 return DroneRole.DEFENDER
 
             # Should not happen, but in doubt create an attacker
             return DroneRole.ATTACKER
 
-    @staticmethod
-    def go_all_in():
+    def go_all_in(self):
         # Get the list of enemy ship
-        enemy_player_id = 0 if Manager.player_id == 1 else 1
+        enemy_player_id = 0 if self.player_id == 1 else 1
         min_distance = 999
         dic_closest_planet = {}
-        for ship in Manager.game_map.get_player(enemy_player_id).all_ships():
+        for ship in self.game_map.get_player(enemy_player_id).all_ships():
             logging.debug("enemy ship id: %s" % ship.id)
             # Find the closest planet of this ship
             min_distance = 999
-            for planet_id in Monitor.get_empty_planets():
-                planet = Monitor.get_planet(planet_id)
+            for planet_id in self.monitor.get_empty_planets():
+                planet = self.monitor.get_planet(planet_id)
                 distance = calculate_distance_between(ship.pos, planet.pos)
                 if distance < min_distance:
                     min_distance = distance
@@ -376,15 +390,14 @@ class Manager(object):
         # Get the only planet
         planet = set_planet.pop()
         # If the distance between the planet and our gravitational center is less than INITIAL_SAFE_DISTANCE => all in !
-        if calculate_distance_between(planet.pos, Monitor.gravitational_center(Manager.player_id)) < INITIAL_SAFE_DISTANCE:
+        if calculate_distance_between(planet.pos, self.monitor.gravitational_center(self.player_id)) < INITIAL_SAFE_DISTANCE:
             return True
 
         # No all in
         return False
 
 
-    @staticmethod
-    def give_role_idle_drone():
+    def give_role_idle_drone(self):
         """
         [EVERY TURN]
         Loop through all idle drone to give them a role
@@ -393,68 +406,67 @@ class Manager(object):
             - At the end no idle drone should remains
         :return:
         """
-        Manager.role_status()
+        self.role_status()
         """
         # Special case, if 2 players and turn 0
         """
-        if Manager.game_map.turn == 0 and len(Manager.game_map.all_players()) == 2:
+        if self.game_map.turn == 0 and len(self.game_map.all_players()) == 2:
             logging.debug("Initial turn with only 2 players")
-            if Manager.go_all_in():
+            if self.go_all_in():
                 logging.debug("The 2 players are too close, sending all in attack")
-                for drone_id in list(Manager.__all_role_drones[DroneRole.IDLE]):
-                    drone = Manager.get_drone(drone_id)
-                    Manager.change_drone_role(drone, DroneRole.ATTACKER)
+                for drone_id in list(self.__all_role_drones[DroneRole.IDLE]):
+                    drone = self.get_drone(drone_id)
+                    self.change_drone_role(drone, DroneRole.ATTACKER)
                 return None
 
         """
         # 1st: There are still planets to conquer
         """
-        if Monitor.map_has_available_spots():
+        if self.monitor.map_has_available_spots():
             # While there are still some idle drone, and we have less attackers than ships attacking us
-            while Manager.nb_drone_role(DroneRole.IDLE) > 0 and Manager.nb_offense() < Monitor.nb_ship_in_influence_last_x(NB_TURN_INFLUENCE) * NB_IN_INFLUENCE_RATIO:
+            while self.nb_drone_role(DroneRole.IDLE) > 0 and self.nb_offense() < self.monitor.nb_ship_in_influence_last_x(NB_TURN_INFLUENCE) * NB_IN_INFLUENCE_RATIO:
                 # Change an IDLE Drone to attacker
                 # Look for the idle drone that is the closest to an enemy
                 min_distance = 999
                 selected_drone = None
-                for ship_id in Manager.__all_role_drones[DroneRole.IDLE]:
-                    drone = Manager.__all_drones[ship_id]
+                for ship_id in self.__all_role_drones[DroneRole.IDLE]:
+                    drone = self.__all_drones[ship_id]
                     distance, target = drone.get_closest_ship()
                     if distance < min_distance:
                         selected_drone = drone
                         min_distance = distance
                 # Now work with the drone that is the closest to an enemy
                 # Get the next offensive role to assign
-                role = Manager.get_next_offensive_role()
+                role = self.get_next_offensive_role()
                 # Assign the role to the drone
-                Manager.change_drone_role(selected_drone, role)
+                self.change_drone_role(selected_drone, role)
 
             # If there are Idle drones
-            if Manager.nb_drone_role(DroneRole.IDLE) > 0:
+            if self.nb_drone_role(DroneRole.IDLE) > 0:
                 # Affect all remaining idle to conqueror role
                 # Copy the list of ship_id for modification
-                list_ship_id = list(Manager.__all_role_drones[DroneRole.IDLE])
+                list_ship_id = list(self.__all_role_drones[DroneRole.IDLE])
                 for ship_id in list_ship_id:
-                    drone = Manager.__all_drones[ship_id]
+                    drone = self.__all_drones[ship_id]
                     # Assign the role
-                    Manager.change_drone_role(drone, DroneRole.CONQUEROR)
+                    self.change_drone_role(drone, DroneRole.CONQUEROR)
 
         else:
             """
             # 2nd:  There are no planets to conquer anymore
             """
-            list_ship_id = list(Manager.__all_role_drones[DroneRole.IDLE])
+            list_ship_id = list(self.__all_role_drones[DroneRole.IDLE])
             for ship_id in list_ship_id:
-                drone = Manager.__all_drones[ship_id]
+                drone = self.__all_drones[ship_id]
                 # Get the next offensive role
-                role = Manager.get_next_offensive_role()
+                role = self.get_next_offensive_role()
                 # Assign the role
-                Manager.change_drone_role(drone, role)
+                self.change_drone_role(drone, role)
 
 
-        Manager.role_status()
+        self.role_status()
 
-    @staticmethod
-    def give_role_idle_drone2():
+    def give_role_idle_drone2(self):
         """
         [EVERY TURN]
         Loop through all idle drone to give them a role
@@ -463,43 +475,43 @@ class Manager(object):
             - At the end no idle drone should remains
         :return:
         """
-        Manager.role_status()
+        self.role_status()
         # If there are Idle drones
-        if Manager.nb_drone_role(DroneRole.IDLE) > 0:
+        if self.nb_drone_role(DroneRole.IDLE) > 0:
             # First:  Make sure there are still some available spots to dock
-            if Monitor.map_has_available_spots():
+            if self.monitor.map_has_available_spots():
                 """
                 # Not all drone should be attackers if there are still planets to conquer/mine
                 # Assign offensive drone based on different ratio
                 """
                 # First make sure there are enough attacker
-                while Manager.nb_drone_role(DroneRole.IDLE) > 0 and\
-                        (Manager.nb_offense() < MIN_SHIP_ATTACKERS or Manager.future_ratio_offense() < MAX_RATIO_SHIP_ATTACKERS):
+                while self.nb_drone_role(DroneRole.IDLE) > 0 and\
+                        (self.nb_offense() < MIN_SHIP_ATTACKERS or self.future_ratio_offense() < MAX_RATIO_SHIP_ATTACKERS):
                     # Change an IDLE Drone to attacker
                     # Look for the idle drone that is the closest to an enemy
                     min_distance = 999
                     selected_drone = None
-                    for ship_id in Manager.__all_role_drones[DroneRole.IDLE]:
-                        drone = Manager.__all_drones[ship_id]
+                    for ship_id in self.__all_role_drones[DroneRole.IDLE]:
+                        drone = self.__all_drones[ship_id]
                         distance, target = drone.get_closest_ship()
                         if distance < min_distance:
                             selected_drone = drone
                             min_distance = distance
                     # Now work with the drone that is the closest to an enemy
                     # Get the next offensive role to assign
-                    role = Manager.get_next_offensive_role()
+                    role = self.get_next_offensive_role()
                     # Assign the role to the drone
-                    Manager.change_drone_role(selected_drone, role)
+                    self.change_drone_role(selected_drone, role)
 
                 """
                 #Give the Conqueror role
                 """
                 # Affect all remaining idle to conqueror role
                 # Copy the list of ship_id for modification
-                list_ship_id = list(Manager.__all_role_drones[DroneRole.IDLE])
+                list_ship_id = list(self.__all_role_drones[DroneRole.IDLE])
                 for ship_id in list_ship_id:
-                    drone = Manager.__all_drones[ship_id]
-                    Manager.change_drone_role(drone, DroneRole.CONQUEROR)
+                    drone = self.__all_drones[ship_id]
+                    self.change_drone_role(drone, DroneRole.CONQUEROR)
             # Else: there are no empty planets : default role = ATTACKER
             else:
                 """
@@ -508,17 +520,16 @@ class Manager(object):
                 """
                 # Affect all remaining idle to conqueror role
                 # Copythe list of ship_id for modification
-                list_ship_id = list(Manager.__all_role_drones[DroneRole.IDLE])
+                list_ship_id = list(self.__all_role_drones[DroneRole.IDLE])
                 for ship_id in list_ship_id:
-                    drone = Manager.__all_drones[ship_id]
+                    drone = self.__all_drones[ship_id]
                     # Get the next offensive role to assign
-                    role = Manager.get_next_offensive_role()
+                    role = self.get_next_offensive_role()
                     # Assign the role
-                    Manager.change_drone_role(drone, role)
-        Manager.role_status()
+                    self.change_drone_role(drone, role)
+        self.role_status()
 
-    @staticmethod
-    def check_drone_target():
+    def check_drone_target(self):
         """
         [EVERY TURN]
         Check if the drones's target are still valid and update them
@@ -528,14 +539,14 @@ class Manager(object):
                 - If the target is a planet, make sure it's still empty. Update the target it if so, otherwise reset it
         :return:
         """
-        for ship_id, drone in Manager.__all_drones.items():
+        for ship_id, drone in self.__all_drones.items():
             # If the drone had a target already
             if drone.target_id is not None:
                 # If the drone is currently targeting a ship
                 if drone.target_type == TargetType.SHIP:
                     # Make sure the enemy ship is still alive, update the target if so
                     try:
-                        drone.update_target(Monitor.get_ship(drone.target_id))
+                        drone.update_target(self.monitor.get_ship(drone.target_id))
                     except KeyError:
                         # The target is dead, reset the target
                         drone.reset_target()
@@ -545,7 +556,7 @@ class Manager(object):
                 if drone.target_type == TargetType.PLANET:
                     # Check if the planet is still free
                     try:
-                        target = Monitor.get_planet(drone.target_id)
+                        target = self.monitor.get_planet(drone.target_id)
                         # Check if the planet is still free
                         if not target.is_free(drone.ship.owner):
                             # The target is not free anymore
@@ -562,8 +573,7 @@ class Manager(object):
                         # Skip to next ship
                         continue
 
-    @staticmethod
-    def __navigate_target(ship, target, assassin=False, closest=True):
+    def __navigate_target(self, ship, target, assassin=False, closest=True):
         """
         Simple method to create a command to attack the closest ship
         :param ship:
@@ -572,70 +582,70 @@ class Manager(object):
         # logging.debug("Going to generate a navigate command between ship %s and target %s" % (ship.id, target.id))
 
         navigate_command = None
-        if target is not None:
+        if target is not None and NAVIGATION_SOLVER:
+            # No command yet, the move is solved with the other ones at the end of the turn
+            self.__move_requests.append(MoveRequest(ship, target, self.game_map, int(MAX_SPEED), assassin=assassin,
+                                                    closest=closest))
+        elif target is not None:
             navigate_command = ship.navigate(
                 target,
-                Manager.game_map,
+                self.game_map,
                 speed=int(MAX_SPEED),
-                angular_step=1,
+                angular_step=ANYTIME_ANGULAR_STEP if self.__coarse_navigation else 1,
                 ignore_planets=False,
                 ignore_ships=False,
                 ignore_ghosts=False,
                 assassin=assassin,
                 closest=closest,
+                routing=NAVIGATION_ROUTING,
+                flow=NAVIGATION_FLOW,
             )
         # logging.info("Navigation command: %s" % navigate_command)
 
         return navigate_command
 
-    @staticmethod
-    def __intercept_ship(ship, target, distance):
+    def __intercept_ship(self, ship, target, distance):
         if distance > FOLLOW_DISTANCE:
             new_target = target.pos + (target.velocity * (FOLLOW_DISTANCE / MAX_SPEED))
             new_target = Position(new_target.x, new_target.y)
-            return Manager.__navigate_target(ship, new_target, closest=False)
-        return Manager.__navigate_target(ship, target)
+            return self.__navigate_target(ship, new_target, closest=False)
+        return self.__navigate_target(ship, target)
 
-    @staticmethod
-    def __suicide_ship_command(ship, target, assassin=False):
+    def __suicide_ship_command(self, ship, target, assassin=False):
         """
         Simple method to create a command to collide to a target
         :param ship:
         :return: the navigate command
         """
-        return Manager.__navigate_target(ship, target, assassin=assassin, closest=False)
+        return self.__navigate_target(ship, target, assassin=assassin, closest=False)
 
-    @staticmethod
-    def __attack_ship_command(ship, target, assassin=False):
+    def __attack_ship_command(self, ship, target, assassin=False):
         """
         Simple method to create a command to attack a target ship
         :param ship:
         :return: the navigate command
         """
-        return Manager.__navigate_target(ship, target, assassin=assassin)
+        return self.__navigate_target(ship, target, assassin=assassin)
 
-    @staticmethod
-    def __conquer_ship_command(ship, target):
+    def __conquer_ship_command(self, ship, target):
         """
         Simple method to create a command to conquer a target planet
         :param ship:
         :return: the navigate command
         """
-        return Manager.__navigate_target(ship, target)
+        return self.__navigate_target(ship, target)
 
-    @staticmethod
-    def check_drone_surrounding(drone):
+    def check_drone_surrounding(self, drone):
         # Check if enemies are in the radius of defense
         # Get the distance of the closest enemy ship
-        distance, ship = drone.get_closest_ship()
-        if distance <= DEFENDER_RADIUS:
+        distance, ship = drone.get_closest_ship(max_distance=DEFENDER_RADIUS)
+        if distance is not None:
             # Change drone role to DEFENDER
-            Manager.change_drone_role(drone, DroneRole.ATTACKER)
+            self.change_drone_role(drone, DroneRole.ATTACKER)
             return True
         return False
 
-    @staticmethod
-    def check_drone_defense(drone):
+    def check_drone_defense(self, drone):
         """
         Check if there is an enemy inside the defender radius of a drone, make it a defender if so
         :param drone:
@@ -648,15 +658,14 @@ class Manager(object):
 
         # Check if enemies are in the radius of defense
         # Get the distance of the closest enemy ship
-        distance, ship = drone.get_closest_ship()
-        if distance <= DEFENDER_RADIUS:
+        distance, ship = drone.get_closest_ship(max_distance=DEFENDER_RADIUS)
+        if distance is not None:
             # Change drone role to DEFENDER
-            Manager.change_drone_role(drone, DroneRole.DEFENDER)
+            self.change_drone_role(drone, DroneRole.DEFENDER)
             return True
         return False
 
-    @staticmethod
-    def order_assassin():
+    def order_assassin(self):
         """
         [EVERY TURN]
         Main IA function for all drone with ASSASSIN role
@@ -669,12 +678,12 @@ class Manager(object):
         """
 
         # Get the current nemesis
-        nemesis = Monitor.find_nemesis()
+        nemesis = self.monitor.find_nemesis()
 
         # Loop through all drone
-        for ship_id in Manager.__all_role_drones[DroneRole.ASSASSIN]:
+        for ship_id in self.__all_role_drones[DroneRole.ASSASSIN]:
             # Get the drone
-            drone = Manager.__all_drones[ship_id]
+            drone = self.__all_drones[ship_id]
             if drone.target is None:
                 # Look for the closest ship of our nemesis that is docked
                 distance, enemy_ship = drone.get_furthest_ship(player_id=nemesis, docked_only=True)
@@ -684,17 +693,16 @@ class Manager(object):
                 # If there are no docked ship
                 else:
                     # move to the gravitational center of our nemesis
-                    center = Monitor.gravitational_center(nemesis)
+                    center = self.monitor.gravitational_center(nemesis)
                     position = Position(center.x, center.y, center.radius)
                     distance = calculate_distance_between(drone.ship.pos, position.pos)
                     # Assign the target
                     drone.assign_target(position, distance, target_type=TargetType.POSITION)
 
-    @staticmethod
-    def order_squad():
+    def order_squad(self):
         squad_done = {}
-        for ship_id in list(Manager.__all_role_drones[DroneRole.ATTACKER]):
-            drone = Manager.__all_drones[ship_id]
+        for ship_id in list(self.__all_role_drones[DroneRole.ATTACKER]):
+            drone = self.__all_drones[ship_id]
 
             # If the drone has no squad, skip
             if drone.squad is None:
@@ -768,43 +776,17 @@ class Manager(object):
 
 
 
-    @staticmethod
-    def order_attacker():
+    def order_attacker(self):
+        # Create the squads of the attackers close to each other
+        form_squads([self.__all_drones[ship_id] for ship_id in self.__all_role_drones[DroneRole.ATTACKER]])
+        attackers = list(self.__all_role_drones[DroneRole.ATTACKER])
+        # The free planet zone of every attacker, in a single query
+        planets_in_influence = dict(zip(attackers, self.influence.get_planets_influence(
+            [self.__all_drones[ship_id].ship.pos for ship_id in attackers]).tolist()))
         # Loop through all drone
-        for ship_id in list(Manager.__all_role_drones[DroneRole.ATTACKER]):
+        for ship_id in attackers:
             # Get the drone
-            drone = Manager.__all_drones[ship_id]
-
-            # Try to create squad
-            if drone.squad is None:
-                logging.debug("Drone: %s has no squad" % drone.ship.id)
-                squad_created = False
-                # Find the number of attacker drone inside the radius, join or create squad if it's the case
-                for other_ship_id in  list(Manager.__all_role_drones[DroneRole.ATTACKER]):
-                    # Don't look at itself
-                    if other_ship_id == ship_id:
-                        # Skip next ship
-                        continue
-                    other_drone = Manager.__all_drones[other_ship_id]
-                    if calculate_distance_between(drone.ship.pos, other_drone.ship.pos) < SQUAD_DISTANCE_CREATION:
-                        # We have a squad here!
-                        squad_created = True
-                        logging.debug("Found close attacker to join in squad")
-                        if other_drone.squad is not None and other_drone.squad.nb_members() < SQUAD_SIZE:
-                            logging.debug("Squad exist and not full, joining it")
-                            other_drone.squad.add_member(drone)
-                        else:
-                            logging.debug("Squad doesn't exist or is full, create it")
-                            new_squad = Squad()
-                            new_squad.add_member(drone)
-                            new_squad.add_member(other_drone)
-                            new_squad.promote_new_leader()
-                        # Don't look for other drone
-                        break
-            else:
-                # logging.debug("Drone: %s has already a squad" % drone.ship.id)
-                # Skip to next drone
-                continue
+            drone = self.__all_drones[ship_id]
 
             # Only handle squad less drone
             if drone.squad is None:
@@ -843,21 +825,20 @@ class Manager(object):
 
                 else:
                     # Check that the drone can't become a conqueror for "free"
-                    if Influence.is_in_planet_zone(drone.ship.pos):
-                        # Get the planet_id
-                        planet_id = Influence.get_planet_influence(drone.ship.pos)
+                    planet_id = planets_in_influence[ship_id]
+                    if planet_id >= 0:
                         # Make sure the planet is still free
-                        if Monitor.get_nb_spots_for_miners(planet_id) > 0:
+                        if self.monitor.get_nb_spots_for_miners(planet_id) > 0:
                             # Change role to CONQUEROR
-                            Manager.change_drone_role(drone, DroneRole.CONQUEROR)
+                            self.change_drone_role(drone, DroneRole.CONQUEROR)
                             # Get the planet
-                            planet = Monitor.get_planet(planet_id)
+                            planet = self.monitor.get_planet(planet_id)
                             # Calculate the distance
                             distance = calculate_distance_between(planet.pos, drone.ship.pos)
                             # Add the target to the drone
                             drone.assign_target(planet, distance, target_type=TargetType.PLANET)
                             #Add the drone to the list of miner
-                            Monitor.add_planets_miner(planet.id, drone.ship.id)
+                            self.monitor.add_planets_miner(planet.id, drone.ship.id)
                             # Skip to next drone
                             continue
 
@@ -870,8 +851,7 @@ class Manager(object):
                         # Attack the closest ship
                         drone.assign_target(enemy_ship, distance, target_type=TargetType.SHIP)
 
-    @staticmethod
-    def order_attacker_no_squad():
+    def order_attacker_no_squad(self):
         """
         [EVERY TURN]
         Main IA function for all drone with ATTACKER role
@@ -883,12 +863,16 @@ class Manager(object):
         """
 
         # Get the current nemesis
-        nemesis = Monitor.find_nemesis()
+        nemesis = self.monitor.find_nemesis()
 
+        attackers = list(self.__all_role_drones[DroneRole.ATTACKER])
+        # The free planet zone of every attacker, in a single query
+        planets_in_influence = dict(zip(attackers, self.influence.get_planets_influence(
+            [self.__all_drones[ship_id].ship.pos for ship_id in attackers]).tolist()))
         # Loop through all drone
-        for ship_id in list(Manager.__all_role_drones[DroneRole.ATTACKER]):
+        for ship_id in attackers:
             # Get the drone
-            drone = Manager.__all_drones[ship_id]
+            drone = self.__all_drones[ship_id]
             # If the drone has currently no target, look for one
             # if drone.target is None:
             # Look for the closest ship of our nemesis
@@ -900,21 +884,20 @@ class Manager(object):
                 drone.assign_target(enemy_ship, distance, target_type=TargetType.SHIP)
             else:
                 # Check that the drone can't become a conqueror for "free"
-                if Influence.is_in_planet_zone(drone.ship.pos):
-                    # Get the planet_id
-                    planet_id = Influence.get_planet_influence(drone.ship.pos)
+                planet_id = planets_in_influence[ship_id]
+                if planet_id >= 0:
                     # Make sure the planet is still free
-                    if Monitor.get_nb_spots_for_miners(planet_id) > 0:
+                    if self.monitor.get_nb_spots_for_miners(planet_id) > 0:
                         # Change role to CONQUEROR
-                        Manager.change_drone_role(drone, DroneRole.CONQUEROR)
+                        self.change_drone_role(drone, DroneRole.CONQUEROR)
                         # Get the planet
-                        planet = Monitor.get_planet(planet_id)
+                        planet = self.monitor.get_planet(planet_id)
                         # Calculate the distance
                         distance = calculate_distance_between(planet.pos, drone.ship.pos)
                         # Add the target to the drone
                         drone.assign_target(planet, distance, target_type=TargetType.PLANET)
                         #Add the drone to the list of miner
-                        Monitor.add_planets_miner(planet.id, drone.ship.id)
+                        self.monitor.add_planets_miner(planet.id, drone.ship.id)
                         # Skip to next drone
                         continue
 
@@ -929,8 +912,7 @@ class Manager(object):
 
 
 
-    @staticmethod
-    def order_miner():
+    def order_miner(self):
         """
         [EVERY TURN]
         Main IA function for all drone with MINER role
@@ -940,21 +922,20 @@ class Manager(object):
         :return:
         """
         # Loop through all drone to look for an enemy
-        for ship_id in list(Manager.__all_role_drones[DroneRole.MINER]):
+        for ship_id in list(self.__all_role_drones[DroneRole.MINER]):
             # Get the drone
-            drone = Manager.__all_drones[ship_id]
+            drone = self.__all_drones[ship_id]
             # By default miner can't defend
             if MINER_CAN_DEFEND:
                 # Check if the drone needs to become a defender
-                Manager.check_drone_defense(drone)
+                self.check_drone_defense(drone)
             # Check if a miner is not stuck at mining an impossible spot
             if drone.ship.DockingStatus == Ship.DockingStatus.UNDOCKED and not drone.can_dock(drone.target):
                 # Reset this drone back to conqueror
-                Manager.change_drone_role(drone, DroneRole.CONQUEROR)
+                self.change_drone_role(drone, DroneRole.CONQUEROR)
 
     # Give an order to every conquerors
-    @staticmethod
-    def order_conquerors():
+    def order_conquerors(self):
         """
         [EVERY TURN]
         Main IA function for all drone with CONQUEROR role
@@ -971,12 +952,12 @@ class Manager(object):
 
         list_drone_no_target = []
         # Loop once through all conqueror drone to handle drone with target
-        for ship_id in list(Manager.__all_role_drones[DroneRole.CONQUEROR]):
+        for ship_id in list(self.__all_role_drones[DroneRole.CONQUEROR]):
             # Get the drone
-            drone = Manager.__all_drones[ship_id]
+            drone = self.__all_drones[ship_id]
 
             # Defend itself if needed
-            became_attacker = Manager.check_drone_surrounding(drone)
+            became_attacker = self.check_drone_surrounding(drone)
             if became_attacker:
                 continue
 
@@ -996,7 +977,7 @@ class Manager(object):
                     # Store old target
                     target = drone.target
                     # Change role to miner
-                    Manager.change_drone_role(drone, DroneRole.MINER)
+                    self.change_drone_role(drone, DroneRole.MINER)
                     # Ask for the drone to dock
                     drone.docking(target)
                     # Skip to next drone
@@ -1011,21 +992,21 @@ class Manager(object):
         # Find a target for drone without target
         for drone in list_drone_no_target:
             # Check if there are still some spots for miners to go
-            if Monitor.map_has_available_spots_for_miners():
+            if self.monitor.map_has_available_spots_for_miners():
                 # Now, look for a suitable empty planet
                 for distance, target_planet in drone.get_free_planet_by_score():
                     # Check if we can still find an available docking spot on this planet
-                    if Monitor.get_nb_spots_for_miners(target_planet.id) > 0:
+                    if self.monitor.get_nb_spots_for_miners(target_planet.id) > 0:
                         drone.assign_target(target_planet, distance, target_type=TargetType.PLANET)
                         # Add the drone to the list of miners of the planet
-                        Monitor.add_planets_miner(target_planet.id, drone.ship.id)
+                        self.monitor.add_planets_miner(target_planet.id, drone.ship.id)
 
                         # Check if by chance the drone can dock to its new target, to avoid loosing a turn
                         if drone.can_dock(drone.target):
                             # Store old target
                             target = drone.target
                             # Change role to miner
-                            Manager.change_drone_role(drone, DroneRole.MINER)
+                            self.change_drone_role(drone, DroneRole.MINER)
                             # Ask for the drone to dock
                             drone.docking(target)
 
@@ -1033,10 +1014,9 @@ class Manager(object):
             else:
                 # If there are no spot available, make it an attacker
                 # Change role to attacker
-                Manager.change_drone_role(drone, DroneRole.ATTACKER)
+                self.change_drone_role(drone, DroneRole.ATTACKER)
 
-    @staticmethod
-    def order_defender():
+    def order_defender(self):
         """
         [EVERY TURN]
         Main IA function for all drone with DEFENDER role
@@ -1048,9 +1028,9 @@ class Manager(object):
         :return:
         """
         # Loop through all drone
-        for ship_id in Manager.__all_role_drones[DroneRole.DEFENDER]:
+        for ship_id in self.__all_role_drones[DroneRole.DEFENDER]:
             # Get the drone
-            drone = Manager.__all_drones[ship_id]
+            drone = self.__all_drones[ship_id]
             # Get Ship
             ship = drone.ship
             # If the ship is not undocked, undock it
@@ -1068,41 +1048,44 @@ class Manager(object):
                 # If there are no dangerous ship in range
                 else:
                     # Move toward the defense point
-                    defense_point = Monitor.defense_point()
+                    defense_point = self.monitor.defense_point()
                     # Calculate position because there are no cache for this distance
                     distance = calculate_distance_between(drone.ship.pos, defense_point.pos)
                     # Make it the new target (ship type?)
                     drone.assign_target(defense_point, distance, target_type=TargetType.POSITION)
 
-    @staticmethod
-    def order_free_planet():
+    def order_free_planet(self):
         # Loop through all free planet
-        for planet in Monitor.get_free_planets():
+        for planet in self.monitor.get_free_planets():
             # Look for free planet that still need some conqueror
-            if planet.nb_available_docking_spots() > len(Monitor.get_planets_miners()):
+            if planet.nb_available_docking_spots() > len(self.monitor.get_planets_miners()):
                 # Look for drone around the planet to assign one
                 # TODO: continue here
                 pass
 
 
-    @staticmethod
-    def create_command_queue():
+    def create_command_queue(self):
         """
         Loop through all the drone and their target to generate a list of command
         If there are more than NB_SHIP_THRESHOLD ships:
             - Sort the drone by target_distance to prioritise ship
-        Exit the loop if we have spent more than MAX_TURN_DURATION sec in this turn
+        If we have spent more than MAX_TURN_DURATION sec in this turn:
+            - with NAVIGATION_ANYTIME, the remaining drones navigate coarsely (the moves solved together are refined
+              with the time left, see solve_moves)
+            - otherwise exit the loop, the remaining drones don't move
         :return: command_queue for the game to process
         """
 
         command_queue = []
+        self.__move_requests = []
+        self.__coarse_navigation = False
         # Get the list of drone and their target's distance
         # Split the list in 2
         # Target with distance
         list_drone_distance = []
         # Target without distance
         list_drone_no_distance = []
-        for ship_id, drone in Manager.__all_drones.items():
+        for ship_id, drone in self.__all_drones.items():
             # if it's already docking, do nothing
             if (drone.ship.docking_status == Ship.DockingStatus.DOCKING) or (
                         drone.ship.docking_status == Ship.DockingStatus.UNDOCKING):
@@ -1128,7 +1111,7 @@ class Manager(object):
 
         # Now ships with target
         # If there are more ship than NB_SHIP_THRESHOLD
-        if len(Monitor.get_all_ships_dict()) > NB_SHIP_THRESHOLD:
+        if len(self.monitor.get_all_ships_dict()) > NB_SHIP_THRESHOLD:
             # order the list by target distance
             list_drone_distance = sorted(list_drone_distance, key=lambda l: l[0])
 
@@ -1146,47 +1129,55 @@ class Manager(object):
                 if drone.role == DroneRole.ASSASSIN:
                     if drone.is_damaged:
                         # logging.debug("[COMMAND] Ship: %s go suicide ship: %s" % (drone.ship.id, drone.target.id))
-                        command = Manager.__suicide_ship_command(drone.ship, drone.target, assassin=True)
+                        command = self.__suicide_ship_command(drone.ship, drone.target, assassin=True)
                     else:
                         # logging.debug("[COMMAND] Ship: %s go assassin ship: %s" % (drone.ship.id, drone.target.id))
-                        command = Manager.__attack_ship_command(drone.ship, drone.target, assassin=True)
+                        command = self.__attack_ship_command(drone.ship, drone.target, assassin=True)
                     if command:
                         command_queue.append(command)
                 elif drone.role == DroneRole.DEFENDER:
                     if drone.target_type == TargetType.SHIP:
                         # logging.debug("[COMMAND] Ship: %s go intercept ship: %s" % (drone.ship.id, drone.target.id))
-                        command = Manager.__intercept_ship(drone.ship, drone.target, distance)
+                        command = self.__intercept_ship(drone.ship, drone.target, distance)
                     else:
                         # logging.debug("[COMMAND] Ship: %s go defense position: %s" % (drone.ship.id, drone.target.pos))
-                        command = Manager.__navigate_target(drone.ship, drone.target, closest = False)
+                        command = self.__navigate_target(drone.ship, drone.target, closest = False)
                     if command:
                         command_queue.append(command)
                 else:
                     # logging.debug("[COMMAND] Ship: %s attack ship: %s" % (drone.ship.id, drone.target.id))
-                    command = Manager.__attack_ship_command(drone.ship, drone.target)
+                    command = self.__attack_ship_command(drone.ship, drone.target)
                     if command:
                         command_queue.append(command)
 
             # If the target is a planet
             elif drone.target_type == TargetType.PLANET:
                 nb_target_planet += 1
-                command = Manager.__conquer_ship_command(drone.ship, drone.target)
+                command = self.__conquer_ship_command(drone.ship, drone.target)
                 if command:
                     command_queue.append(command)
             elif drone.target_type == TargetType.POSITION:
                 # logging.debug("[COMMAND] Ship: %s navigate position: %s" % (drone.ship.id, drone.target.pos))
-                command = Manager.__navigate_target(drone.ship, drone.target, closest=False)
+                command = self.__navigate_target(drone.ship, drone.target, closest=False)
                 if command:
                     command_queue.append(command)
 
             # Check time every 5 ships
             if nb % 5 == 0:
                 end_time = datetime.utcnow()
-                duration = (end_time - Manager.turn_start_time).total_seconds()
+                duration = (end_time - self.turn_start_time).total_seconds()
                 # if the duration is more than MAX_TURN_DURATION break the loop
-                if duration > MAX_TURN_DURATION:
+                if duration > MAX_TURN_DURATION and NAVIGATION_ANYTIME:
+                    if not self.__coarse_navigation and nb < len(list_drone_distance):
+                        logging.warning("Turn over time after %s ships, coarse navigation for the %s others" % (
+                            nb, len(list_drone_distance) - nb))
+                    self.__coarse_navigation = True
+                elif duration > MAX_TURN_DURATION:
                     # Leave the loop
                     break
 
+        if self.__move_requests:
+            duration = (datetime.utcnow() - self.turn_start_time).total_seconds()
+            command_queue.extend(solve_moves(self.__move_requests, self.game_map, MAX_TURN_DURATION - duration))
         logging.info("Sent command to attack %s ship and navigate to %s planet" % (nb_target_ship, nb_target_planet))
         return command_queue
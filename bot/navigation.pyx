@@ -1,5 +1,10 @@
-from libc.math cimport sqrt, M_PI, sin, cos, round, atan2, acos
-from bot.settings import ASSASSIN_AVOID_RADIUS, NAVIGATION_SHIP_DISTANCE, GHOST_RATIO_RADIUS
+from libc.math cimport sqrt, M_PI, sin, cos, round, atan2, acos, asin, floor, ceil, fmod
+from libc.stdlib cimport malloc, realloc, free
+from bot.settings import ASSASSIN_AVOID_RADIUS, GHOST_RATIO_RADIUS, NAVIGATION_GRID_CELL, NAVIGATION_SWEEP, \
+    NAVIGATION_SWEEP_AFTER, NAVIGATION_SWEEP_DISTANCE
+
+cdef int SWEEP_AFTER = NAVIGATION_SWEEP_AFTER
+cdef double SWEEP_DISTANCE = NAVIGATION_SWEEP_DISTANCE
 
 cdef double radians(double angle):
     """
@@ -141,40 +146,606 @@ cpdef bint intersect_segment_circle(Circle start, Circle end, Circle circle, fud
     :return: True if intersects, False otherwise
     :rtype: bool
     """
+    return c_intersect_segment_circle(start.x, start.y, end.x, end.y, circle.x, circle.y, circle.radius, fudge)
+
+cdef inline bint c_intersect_segment_circle(double start_x, double start_y, double end_x, double end_y,
+                                            double circle_x, double circle_y, double radius, double fudge):
+    """
+    intersect_segment_circle on coordinates, no Circle needed
+    """
     # Derived with SymPy
     # Parameterize the segment as start + t * (end - start),
     # and substitute into the equation of a circle
     # Solve for t
-    cdef double dx = end.x - start.x
-    cdef double dy = end.y - start.y
+    cdef double dx = end_x - start_x
+    cdef double dy = end_y - start_y
 
     cdef double a = dx ** 2 + dy ** 2
 
     #Never happens
     if a == 0.0:
         # Start and end are the same point
-        return calculate_distance_between(start, circle) <= circle.radius + fudge
+        return sqrt(((start_x - circle_x) ** 2) + ((start_y - circle_y) ** 2)) <= radius + fudge
 
-    cdef double b = -2 * (start.x ** 2 - start.x * end.x - start.x * circle.x + end.x * circle.x +
-                          start.y ** 2 - start.y * end.y - start.y * circle.y + end.y * circle.y)
-    cdef double c = (start.x - circle.x) ** 2 + (start.y - circle.y) ** 2
+    cdef double b = -2 * (start_x ** 2 - start_x * end_x - start_x * circle_x + end_x * circle_x +
+                          start_y ** 2 - start_y * end_y - start_y * circle_y + end_y * circle_y)
 
     # Time along segment when closest to the circle (vertex of the quadratic)
     cdef double t = min(-b / (2 * a), 1.0)
     if t < 0:
         return False
 
-    cdef double closest_x = start.x + dx * t
-    cdef double closest_y = start.y + dy * t
-    cdef Circle closest = Circle(closest_x, closest_y)
-    cdef double closest_distance = calculate_distance_between(closest, circle)
+    cdef double closest_x = start_x + dx * t
+    cdef double closest_y = start_y + dy * t
+    cdef double closest_distance = sqrt(((closest_x - circle_x) ** 2) + ((closest_y - circle_y) ** 2))
+
+    return closest_distance <= radius + fudge
+
+# Kinds of obstacle stored in the ObstacleGrid
+cdef enum:
+    MY_SHIP = 0
+    ENEMY_SHIP = 1
+    PLANET = 2
+    GHOST = 3
+
+# The tests of a segment against a ghost, in GhostStore.rejections
+cdef enum:
+    GHOST_CROSSED = 0
+    GHOST_HIT = 1
+    GHOST_TARGET = 2
+
+cdef class GhostStore:
+    """
+    The ghosts of a turn: the moves given to my ships, as the segment from the ship to its future position.
+    The store belongs to the game_map & is kept between turns, its arrays are only reallocated when it grows.
+    A segment is rejected by a ghost if it crosses the move (GHOST_CROSSED), comes close to the future
+    position (GHOST_HIT) or ends close to it (GHOST_TARGET), the rejections of every test are counted.
+    While an ObstacleGrid chains the ghosts to its cells, they are moved through the grid (see replace).
+
+    :ivar nb_ghosts: The number of ghosts of the turn
+    """
+    cdef readonly int nb_ghosts
+    # The number of ObstacleGrid chaining the ghosts to their cells
+    cdef int nb_grids
+    cdef int capacity
+    cdef double *start_x
+    cdef double *start_y
+    cdef double *start_radius
+    cdef double *x
+    cdef double *y
+    cdef double *radius
+    # The last query that tested the ghost, see ObstacleGrid.query
+    cdef long *stamp
+    cdef long query
+    cdef long nb_tests
+    cdef long rejections[3]
+
+    def __cinit__(self, int capacity=256):
+        self.nb_ghosts = 0
+        self.nb_grids = 0
+        self.capacity = capacity
+        self.start_x = <double *> malloc(capacity * sizeof(double))
+        self.start_y = <double *> malloc(capacity * sizeof(double))
+        self.start_radius = <double *> malloc(capacity * sizeof(double))
+        self.x = <double *> malloc(capacity * sizeof(double))
+        self.y = <double *> malloc(capacity * sizeof(double))
+        self.radius = <double *> malloc(capacity * sizeof(double))
+        self.stamp = <long *> malloc(capacity * sizeof(long))
+        self.query = 0
+        self.nb_tests = 0
+        self.rejections[GHOST_CROSSED] = 0
+        self.rejections[GHOST_HIT] = 0
+        self.rejections[GHOST_TARGET] = 0
+
+    def __dealloc__(self):
+        free(self.start_x)
+        free(self.start_y)
+        free(self.start_radius)
+        free(self.x)
+        free(self.y)
+        free(self.radius)
+        free(self.stamp)
+
+    def __len__(self):
+        return self.nb_ghosts
+
+    def clear(self):
+        """
+        Remove the ghosts of the previous turn, the statistics are kept
+
+        :return: nothing
+        """
+        self.nb_ghosts = 0
+
+    cpdef int add(self, Circle start, Circle ghost):
+        """
+        :param start: The current position of the ship
+        :param ghost: The future position of the ship
+        :return: The index of the ghost
+        """
+        if self.nb_ghosts == self.capacity:
+            self.capacity *= 2
+            self.start_x = <double *> realloc(self.start_x, self.capacity * sizeof(double))
+            self.start_y = <double *> realloc(self.start_y, self.capacity * sizeof(double))
+            self.start_radius = <double *> realloc(self.start_radius, self.capacity * sizeof(double))
+            self.x = <double *> realloc(self.x, self.capacity * sizeof(double))
+            self.y = <double *> realloc(self.y, self.capacity * sizeof(double))
+            self.radius = <double *> realloc(self.radius, self.capacity * sizeof(double))
+            self.stamp = <long *> realloc(self.stamp, self.capacity * sizeof(long))
+        cdef int index = self.nb_ghosts
+        self.start_x[index] = start.x
+        self.start_y[index] = start.y
+        self.start_radius[index] = start.radius
+        self.x[index] = ghost.x
+        self.y[index] = ghost.y
+        self.radius[index] = ghost.radius
+        self.stamp[index] = 0
+        self.nb_ghosts += 1
+        return index
+
+    cpdef void replace(self, int index, Circle ghost) except *:
+        """
+        Change the future position of a ghost, its ship was given another move.
+        Only for a store without grid: the ghost would stay chained to the cells of its previous move only,
+        ObstacleGrid.replace_ghost chains it to its new cells.
+
+        :param index: The index of the ghost
+        :param ghost: The new future position of the ship
+        :return: nothing
+        :raise ValueError: If an ObstacleGrid chains the ghosts to its cells
+        """
+        if self.nb_grids > 0:
+            raise ValueError("The ghosts are chained to the cells of an ObstacleGrid, see ObstacleGrid.replace_ghost")
+        self.move(index, ghost)
+
+    cdef void move(self, int index, Circle ghost):
+        """
+        Change the future position of a ghost, see replace
+        """
+        self.x[index] = ghost.x
+        self.y[index] = ghost.y
+        self.radius[index] = ghost.radius
+
+    cpdef int conflict(self, double start_x, double start_y, double end_x, double end_y, double radius,
+                       double fudge, int skip=-1, int first=0):
+        """
+        The first ghost in conflict with a move, tested both ways: the move is rejected by the ghost (see hits),
+        or the move of the ghost comes close to the end of the move. Every ghost is tested, see
+        ObstacleGrid.ghost_conflict for the ghosts around the move only
+
+        :param start_x, start_y: The current position of the ship
+        :param end_x, end_y, radius: The future position of the ship
+        :param fudge: The fudge of the ship
+        :param skip: A ghost not to test (the previous move of the ship)
+        :param first: The first ghost to test
+        :return: The index of the ghost, -1 if there is no conflict
+        """
+        cdef int i
+        for i in range(first, self.nb_ghosts):
+            if i == skip:
+                continue
+            if self.conflicts(i, start_x, start_y, end_x, end_y, radius, fudge):
+                return i
+        return -1
+
+    def all(self):
+        """
+        :return: The ghosts, as (current position, future position) of the ships
+        :rtype: list[(Circle, Circle)]
+        """
+        return [(Circle(self.start_x[i], self.start_y[i], self.start_radius[i]),
+                 Circle(self.x[i], self.y[i], self.radius[i])) for i in range(self.nb_ghosts)]
+
+    def statistics(self):
+        """
+        :return: The number of segments tested against a ghost & rejected by every test, since the start of the game
+        :rtype: dict[str, int]
+        """
+        return {
+            "tests": self.nb_tests,
+            "crossed": self.rejections[GHOST_CROSSED],
+            "hit": self.rejections[GHOST_HIT],
+            "target": self.rejections[GHOST_TARGET],
+        }
+
+    cdef inline bint conflicts(self, int index, double start_x, double start_y, double end_x, double end_y,
+                               double radius, double fudge):
+        """
+        Whether the ghost is in conflict with the move, see conflict
+        """
+        return self.hits(index, start_x, start_y, end_x, end_y, fudge) or \
+            c_intersect_segment_circle(self.start_x[index], self.start_y[index], self.x[index], self.y[index],
+                                       end_x, end_y, radius, fudge + 1)
+
+    cdef inline bint hits(self, int index, double start_x, double start_y, double end_x, double end_y,
+                          double fudge):
+        """
+        Whether the segment is rejected by the ghost, the fudge is the one of the ship (ghosts get 1 more)
+        """
+        self.nb_tests += 1
+        if c_segment_intersect(self.start_x[index], self.start_y[index], self.x[index], self.y[index],
+                               start_x, start_y, end_x, end_y):
+            self.rejections[GHOST_CROSSED] += 1
+            return True
+        if c_intersect_segment_circle(start_x, start_y, end_x, end_y, self.x[index], self.y[index],
+                                      self.radius[index], fudge + 1):
+            self.rejections[GHOST_HIT] += 1
+            return True
+        if sqrt((end_x - self.x[index]) ** 2 + (end_y - self.y[index]) ** 2) < self.radius[index] + fudge:
+            self.rejections[GHOST_TARGET] += 1
+            return True
+        return False
 
-    return closest_distance <= circle.radius + fudge
+cdef struct ObstacleEntry:
+    # MY_SHIP, ENEMY_SHIP or PLANET
+    int kind
+    # The id of the owner of a ship, -1 for the planets
+    int owner
+    # Whether the ship is undocked
+    bint undocked
+    double x
+    double y
+    double radius
+    # The Circle of the entity, only compared to the ship & target of a navigation
+    void *pos
+    # The last query that tested this obstacle, so it's tested once even if it's in several cells
+    long stamp
+
+cdef class ObstacleGrid:
+    """
+    Uniform grid over the obstacles of a turn: ships, planets & ghosts. Built once per turn by the game_map
+    (see Map.obstacle_grid), the ghosts are added as the ships are given their moves.
+    An obstacle is stored in every cell its bounding box overlaps, a segment only tests the obstacles of the cells
+    its capsule (the segment widened by the fudge) crosses.
+    The obstacles are a C array of ObstacleEntry: the navigation never reads the attributes of a python object.
+    The ships & planets of the cells are stored once for all (cell_starts & cell_items), the ghosts of the
+    GhostStore of the map are chained to the cells as they are added (ghost_heads & ghost_links), and chained
+    again when they move (see replace_ghost).
+    """
+    cdef double cell_size
+    cdef int nb_columns
+    cdef int nb_rows
+    cdef long query
+    cdef ObstacleEntry *obstacles
+    cdef int nb_obstacles
+    # The ships & planets of the cell i: cell_items[cell_starts[i]:cell_starts[i + 1]]
+    cdef int *cell_starts
+    cdef int *cell_items
+    cdef GhostStore ghosts
+    # The last ghost link of every cell (-1 if none), a link is the ghost & the previous link of the cell
+    cdef int *ghost_heads
+    cdef int *ghost_links
+    cdef int nb_ghost_links
+    cdef int ghost_links_capacity
+    # Keep alive the circles whose address is stored in the obstacles
+    cdef list circles
+
+    def __cinit__(self):
+        self.obstacles = NULL
+        self.cell_starts = NULL
+        self.cell_items = NULL
+        self.ghost_heads = NULL
+        self.ghost_links = NULL
+
+    def __init__(self, game_map, double cell_size=NAVIGATION_GRID_CELL):
+        """
+        :param game_map: The game_map of the turn
+        :param cell_size: The width & height of a cell
+        """
+        self.cell_size = cell_size
+        self.nb_columns = int(game_map.width / cell_size) + 1
+        self.nb_rows = int(game_map.height / cell_size) + 1
+        self.query = 0
+        self.circles = []
+
+        ships = game_map.all_ships()
+        planets = game_map.all_planets()
+        self.obstacles = <ObstacleEntry *> malloc(max(len(ships) + len(planets), 1) * sizeof(ObstacleEntry))
+        self.nb_obstacles = 0
+        cdef int my_id = game_map.get_me().id
+        cdef int owner_id
+        for ship in ships:
+            owner_id = ship.owner.id
+            # UNDOCKED (hack to avoid import)
+            self.append(MY_SHIP if owner_id == my_id else ENEMY_SHIP, owner_id, ship.docking_status == 0, ship.pos)
+        for planet in planets:
+            self.append(PLANET, -1, False, planet.pos)
+        self.index_cells()
+
+        cdef int nb_cells = self.nb_columns * self.nb_rows
+        self.ghost_heads = <int *> malloc(nb_cells * sizeof(int))
+        cdef int i
+        for i in range(nb_cells):
+            self.ghost_heads[i] = -1
+        self.ghost_links_capacity = 256
+        self.ghost_links = <int *> malloc(2 * self.ghost_links_capacity * sizeof(int))
+        self.nb_ghost_links = 0
+        self.ghosts = game_map.ghost_store()
+        self.ghosts.nb_grids += 1
+        for i in range(self.ghosts.nb_ghosts):
+            self.index_ghost(i)
+
+    def __dealloc__(self):
+        free(self.obstacles)
+        free(self.cell_starts)
+        free(self.cell_items)
+        free(self.ghost_heads)
+        free(self.ghost_links)
+        if self.ghosts is not None:
+            self.ghosts.nb_grids -= 1
+
+    cdef void append(self, int kind, int owner, bint undocked, Circle pos):
+        """
+        Add an obstacle to the array, not to the cells
+        """
+        cdef ObstacleEntry *obstacle = &self.obstacles[self.nb_obstacles]
+        obstacle.kind = kind
+        obstacle.owner = owner
+        obstacle.undocked = undocked
+        obstacle.x = pos.x
+        obstacle.y = pos.y
+        obstacle.radius = pos.radius
+        obstacle.pos = <void *> pos
+        obstacle.stamp = 0
+        self.circles.append(pos)
+        self.nb_obstacles += 1
+
+    cdef void bounds(self, double min_x, double max_x, double min_y, double max_y, int *bounds):
+        """
+        The cells overlapped by a bounding box: column start, column end, row start, row end
+        """
+        bounds[0] = self.column(min_x)
+        bounds[1] = self.column(max_x)
+        bounds[2] = self.row(min_y)
+        bounds[3] = self.row(max_y)
+
+    cdef void obstacle_bounds(self, int index, int *bounds):
+        """
+        The cells overlapped by the bounding box of the obstacle
+        """
+        cdef ObstacleEntry *obstacle = &self.obstacles[index]
+        cdef double radius = obstacle.radius
+        if obstacle.kind == ENEMY_SHIP:
+            # Wide enough for the fudge of the assassins
+            radius += ASSASSIN_AVOID_RADIUS
+        self.bounds(obstacle.x - radius, obstacle.x + radius, obstacle.y - radius, obstacle.y + radius, bounds)
+
+    cdef void index_cells(self):
+        """
+        Store the ships & planets in the cells: count them by cell, then fill the cells
+        """
+        cdef int nb_cells = self.nb_columns * self.nb_rows
+        cdef int bounds[4]
+        cdef int i, row, column, cell
+        self.cell_starts = <int *> malloc((nb_cells + 1) * sizeof(int))
+        for cell in range(nb_cells + 1):
+            self.cell_starts[cell] = 0
+        for i in range(self.nb_obstacles):
+            self.obstacle_bounds(i, bounds)
+            for row in range(bounds[2], bounds[3] + 1):
+                for column in range(bounds[0], bounds[1] + 1):
+                    self.cell_starts[row * self.nb_columns + column + 1] += 1
+        for cell in range(nb_cells):
+            self.cell_starts[cell + 1] += self.cell_starts[cell]
+        self.cell_items = <int *> malloc(max(self.cell_starts[nb_cells], 1) * sizeof(int))
+        # cell_starts[cell] is moved to the end of the cell while it's filled, so it's the start of cell + 1
+        for i in range(self.nb_obstacles):
+            self.obstacle_bounds(i, bounds)
+            for row in range(bounds[2], bounds[3] + 1):
+                for column in range(bounds[0], bounds[1] + 1):
+                    cell = row * self.nb_columns + column
+                    self.cell_items[self.cell_starts[cell]] = i
+                    self.cell_starts[cell] += 1
+        for cell in range(nb_cells, 0, -1):
+            self.cell_starts[cell] = self.cell_starts[cell - 1]
+        self.cell_starts[0] = 0
+
+    cdef inline int column(self, double x):
+        cdef int column = <int> floor(x / self.cell_size)
+        return min(max(column, 0), self.nb_columns - 1)
+
+    cdef inline int row(self, double y):
+        cdef int row = <int> floor(y / self.cell_size)
+        return min(max(row, 0), self.nb_rows - 1)
+
+    cpdef void index_ghost(self, int index):
+        """
+        Chain a ghost of the GhostStore to the cells overlapped by the bounding box of its move
+
+        :param index: The index of the ghost in the store
+        :return: nothing
+        """
+        cdef GhostStore ghosts = self.ghosts
+        # Ghosts are avoided with a bigger fudge
+        cdef double radius = ghosts.radius[index] + 1
+        cdef int bounds[4]
+        cdef int row, column, cell
+        self.bounds(min(ghosts.x[index], ghosts.start_x[index]) - radius,
+                    max(ghosts.x[index], ghosts.start_x[index]) + radius,
+                    min(ghosts.y[index], ghosts.start_y[index]) - radius,
+                    max(ghosts.y[index], ghosts.start_y[index]) + radius, bounds)
+        for row in range(bounds[2], bounds[3] + 1):
+            for column in range(bounds[0], bounds[1] + 1):
+                if self.nb_ghost_links == self.ghost_links_capacity:
+                    self.ghost_links_capacity *= 2
+                    self.ghost_links = <int *> realloc(self.ghost_links, 2 * self.ghost_links_capacity * sizeof(int))
+                cell = row * self.nb_columns + column
+                self.ghost_links[2 * self.nb_ghost_links] = index
+                self.ghost_links[2 * self.nb_ghost_links + 1] = self.ghost_heads[cell]
+                self.ghost_heads[cell] = self.nb_ghost_links
+                self.nb_ghost_links += 1
+
+    cpdef void replace_ghost(self, int index, Circle ghost):
+        """
+        Change the future position of a ghost of the GhostStore & chain it to the cells of its new move.
+        The links of its previous move are kept: the ghost is tested where it is now, they only cost a test.
+
+        :param index: The index of the ghost in the store
+        :param ghost: The new future position of the ship
+        :return: nothing
+        """
+        self.ghosts.move(index, ghost)
+        self.index_ghost(index)
+
+    cpdef int ghost_conflict(self, double start_x, double start_y, double end_x, double end_y, double radius,
+                             double fudge, int skip=-1, int first=0):
+        """
+        GhostStore.conflict, for the ghosts chained to the cells around the move only (as near): the cells
+        overlapped by the bounding box of the move, widened by the reach of the tests
+
+        :param start_x, start_y: The current position of the ship
+        :param end_x, end_y, radius: The future position of the ship
+        :param fudge: The fudge of the ship
+        :param skip: A ghost not to test (the previous move of the ship)
+        :param first: The first ghost to test
+        :return: The lowest index of a ghost in conflict, as GhostStore.conflict, -1 if there is no conflict
+        """
+        cdef GhostStore ghosts = self.ghosts
+        ghosts.query += 1
+        # The ghosts are chained with their radius + 1
+        cdef double reach = radius + fudge + 1
+        cdef int column_start = self.column(min(start_x, end_x) - reach)
+        cdef int column_end = self.column(max(start_x, end_x) + reach)
+        cdef int row_end = self.row(max(start_y, end_y) + reach)
+        cdef int row, column, link, i
+        cdef int found = -1
+        for row in range(self.row(min(start_y, end_y) - reach), row_end + 1):
+            for column in range(column_start, column_end + 1):
+                link = self.ghost_heads[row * self.nb_columns + column]
+                while link >= 0:
+                    i = self.ghost_links[2 * link]
+                    link = self.ghost_links[2 * link + 1]
+                    if ghosts.stamp[i] == ghosts.query:
+                        continue
+                    ghosts.stamp[i] = ghosts.query
+                    if i < first or i == skip or 0 <= found < i:
+                        continue
+                    if ghosts.conflicts(i, start_x, start_y, end_x, end_y, radius, fudge):
+                        found = i
+        return found
+
+    cdef int near(self, double x, double y, double radius, int **indices, int **ghost_indices, int *nb_ghosts):
+        """
+        Every obstacle & ghost stored in the cells overlapped by the bounding box of the circle, once
+
+        :param indices: Set to a new array (to free) of the indices of the obstacles
+        :param ghost_indices: Set to a new array (to free) of the indices of the ghosts in the GhostStore
+        :param nb_ghosts: Set to the number of ghosts
+        :return: The number of obstacles
+        """
+        self.query += 1
+        cdef GhostStore ghosts = self.ghosts
+        ghosts.query += 1
+        cdef int column_start = self.column(x - radius)
+        cdef int column_end = self.column(x + radius)
+        cdef int row_end = self.row(y + radius)
+        cdef int row, column, cell, k, link, i
+        cdef int nb = 0
+        nb_ghosts[0] = 0
+        indices[0] = <int *> malloc(max(self.nb_obstacles, 1) * sizeof(int))
+        ghost_indices[0] = <int *> malloc(max(ghosts.nb_ghosts, 1) * sizeof(int))
+        for row in range(self.row(y - radius), row_end + 1):
+            for column in range(column_start, column_end + 1):
+                cell = row * self.nb_columns + column
+                for k in range(self.cell_starts[cell], self.cell_starts[cell + 1]):
+                    i = self.cell_items[k]
+                    if self.obstacles[i].stamp != self.query:
+                        self.obstacles[i].stamp = self.query
+                        indices[0][nb] = i
+                        nb += 1
+                link = self.ghost_heads[cell]
+                while link >= 0:
+                    i = self.ghost_links[2 * link]
+                    if ghosts.stamp[i] != ghosts.query:
+                        ghosts.stamp[i] = ghosts.query
+                        ghost_indices[0][nb_ghosts[0]] = i
+                        nb_ghosts[0] += 1
+                    link = self.ghost_links[2 * link + 1]
+        return nb
+
+    cdef inline bint hits(self, ObstacleEntry *obstacle, Circle ship, Circle target, double fudge,
+                          double undocked_fudge, bint ignore_ships, bint ignore_planets):
+        """
+        Whether the segment ship -> target hits the obstacle, see obstacles_between
+        """
+        if obstacle.stamp == self.query:
+            return False
+        obstacle.stamp = self.query
+        if obstacle.kind == MY_SHIP:
+            if ignore_ships or obstacle.pos == <void *> ship:
+                return False
+            return c_intersect_segment_circle(ship.x, ship.y, target.x, target.y, obstacle.x, obstacle.y,
+                                              obstacle.radius, fudge)
+        elif obstacle.kind == PLANET:
+            if ignore_planets or obstacle.pos == <void *> ship or obstacle.pos == <void *> target:
+                return False
+            return c_intersect_segment_circle(ship.x, ship.y, target.x, target.y, obstacle.x, obstacle.y,
+                                              obstacle.radius, fudge)
+        else:
+            # Don't look at the ship that could be the target
+            if ignore_ships or obstacle.pos == <void *> target:
+                return False
+            # Handle docked & undocked ship with different fudge (if assassin)
+            return c_intersect_segment_circle(ship.x, ship.y, target.x, target.y, obstacle.x, obstacle.y,
+                                              obstacle.radius, undocked_fudge if obstacle.undocked else fudge)
+
+    cdef bint blocked(self, Circle ship, Circle target, double fudge, double undocked_fudge, bint ignore_ships,
+                      bint ignore_planets, bint ignore_ghosts):
+        """
+        Test the obstacles of every cell crossed by the capsule of the segment ship -> target, see obstacles_between
+        """
+        self.query += 1
+        cdef GhostStore ghosts = self.ghosts
+        ghosts.query += 1
+        cdef double c = self.cell_size
+        cdef double dx = target.x - ship.x
+        cdef double dy = target.y - ship.y
+        cdef int row_end = self.row(max(ship.y, target.y) + fudge)
+        cdef int row, column, column_end, cell, k, link, i
+        cdef double t0, t1, x0, x1
+        for row in range(self.row(min(ship.y, target.y) - fudge), row_end + 1):
+            # The part of the segment close enough to this row of cells
+            if dy == 0:
+                t0 = 0.0
+                t1 = 1.0
+            else:
+                t0 = (row * c - fudge - ship.y) / dy
+                t1 = ((row + 1) * c + fudge - ship.y) / dy
+                if t0 > t1:
+                    t0, t1 = t1, t0
+                t0 = max(t0, 0.0)
+                t1 = min(t1, 1.0)
+                if t0 > t1:
+                    continue
+            x0 = ship.x + dx * t0
+            x1 = ship.x + dx * t1
+            if x0 > x1:
+                x0, x1 = x1, x0
+            column_end = self.column(x1 + fudge)
+            for column in range(self.column(x0 - fudge), column_end + 1):
+                cell = row * self.nb_columns + column
+                for k in range(self.cell_starts[cell], self.cell_starts[cell + 1]):
+                    if self.hits(&self.obstacles[self.cell_items[k]], ship, target, fudge, undocked_fudge,
+                                 ignore_ships, ignore_planets):
+                        return True
+                # Avoid ghost (future position of my ships)
+                if ignore_ghosts:
+                    continue
+                link = self.ghost_heads[cell]
+                while link >= 0:
+                    i = self.ghost_links[2 * link]
+                    if ghosts.stamp[i] != ghosts.query:
+                        ghosts.stamp[i] = ghosts.query
+                        if ghosts.hits(i, ship.x, ship.y, target.x, target.y, fudge):
+                            return True
+                    link = self.ghost_links[2 * link + 1]
+        return False
 
 cpdef bint obstacles_between(Circle ship, Circle target, game_map, bint ignore_ships=False,
                              bint ignore_planets = False, bint ignore_ghosts = False, assassin = False):
     """
     Check whether there is a straight-line path to the given point, without planetary obstacles in between.
+    Only the obstacles close to the path are tested, see ObstacleGrid.
 
     :param Circle ship: Source entity
     :param Circle target: Target entity
@@ -197,34 +768,6 @@ cpdef bint obstacles_between(Circle ship, Circle target, game_map, bint ignore_s
         return True
 
     cdef double fudge = ship.radius + 0.1
-    # Avoid my own ships
-    if not ignore_ships:
-        for my_ship in game_map.get_me().all_ships():
-            if my_ship.pos == ship:
-                continue
-            # If the ship is too far ahead, no need to look right now
-            if my_ship.docking_status==0 and calculate_distance_between(my_ship.pos, ship) > NAVIGATION_SHIP_DISTANCE:
-                continue
-            if intersect_segment_circle(ship, target, my_ship.pos, fudge=fudge):
-                return True
-
-    # Avoid ghost (future position of my ships)
-    if not ignore_ghosts:
-        for start,ghost in game_map.all_ghost():
-            if segment_intersect(start,ghost, ship, target):
-                return True
-            if intersect_segment_circle(ship, target, ghost, fudge=fudge+1):
-                return True
-            if calculate_distance_between(target, ghost) < ghost.radius + fudge:
-                return True
-
-    # Avoid planets
-    if not ignore_planets:
-        for planet in game_map.all_planets():
-            if planet.pos == ship or planet.pos == target:
-                continue
-            if intersect_segment_circle(ship, target, planet.pos, fudge=fudge):
-                return True
 
     # Assassin needs to have a different fudge for docked & undocked ship
     cdef double undocked_fudge = fudge
@@ -232,29 +775,200 @@ cpdef bint obstacles_between(Circle ship, Circle target, game_map, bint ignore_s
         # Increase the the fudge but only for undocked ship, docked ship are safe
         undocked_fudge += ASSASSIN_AVOID_RADIUS
 
-    # Avoid enemy ships
-    if not ignore_ships:
-        for enemy_ship in game_map.all_ships():
-            # Don't look at my own ship in this loop
-            if enemy_ship.owner.id == game_map.get_me().id:
-                continue
-            # Don't look at the ship that could be the target
-            if enemy_ship.pos == target:
-                continue
-            # If the ship is too far ahead, no need to look right now
-            if enemy_ship.docking_status==0 and calculate_distance_between(enemy_ship.pos, ship) > NAVIGATION_SHIP_DISTANCE:
-                continue
-            # Handle docked & undocked ship with different fudge (if assassin)
-            if enemy_ship.docking_status == 0: # UNDOCKED (hack to avoid import)
-                if intersect_segment_circle(ship, target, enemy_ship.pos, fudge=undocked_fudge):
-                    return True
-            else:
-                if intersect_segment_circle(ship, target, enemy_ship.pos, fudge=fudge):
-                    return True
+    cdef ObstacleGrid grid = game_map.obstacle_grid()
+    return grid.blocked(ship, target, fudge, undocked_fudge, ignore_ships, ignore_planets, ignore_ghosts)
 
+cdef inline double bearing(double dx, double dy):
+    """
+    :return: the angle of the vector in degrees, between [0, 360[
+    """
+    return fmod(degrees(atan2(dy, dx)) + 360.0, 360.0)
 
+cdef int sweep_angles(Circle ship, double distance, int angle, game_map, int max_corrections, int angular_step,
+                      int da, int direction, bint ignore_ships, bint ignore_planets, bint ignore_ghosts, bint assassin):
+    """
+    Find the first heading without obstacle, trying the headings in the order of the correction loop of navigate:
+    angle - step, angle + 2 * step, angle - 3 * step... from the correction after da (in the given direction).
+    The obstacles that can be reached are gathered once and sorted by heading: an obstacle is only tested
+    for the integer headings of its angular interval (seen from the ship), widened by 1 degree.
+    The segments & the tests are the ones of obstacles_between, the result is the same.
 
-    return False
+    :return: the heading, -1 if every heading is blocked
+    """
+    cdef double fudge = ship.radius + 0.1
+    cdef double undocked_fudge = fudge
+    if assassin:
+        undocked_fudge += ASSASSIN_AVOID_RADIUS
+    cdef ObstacleGrid grid = game_map.obstacle_grid()
+    cdef double width = game_map.width
+    cdef double height = game_map.height
+    # Max reach of an obstacle (radius + fudge) of the bounding boxes of the grid
+    cdef double reach = distance + fudge + ASSASSIN_AVOID_RADIUS + 2
+    cdef GhostStore ghosts = grid.ghosts
+    cdef int *candidates = NULL
+    cdef int *ghost_candidates = NULL
+    cdef int nb_ghosts
+    cdef int nb = grid.near(ship.x, ship.y, reach, &candidates, &ghost_candidates, &nb_ghosts)
+    cdef int size = max(nb + nb_ghosts, 1)
+    cdef int *kinds = <int *> malloc(size * sizeof(int))
+    # The index of a ghost in the GhostStore
+    cdef int *refs = <int *> malloc(size * sizeof(int))
+    # The circle to avoid, with the fudge of the obstacle, and the start of the move for the ghosts
+    cdef double *xs = <double *> malloc(size * sizeof(double))
+    cdef double *ys = <double *> malloc(size * sizeof(double))
+    cdef double *radii = <double *> malloc(size * sizeof(double))
+    cdef double *fudges = <double *> malloc(size * sizeof(double))
+    cdef double *start_xs = <double *> malloc(size * sizeof(double))
+    cdef double *start_ys = <double *> malloc(size * sizeof(double))
+    # Angular interval of every obstacle, in integer degrees: [first, first + span]
+    cdef int *firsts = <int *> malloc(size * sizeof(int))
+    cdef int *spans = <int *> malloc(size * sizeof(int))
+    # The obstacles of every heading, as offsets in by_heading
+    cdef int *heading_starts = <int *> malloc(361 * sizeof(int))
+    cdef int *by_heading = NULL
+
+    cdef ObstacleEntry *obstacle
+    cdef int n = 0
+    cdef int i, j, h, k, new_angle
+    cdef double reach_obstacle, d, d_start, low, high, half, b_start, b_end, diff, length, t
+    cdef double end_x, end_y, closest_x, closest_y
+    cdef bint clear
+    try:
+        for j in range(nb + nb_ghosts):
+            if j >= nb:
+                if ignore_ghosts:
+                    break
+                refs[n] = ghost_candidates[j - nb]
+                kinds[n] = GHOST
+                xs[n] = ghosts.x[refs[n]]
+                ys[n] = ghosts.y[refs[n]]
+                radii[n] = ghosts.radius[refs[n]]
+                fudges[n] = fudge + 1
+                start_xs[n] = ghosts.start_x[refs[n]]
+                start_ys[n] = ghosts.start_y[refs[n]]
+            else:
+                obstacle = &grid.obstacles[candidates[j]]
+                if obstacle.kind == MY_SHIP:
+                    if ignore_ships or obstacle.pos == <void *> ship:
+                        continue
+                    fudges[n] = fudge
+                elif obstacle.kind == ENEMY_SHIP:
+                    if ignore_ships:
+                        continue
+                    # Handle docked & undocked ship with different fudge (if assassin)
+                    fudges[n] = undocked_fudge if obstacle.undocked else fudge
+                else:
+                    if ignore_planets or obstacle.pos == <void *> ship:
+                        continue
+                    fudges[n] = fudge
+                kinds[n] = obstacle.kind
+                xs[n] = obstacle.x
+                ys[n] = obstacle.y
+                radii[n] = obstacle.radius
+            reach_obstacle = radii[n] + fudges[n]
+
+            # Distance between the ship & the obstacle (the move of a ghost), bearings of its ends
+            d = sqrt((xs[n] - ship.x) ** 2 + (ys[n] - ship.y) ** 2)
+            b_end = bearing(xs[n] - ship.x, ys[n] - ship.y)
+            low = b_end
+            high = b_end
+            if kinds[n] == GHOST:
+                d_start = sqrt((start_xs[n] - ship.x) ** 2 + (start_ys[n] - ship.y) ** 2)
+                b_start = bearing(start_xs[n] - ship.x, start_ys[n] - ship.y)
+                # Closest point of the move of the ghost
+                length = (xs[n] - start_xs[n]) ** 2 + (ys[n] - start_ys[n]) ** 2
+                t = 0.0
+                if length > 0:
+                    t = ((ship.x - start_xs[n]) * (xs[n] - start_xs[n]) +
+                         (ship.y - start_ys[n]) * (ys[n] - start_ys[n])) / length
+                    t = min(max(t, 0.0), 1.0)
+                closest_x = start_xs[n] + t * (xs[n] - start_xs[n])
+                closest_y = start_ys[n] + t * (ys[n] - start_ys[n])
+                d = sqrt((closest_x - ship.x) ** 2 + (closest_y - ship.y) ** 2)
+                # The move is seen under the shortest arc between its ends
+                diff = fmod(b_end - b_start + 540.0, 360.0) - 180.0
+                low = b_start + min(diff, 0.0)
+                high = b_start + max(diff, 0.0)
+            # Too far to be reached by any heading
+            if d - reach_obstacle > distance:
+                continue
+            if d <= reach_obstacle + 1:
+                # Around the ship: every heading is concerned
+                firsts[n] = 0
+                spans[n] = 359
+            else:
+                half = degrees(asin(reach_obstacle / d))
+                firsts[n] = <int> floor(low - half) - 1
+                spans[n] = min(<int> ceil(high + half) + 1 - firsts[n], 359)
+                firsts[n] = ((firsts[n] % 360) + 360) % 360
+            n += 1
+
+        # Sort the obstacles by heading (counting sort)
+        for h in range(361):
+            heading_starts[h] = 0
+        for i in range(n):
+            for k in range(spans[i] + 1):
+                heading_starts[(firsts[i] + k) % 360 + 1] += 1
+        for h in range(360):
+            heading_starts[h + 1] += heading_starts[h]
+        by_heading = <int *> malloc(max(heading_starts[360], 1) * sizeof(int))
+        for i in range(n):
+            for k in range(spans[i] + 1):
+                h = (firsts[i] + k) % 360
+                by_heading[heading_starts[h]] = i
+                heading_starts[h] += 1
+        # heading_starts[h] is now the end of the heading h, the start of h + 1
+        for h in range(360, 0, -1):
+            heading_starts[h] = heading_starts[h - 1]
+        heading_starts[0] = 0
+
+        # The correction loop of navigate
+        while True:
+            da += angular_step
+            if da > max_corrections:
+                return -1
+            direction = -1 * direction
+            new_angle = angle + da * direction
+            if new_angle < 0:
+                new_angle = 360 + new_angle
+            new_angle = new_angle % 360
+
+            # Same target as navigate
+            end_x = ship.x + cos(radians(new_angle)) * distance
+            end_y = ship.y + sin(radians(new_angle)) * distance
+            if end_x < 1 or end_y < 1 or end_x + 1 > width or end_y + 1 > height:
+                continue
+            clear = True
+            for k in range(heading_starts[new_angle], heading_starts[new_angle + 1]):
+                i = by_heading[k]
+                if kinds[i] == GHOST:
+                    if ghosts.hits(refs[i], ship.x, ship.y, end_x, end_y, fudge):
+                        clear = False
+                        break
+                elif c_intersect_segment_circle(ship.x, ship.y, end_x, end_y, xs[i], ys[i], radii[i], fudges[i]):
+                    clear = False
+                    break
+            if clear:
+                return new_angle
+    finally:
+        free(candidates)
+        free(ghost_candidates)
+        free(refs)
+        free_all(kinds, xs, ys, radii, fudges, start_xs, start_ys, firsts, spans, heading_starts, by_heading)
+
+cdef void free_all(int *kinds, double *xs, double *ys, double *radii, double *fudges, double *start_xs,
+                   double *start_ys, int *firsts, int *spans, int *heading_starts, int *by_heading):
+    free(kinds)
+    free(xs)
+    free(ys)
+    free(radii)
+    free(fudges)
+    free(start_xs)
+    free(start_ys)
+    free(firsts)
+    free(spans)
+    free(heading_starts)
+    free(by_heading)
 
 cdef Circle dx_target(start, angle, distance):
     cdef int new_target_dx
@@ -269,7 +983,8 @@ cdef Circle dx_target(start, angle, distance):
     return new_target
 
 cpdef tuple navigate(Circle ship, Circle target, game_map, double speed, int max_corrections=90, int angular_step=1,
-                     bint ignore_ships=False, bint ignore_planets=False, ignore_ghosts=False, assassin=False):
+                     bint ignore_ships=False, bint ignore_planets=False, ignore_ghosts=False, assassin=False,
+                     bint sweep=NAVIGATION_SWEEP):
     """
     Move a ship to a specific target position (Entity). It is recommended to place the position
     itself here, else navigate will crash into the target. If avoid_obstacles is set to True (default)
@@ -288,6 +1003,8 @@ cpdef tuple navigate(Circle ship, Circle target, game_map, double speed, int max
     :param bool ignore_planets: Whether to ignore planets in calculations (useful if you want to crash onto planets)
     :param bool ignore_ghosts: Whether to ignore ghosts
     :param bool assassin: Whether the ship is an assassin
+    :param bool sweep: Test the corrections after the first NAVIGATION_SWEEP_AFTER at once (see sweep_angles),
+        for a target closer than NAVIGATION_SWEEP_DISTANCE
     :return tuple: the speed and angle of the thrust
     :rtype: tuple
     """
@@ -318,9 +1035,18 @@ cpdef tuple navigate(Circle ship, Circle target, game_map, double speed, int max
     cdef int direction = 1
     cdef int new_angle = angle
 
+    # The obstacles of a long navigation are too many to gather, its headings are tested one by one
+    sweep = sweep and distance <= SWEEP_DISTANCE
     if not ignore_planets or not ignore_ships:
         while obstacles_between(ship, new_target, game_map, ignore_ships=ignore_ships, ignore_planets=ignore_planets,
                                 ignore_ghosts=ignore_ghosts, assassin=assassin):
+            if sweep and da >= SWEEP_AFTER * angular_step:
+                # The remaining corrections at once, see sweep_angles
+                new_angle = sweep_angles(ship, distance, angle, game_map, max_corrections, angular_step, da, direction,
+                                         ignore_ships, ignore_planets, ignore_ghosts, assassin)
+                if new_angle < 0:
+                    return 0, 0, None
+                break
             # Increase the delta angle
             da += angular_step
             # If we ran out of tries
@@ -358,8 +1084,8 @@ cpdef tuple navigate(Circle ship, Circle target, game_map, double speed, int max
 # From https://www.cdn.geeksforgeeks.org/check-if-two-given-line-segments-intersect/
 # Given three colinear points p, q, r, the function checks if
 # point q lies on line segment 'pr'
-cdef bint on_segment(Circle p, Circle q, Circle r):
-    if min(p.x, r.x) <= q.x <= max(p.x, r.x) and  min(p.y, r.y) <= q.y <= max(p.y, r.y):
+cdef inline bint on_segment(double p_x, double p_y, double q_x, double q_y, double r_x, double r_y):
+    if min(p_x, r_x) <= q_x <= max(p_x, r_x) and  min(p_y, r_y) <= q_y <= max(p_y, r_y):
        return True
     return False
 
@@ -368,10 +1094,10 @@ cdef bint on_segment(Circle p, Circle q, Circle r):
 # 0 --> p, q and r are collinear
 # 1 --> Clockwise
 # 2 --> Counterclockwise
-cdef int orientation(Circle p, Circle q, Circle r):
+cdef inline int orientation(double p_x, double p_y, double q_x, double q_y, double r_x, double r_y):
     # See https://www.geeksforgeeks.org/orientation-3-ordered-points/
     # for details of below formula.
-    cdef double val = (q.y - p.y) * (r.x - q.x) - (q.x - p.x) * (r.y - q.y)
+    cdef double val = (q_y - p_y) * (r_x - q_x) - (q_x - p_x) * (r_y - q_y)
 
     if val == 0:
         return 0 # collinear
@@ -383,12 +1109,16 @@ cdef int orientation(Circle p, Circle q, Circle r):
 # The main function that returns true if line segment 'p1q1'
 # and 'p2q2' intersect.
 cpdef bint segment_intersect(Circle p1, Circle q1, Circle p2, Circle q2):
+    return c_segment_intersect(p1.x, p1.y, q1.x, q1.y, p2.x, p2.y, q2.x, q2.y)
+
+cdef inline bint c_segment_intersect(double p1_x, double p1_y, double q1_x, double q1_y,
+                                     double p2_x, double p2_y, double q2_x, double q2_y):
     # Find the four orientations needed for general and
     # special cases
-    cdef int o1 = orientation(p1, q1, p2)
-    cdef int o2 = orientation(p1, q1, q2)
-    cdef int o3 = orientation(p2, q2, p1)
-    cdef int o4 = orientation(p2, q2, q1)
+    cdef int o1 = orientation(p1_x, p1_y, q1_x, q1_y, p2_x, p2_y)
+    cdef int o2 = orientation(p1_x, p1_y, q1_x, q1_y, q2_x, q2_y)
+    cdef int o3 = orientation(p2_x, p2_y, q2_x, q2_y, p1_x, p1_y)
+    cdef int o4 = orientation(p2_x, p2_y, q2_x, q2_y, q1_x, q1_y)
 
     # General case
     if o1 != o2 and o3 != o4:
@@ -396,19 +1126,19 @@ cpdef bint segment_intersect(Circle p1, Circle q1, Circle p2, Circle q2):
 
     # Special Cases
     # p1, q1 and p2 are collinear and p2 lies on segment p1q1
-    if o1 == 0 and on_segment(p1, p2, q1):
+    if o1 == 0 and on_segment(p1_x, p1_y, p2_x, p2_y, q1_x, q1_y):
         return True
 
-    # p1, q1 and p2 are collinear and q2 lies on segment p1q1
-    if o2 == 0 and on_segment(p1, q2, q1):
+    # p1, q1 and q2 are collinear and q2 lies on segment p1q1
+    if o2 == 0 and on_segment(p1_x, p1_y, q2_x, q2_y, q1_x, q1_y):
         return True
 
     # p2, q2 and p1 are collinear and p1 lies on segment p2q2
-    if o3 == 0 and on_segment(p2, p1, q2):
+    if o3 == 0 and on_segment(p2_x, p2_y, p1_x, p1_y, q2_x, q2_y):
         return True
 
     # p2, q2 and q1 are collinear and q1 lies on segment p2q2
-    if o4 == 0 and on_segment(p2, q1, q2):
+    if o4 == 0 and on_segment(p2_x, p2_y, q1_x, q1_y, q2_x, q2_y):
         return True
 
     return False # Doesn't fall in any of the above cases
@@ -0,0 +1,63 @@
+import logging
+
+from bot.manager import Manager
+
+logger = logging.getLogger("bot")
+
+
+class Rampa(object):
+    """
+    Run every step of a turn, from the game_map sent by the engine to the command queue
+    Used by MyBot.py and by the offline replay (tools/replay.py)
+    """
+
+    def __init__(self):
+        # The managers are created on the first turn only
+        self.first_turn = True
+        # The manager of the drones, it owns the monitor & the influence of the bot
+        self.manager = None
+
+    def play_turn(self, game_map, start_time):
+        """
+        [EVERY TURN]
+        Update the managers with the new game_map and give an order to every drone
+        :param game_map: the game_map for the current_turn
+        :param start_time: the start time (datetime utc) for the current turn
+        :return: the command_queue for the game to process
+        """
+        logger.debug("START NEW TURN")
+
+        # Create the drone manager only once
+        if self.first_turn:
+            self.manager = Manager(game_map.get_me().id)
+            self.manager.update_game_map(game_map, start_time)
+            self.manager.monitor.initial_turn()
+            self.first_turn = False
+        else:
+            # Update the game_map in the manager
+            self.manager.update_game_map(game_map, start_time)
+
+        # Calculate the distance between all ships once and for all
+        self.manager.calculate_all_drones_distance()
+        # Check damaged ship
+        self.manager.check_damaged_drone()
+        # Check defenders timer
+        # self.manager.check_defender_timer()
+        # Give role to IDLE drone
+        self.manager.give_role_idle_drone()
+
+        # Order conqueror to conquer
+        self.manager.order_conquerors()
+        # Order attackers to attack
+        self.manager.order_assassin()
+        # Order attackers to attack
+        self.manager.order_attacker()
+        # Order squads
+        self.manager.order_squad()
+        # Order defender to defend
+        self.manager.order_defender()
+        # Order miner to mine
+        self.manager.order_miner()
+
+        # Create all commands
+        return self.manager.create_command_queue()
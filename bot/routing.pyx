@@ -0,0 +1,413 @@
+from libc.math cimport sqrt, M_PI, sin, cos, ceil, INFINITY
+from libc.stdlib cimport malloc, free
+from bot.navigation import Circle
+from bot.settings import ROUTING_NODES_PER_PLANET, ROUTING_MARGIN, FLOW_CELL_SIZE, FLOW_MAX_STEPS
+from hlt.constants import SHIP_RADIUS
+
+
+cdef class PlanetGraph:
+    """
+    Visibility graph around the planets, for the navigations a planet blocks. Planets never move:
+    the graph & the shortest paths between its waypoints are computed once (when hlt.Game is initialized)
+    and reused every turn, until a planet is destroyed (see Map.planet_graph).
+
+    Every planet is surrounded by ROUTING_NODES_PER_PLANET waypoints, on the polygon circumscribed to the planet
+    padded by SHIP_RADIUS + ROUTING_MARGIN: the sides of the polygon never cross the padded planet. Two waypoints
+    are linked if the segment between them doesn't cross any padded planet.
+
+    :ivar nb_planets: The number of planets of the graph
+    :ivar nb_nodes: The number of waypoints
+    """
+    cdef readonly int nb_planets
+    cdef readonly int nb_nodes
+    cdef double *planet_x
+    cdef double *planet_y
+    # The planet itself & the planet padded
+    cdef double *planet_radius
+    cdef double *padded_radius
+    cdef double *node_x
+    cdef double *node_y
+    # Length of the shortest path between 2 waypoints, nb_nodes x nb_nodes, INFINITY if there is none
+    cdef double *path_length
+
+    def __cinit__(self):
+        self.planet_x = NULL
+        self.planet_y = NULL
+        self.planet_radius = NULL
+        self.padded_radius = NULL
+        self.node_x = NULL
+        self.node_y = NULL
+        self.path_length = NULL
+
+    def __init__(self, game_map, int nodes_per_planet=ROUTING_NODES_PER_PLANET, double margin=ROUTING_MARGIN):
+        """
+        :param game_map: The map, only its planets & dimensions are used
+        :param nodes_per_planet: The number of waypoints around a planet
+        :param margin: The distance kept between a ship & a planet, in addition to the radius of the ship
+        """
+        planets = game_map.all_planets()
+        self.nb_planets = len(planets)
+        cdef int size = max(self.nb_planets, 1)
+        self.planet_x = <double *> malloc(size * sizeof(double))
+        self.planet_y = <double *> malloc(size * sizeof(double))
+        self.planet_radius = <double *> malloc(size * sizeof(double))
+        self.padded_radius = <double *> malloc(size * sizeof(double))
+        self.node_x = <double *> malloc(size * nodes_per_planet * sizeof(double))
+        self.node_y = <double *> malloc(size * nodes_per_planet * sizeof(double))
+
+        cdef int i = 0
+        for planet in planets:
+            self.planet_x[i] = planet.pos.x
+            self.planet_y[i] = planet.pos.y
+            self.planet_radius[i] = planet.pos.radius
+            self.padded_radius[i] = planet.pos.radius + SHIP_RADIUS + margin
+            i += 1
+
+        # The waypoints, except the ones inside another planet or too close to the border of the map
+        cdef double width = game_map.width
+        cdef double height = game_map.height
+        cdef double corner, angle, x, y
+        cdef int k, j
+        cdef bint inside
+        self.nb_nodes = 0
+        for i in range(self.nb_planets):
+            # A bit further than the corner of the polygon, for the rounding of the moves
+            corner = self.padded_radius[i] / cos(M_PI / nodes_per_planet) + 0.01
+            for k in range(nodes_per_planet):
+                angle = 2 * M_PI * k / nodes_per_planet
+                x = self.planet_x[i] + corner * cos(angle)
+                y = self.planet_y[i] + corner * sin(angle)
+                if x < 1 or y < 1 or x + 1 > width or y + 1 > height:
+                    continue
+                inside = False
+                for j in range(self.nb_planets):
+                    if (x - self.planet_x[j]) ** 2 + (y - self.planet_y[j]) ** 2 <= self.padded_radius[j] ** 2:
+                        inside = True
+                        break
+                if not inside:
+                    self.node_x[self.nb_nodes] = x
+                    self.node_y[self.nb_nodes] = y
+                    self.nb_nodes += 1
+
+        self.compute_paths()
+
+    def __dealloc__(self):
+        free(self.planet_x)
+        free(self.planet_y)
+        free(self.planet_radius)
+        free(self.padded_radius)
+        free(self.node_x)
+        free(self.node_y)
+        free(self.path_length)
+
+    cdef void compute_paths(self):
+        """
+        The visibility edges, then the length of every shortest path (Floyd-Warshall)
+        """
+        cdef int n = self.nb_nodes
+        self.path_length = <double *> malloc(max(n * n, 1) * sizeof(double))
+        cdef int a, b, c
+        cdef double length, through
+        for a in range(n):
+            self.path_length[a * n + a] = 0.0
+            for b in range(a + 1, n):
+                if self.blocked(self.node_x[a], self.node_y[a], self.node_x[b], self.node_y[b]):
+                    length = INFINITY
+                else:
+                    length = sqrt((self.node_x[a] - self.node_x[b]) ** 2 + (self.node_y[a] - self.node_y[b]) ** 2)
+                self.path_length[a * n + b] = length
+                self.path_length[b * n + a] = length
+        for c in range(n):
+            for a in range(n):
+                if self.path_length[a * n + c] == INFINITY:
+                    continue
+                for b in range(n):
+                    through = self.path_length[a * n + c] + self.path_length[c * n + b]
+                    if through < self.path_length[a * n + b]:
+                        self.path_length[a * n + b] = through
+
+    cdef bint blocked(self, double start_x, double start_y, double end_x, double end_y):
+        """
+        Whether the segment crosses a padded planet. A planet whose padding contains an end of the segment
+        (a ship close to a planet, a target on its surface) only blocks the segment crossing the planet itself.
+        """
+        cdef double dx = end_x - start_x
+        cdef double dy = end_y - start_y
+        cdef double length = dx * dx + dy * dy
+        cdef double t, closest_x, closest_y, radius
+        cdef int i
+        for i in range(self.nb_planets):
+            radius = self.padded_radius[i]
+            if (start_x - self.planet_x[i]) ** 2 + (start_y - self.planet_y[i]) ** 2 < radius ** 2 or \
+                    (end_x - self.planet_x[i]) ** 2 + (end_y - self.planet_y[i]) ** 2 < radius ** 2:
+                radius = self.planet_radius[i]
+            # Bounding boxes first, most planets are far from the segment
+            if min(start_x, end_x) > self.planet_x[i] + radius or max(start_x, end_x) < self.planet_x[i] - radius or \
+                    min(start_y, end_y) > self.planet_y[i] + radius or max(start_y, end_y) < self.planet_y[i] - radius:
+                continue
+            t = 0.0
+            if length > 0:
+                t = ((self.planet_x[i] - start_x) * dx + (self.planet_y[i] - start_y) * dy) / length
+                t = min(max(t, 0.0), 1.0)
+            closest_x = start_x + t * dx
+            closest_y = start_y + t * dy
+            if (closest_x - self.planet_x[i]) ** 2 + (closest_y - self.planet_y[i]) ** 2 <= radius ** 2:
+                return True
+        return False
+
+    cpdef bint crosses(self, start, end):
+        """
+        Whether a planet is in the way between 2 positions, as first_waypoint tests it
+
+        :param start: The position of the ship
+        :param end: The target of the ship
+        :rtype: bool
+        """
+        return self.blocked(start.x, start.y, end.x, end.y)
+
+    cpdef first_waypoint(self, start, end):
+        """
+        The first waypoint of the shortest path between 2 positions, around the planets
+
+        :param start: The position of the ship
+        :param end: The target of the ship
+        :return: The waypoint to navigate to, None if no planet is in the way (or if there is no path)
+        :rtype: Circle
+        """
+        cdef double start_x = start.x
+        cdef double start_y = start.y
+        cdef double end_x = end.x
+        cdef double end_y = end.y
+        if not self.blocked(start_x, start_y, end_x, end_y):
+            return None
+
+        cdef int n = self.nb_nodes
+        # The waypoints seen from the target, with their distance to the target
+        cdef int *to_end = <int *> malloc(max(n, 1) * sizeof(int))
+        cdef double *to_end_length = <double *> malloc(max(n, 1) * sizeof(double))
+        cdef int nb_to_end = 0
+        cdef int a, b, k, best = -1
+        cdef double from_start, length, best_length = INFINITY
+        try:
+            for b in range(n):
+                if not self.blocked(self.node_x[b], self.node_y[b], end_x, end_y):
+                    to_end[nb_to_end] = b
+                    to_end_length[nb_to_end] = sqrt((self.node_x[b] - end_x) ** 2 + (self.node_y[b] - end_y) ** 2)
+                    nb_to_end += 1
+            if nb_to_end == 0:
+                return None
+            for a in range(n):
+                from_start = sqrt((self.node_x[a] - start_x) ** 2 + (self.node_y[a] - start_y) ** 2)
+                # Not better than the best path, even straight to the target
+                if from_start >= best_length or self.blocked(start_x, start_y, self.node_x[a], self.node_y[a]):
+                    continue
+                for k in range(nb_to_end):
+                    length = from_start + self.path_length[a * n + to_end[k]] + to_end_length[k]
+                    if length < best_length:
+                        best_length = length
+                        best = a
+        finally:
+            free(to_end)
+            free(to_end_length)
+        if best < 0:
+            return None
+        return Circle(self.node_x[best], self.node_y[best])
+
+
+cdef inline void heap_push(double *keys, int *cells, int *size, double key, int cell):
+    """
+    Add a cell to the binary heap of the cells to visit, by distance
+    """
+    cdef int i = size[0]
+    cdef int parent
+    size[0] += 1
+    while i > 0:
+        parent = (i - 1) // 2
+        if keys[parent] <= key:
+            break
+        keys[i] = keys[parent]
+        cells[i] = cells[parent]
+        i = parent
+    keys[i] = key
+    cells[i] = cell
+
+
+cdef inline int heap_pop(double *keys, int *cells, int *size):
+    """
+    Remove the closest cell from the binary heap
+
+    :return: The cell, its distance was in keys[0]
+    """
+    cdef int top = cells[0]
+    size[0] -= 1
+    cdef int n = size[0]
+    cdef double key = keys[n]
+    cdef int cell = cells[n]
+    cdef int i = 0
+    cdef int child
+    while True:
+        child = 2 * i + 1
+        if child >= n:
+            break
+        if child + 1 < n and keys[child + 1] < keys[child]:
+            child += 1
+        if keys[child] >= key:
+            break
+        keys[i] = keys[child]
+        cells[i] = cells[child]
+        i = child
+    if n > 0:
+        keys[i] = key
+        cells[i] = cell
+    return top
+
+
+cdef class FlowField:
+    """
+    Distance to a target on a coarse grid around the planets, padded as in PlanetGraph. Built once for all the drones
+    going to the same target (see Map.flow_field): every drone then reads its next heading from the cell it's in,
+    instead of searching its own route.
+
+    The cells around the target are the goal, then a Dijkstra over the 8 neighbours of every cell gives the distance
+    to the goal & the next cell toward it. The cells whose center is inside a padded planet are never crossed.
+
+    :ivar nb_columns: The number of columns of the grid
+    :ivar nb_rows: The number of rows of the grid
+    :ivar cell_size: The size of a cell
+    """
+    cdef readonly int nb_columns
+    cdef readonly int nb_rows
+    cdef readonly double cell_size
+    # Distance to the goal of every cell, INFINITY if it can't reach the goal
+    cdef double *distance
+    # The next cell toward the goal, -1 for the goal
+    cdef int *next_cell
+
+    def __cinit__(self):
+        self.distance = NULL
+        self.next_cell = NULL
+
+    def __init__(self, game_map, target, double cell_size=FLOW_CELL_SIZE, double margin=ROUTING_MARGIN):
+        """
+        :param game_map: The map, only its planets & dimensions are used
+        :param target: The position of the target, with its radius
+        :param cell_size: The size of a cell
+        :param margin: The distance kept between a ship & a planet, in addition to the radius of the ship
+        """
+        self.cell_size = cell_size
+        self.nb_columns = max(<int> ceil(game_map.width / cell_size), 1)
+        self.nb_rows = max(<int> ceil(game_map.height / cell_size), 1)
+        cdef int nb_cells = self.nb_columns * self.nb_rows
+        self.distance = <double *> malloc(nb_cells * sizeof(double))
+        self.next_cell = <int *> malloc(nb_cells * sizeof(int))
+        cdef char *blocked = <char *> malloc(nb_cells * sizeof(char))
+        # A cell is pushed at most once per neighbour, plus the goal
+        cdef double *keys = <double *> malloc((8 * nb_cells + 1) * sizeof(double))
+        cdef int *cells = <int *> malloc((8 * nb_cells + 1) * sizeof(int))
+        cdef int size = 0
+        cdef int i, column, row, cell, neighbour, d_column, d_row
+        cdef double x, y, radius, length
+        try:
+            for i in range(nb_cells):
+                self.distance[i] = INFINITY
+                self.next_cell[i] = -1
+                blocked[i] = 0
+            for planet in game_map.all_planets():
+                x = planet.pos.x
+                y = planet.pos.y
+                radius = planet.pos.radius + SHIP_RADIUS + margin
+                for row in range(self.row_of(y - radius), self.row_of(y + radius) + 1):
+                    for column in range(self.column_of(x - radius), self.column_of(x + radius) + 1):
+                        if ((column + 0.5) * cell_size - x) ** 2 + ((row + 0.5) * cell_size - y) ** 2 <= radius ** 2:
+                            blocked[row * self.nb_columns + column] = 1
+
+            # The goal: the cells close enough to the target, just outside its padding for a planet
+            x = target.x
+            y = target.y
+            radius = target.radius + SHIP_RADIUS + margin + cell_size
+            for row in range(self.row_of(y - radius), self.row_of(y + radius) + 1):
+                for column in range(self.column_of(x - radius), self.column_of(x + radius) + 1):
+                    cell = row * self.nb_columns + column
+                    if not blocked[cell] and \
+                            ((column + 0.5) * cell_size - x) ** 2 + ((row + 0.5) * cell_size - y) ** 2 <= radius ** 2:
+                        self.distance[cell] = 0.0
+                        heap_push(keys, cells, &size, 0.0, cell)
+
+            while size > 0:
+                length = keys[0]
+                cell = heap_pop(keys, cells, &size)
+                # Already reached by a shorter path
+                if length > self.distance[cell]:
+                    continue
+                column = cell % self.nb_columns
+                row = cell // self.nb_columns
+                for d_row in range(-1, 2):
+                    if row + d_row < 0 or row + d_row >= self.nb_rows:
+                        continue
+                    for d_column in range(-1, 2):
+                        if column + d_column < 0 or column + d_column >= self.nb_columns or \
+                                (d_row == 0 and d_column == 0):
+                            continue
+                        neighbour = cell + d_row * self.nb_columns + d_column
+                        if blocked[neighbour]:
+                            continue
+                        if d_row != 0 and d_column != 0:
+                            length = self.distance[cell] + cell_size * 1.4142135623730951
+                        else:
+                            length = self.distance[cell] + cell_size
+                        if length < self.distance[neighbour]:
+                            self.distance[neighbour] = length
+                            self.next_cell[neighbour] = cell
+                            heap_push(keys, cells, &size, length, neighbour)
+        finally:
+            free(blocked)
+            free(keys)
+            free(cells)
+
+    def __dealloc__(self):
+        free(self.distance)
+        free(self.next_cell)
+
+    cdef inline int column_of(self, double x):
+        return min(max(<int> (x / self.cell_size), 0), self.nb_columns - 1)
+
+    cdef inline int row_of(self, double y):
+        return min(max(<int> (y / self.cell_size), 0), self.nb_rows - 1)
+
+    cpdef double distance_from(self, start):
+        """
+        :param start: A position on the map
+        :return: The length of the path from the cell of the position to the target, INFINITY if there is none
+        :rtype: float
+        """
+        return self.distance[self.row_of(start.y) * self.nb_columns + self.column_of(start.x)]
+
+    cpdef next_target(self, start, PlanetGraph graph, int max_steps=FLOW_MAX_STEPS):
+        """
+        The position to navigate to: the farthest cell along the flow field in sight of the ship, so the ship
+        goes straight along the planets instead of following the 8 directions of the grid
+
+        :param start: The position of the ship
+        :param graph: The planet graph of the map, to test the sight of the ship
+        :param max_steps: The max number of cells followed
+        :return: The center of the cell, None if the ship is in the goal or in a cell without path
+        :rtype: Circle
+        """
+        cdef int cell = self.row_of(start.y) * self.nb_columns + self.column_of(start.x)
+        if self.next_cell[cell] < 0:
+            return None
+        cdef double start_x = start.x
+        cdef double start_y = start.y
+        cdef int visible = self.next_cell[cell]
+        cdef int i
+        cell = visible
+        for i in range(max_steps):
+            if self.next_cell[cell] < 0:
+                break
+            cell = self.next_cell[cell]
+            if graph.blocked(start_x, start_y, (cell % self.nb_columns + 0.5) * self.cell_size,
+                             (cell // self.nb_columns + 0.5) * self.cell_size):
+                break
+            visible = cell
+        return Circle((visible % self.nb_columns + 0.5) * self.cell_size,
+                      (visible // self.nb_columns + 0.5) * self.cell_size)
@@ -68,21 +68,55 @@ MAX_TURN_DEFENDER = 5
 # Threat score calculation: distance * DISTANCE_WEIGHT + threat * THREAT_WEIGHT
 DISTANCE_WEIGHT = 2
 THREAT_WEIGHT = 1
+# Size of the cells of the grid of the enemy ships, for the nearest ship of a drone
+SHIP_INDEX_CELL = 16
 
 # Planet score
 SCORE_NB_DOCKING_SPOTS = 1
 SCORE_NB_SHIP_ONGOING = 1
 SCORE_DISTANCE_CENTER = 0.05
 
-# Distance after which we don't need to look for ship during navigation
-NAVIGATION_SHIP_DISTANCE = 90
-
 GHOST_RATIO_RADIUS = 1.6
 """"
 # Navigation parameters
 """
 # The radius the assassin tries to avoid enemy ship, 7+? 14+?
 ASSASSIN_AVOID_RADIUS = 7
+# Size of the cells of the obstacle grid, a navigation only looks at the obstacles of the cells along its path
+NAVIGATION_GRID_CELL = 8
+# Test the corrections of a navigation in a single sweep instead of one angle after the other
+NAVIGATION_SWEEP = True
+# Corrections tested one by one before the sweep: most navigations find their way in a few degrees
+NAVIGATION_SWEEP_AFTER = 8
+# Max distance to the target of a sweep, farther the obstacles to gather cost more than the angles tested one by one
+NAVIGATION_SWEEP_DISTANCE = 60
+# The drones go around the planets on the waypoints of the planet graph (bot/routing.pyx) instead of only turning,
+# passed to Ship.navigate by the manager & the solver: the other hlt bots never route
+NAVIGATION_ROUTING = True
+# Number of waypoints around a planet
+ROUTING_NODES_PER_PLANET = 12
+# Distance kept by the waypoints between a ship and a planet, in addition to the radius of the ship
+ROUTING_MARGIN = 1.0
+# Share a flow field (bot/routing.pyx) between the drones going to the same target, instead of a route per drone,
+# passed to Ship.navigate with NAVIGATION_ROUTING
+NAVIGATION_FLOW = True
+# Size of the cells of a flow field
+FLOW_CELL_SIZE = 4
+# Number of drones going to a target this turn before its flow field is built
+FLOW_MIN_DRONES = 3
+# Max number of cells followed along the flow field for the next heading, the farthest one in sight is kept
+FLOW_MAX_STEPS = 32
+# Solve the moves of all the drones at once (bot/solver.pyx) instead of navigating them one after the other
+NAVIGATION_SOLVER = True
+# Max number of headings tried by a drone when the moves are solved
+SOLVER_CANDIDATES = 4
+# Min difference between 2 headings of a drone, in degrees: close headings conflict with the same moves
+SOLVER_CANDIDATE_SPREAD = 10
+# Anytime navigation: every drone first gets a coarse move, the time left refines them by priority,
+# and the drones still move once the turn is over MAX_TURN_DURATION
+NAVIGATION_ANYTIME = True
+# Step between the headings of the coarse navigation, in degrees
+ANYTIME_ANGULAR_STEP = 15
 
 """
 # Influence parameters
@@ -0,0 +1,242 @@
+import logging
+from time import perf_counter
+
+from libc.math cimport sin, cos, round, M_PI
+from bot.navigation import Circle, calculate_angle_between, calculate_distance_between, \
+    obstacles_between
+from bot.settings import GHOST_RATIO_RADIUS, SOLVER_CANDIDATES, SOLVER_CANDIDATE_SPREAD, INTERMEDIATE_RATIO, \
+    NAVIGATION_ANYTIME, ANYTIME_ANGULAR_STEP, NAVIGATION_ROUTING, NAVIGATION_FLOW
+
+logger = logging.getLogger("bot")
+
+
+class MoveRequest(object):
+    """
+    The navigation wanted by a drone this turn, solved with the ones of the other drones (see solve_moves)
+
+    :ivar ship: The ship to move
+    :ivar target_pos: The position to navigate to (the first waypoint if a planet is in the way)
+    :ivar intermediate_pos: The position of the intermediate navigation, if no path is found to target_pos
+    :ivar speed: The max speed of the move
+    :ivar assassin: Whether the ship is an assassin
+    :ivar candidates: The possible moves of the ship, as (speed, angle), the best first
+    :ivar coarse: Whether the candidates come from a coarse scan that had to turn: a finer one finds better headings
+    """
+
+    def __init__(self, ship, target, game_map, speed, assassin=False, closest=False):
+        """
+        :param ship: The ship to move
+        :param target: The target of the ship
+        :param game_map: The game_map of the turn
+        :param speed: The max speed of the move
+        :param assassin: Whether the ship is an assassin
+        :param closest: Navigate to the closest point of the target instead of its position
+        """
+        self.ship = ship
+        self.target_pos, self.intermediate_pos = ship.navigation_target(target, game_map, speed, closest=closest,
+                                                                        routing=NAVIGATION_ROUTING,
+                                                                        flow=NAVIGATION_FLOW)
+        self.speed = speed
+        self.assassin = assassin
+        self.candidates = []
+        self.coarse = False
+
+
+cdef list scan_headings(ship, target, game_map, double speed, int max_corrections, int angular_step, bint assassin,
+                        int nb_candidates, double spread, bint *straight):
+    """
+    The headings without planet nor ship up to the target, in the order of the corrections of navigate.
+    The ghosts are not tested: the moves of my ships are solved together.
+    A heading is only kept if it is at least spread degrees away from the ones kept before it.
+
+    :return: The moves, as (speed, angle), straight is set if the first one goes straight to the target
+    """
+    cdef list moves = []
+    straight[0] = False
+    if max_corrections <= 0:
+        return moves
+    cdef double distance = calculate_distance_between(ship, target)
+    cdef int angle = int(round(calculate_angle_between(ship, target)))
+    speed = speed if (distance >= speed) else distance
+    new_target = target
+    cdef int da = 0
+    cdef int direction = 1
+    cdef int new_angle = angle
+    cdef int difference
+    while True:
+        if not obstacles_between(ship, new_target, game_map, ignore_ghosts=True, assassin=assassin):
+            for _, kept_angle in moves:
+                difference = abs(new_angle - kept_angle) % 360
+                if min(difference, 360 - difference) < spread:
+                    break
+            else:
+                if da == 0:
+                    straight[0] = True
+                moves.append((speed, new_angle))
+                if len(moves) == nb_candidates:
+                    return moves
+        da += angular_step
+        if da > max_corrections:
+            return moves
+        direction = -1 * direction
+        new_angle = angle + da * direction
+        if new_angle < 0:
+            new_angle = 360 + new_angle
+        new_angle = new_angle % 360
+        new_target = Circle(ship.x + cos(new_angle * M_PI / 180.0) * distance,
+                            ship.y + sin(new_angle * M_PI / 180.0) * distance, target.radius)
+
+
+def candidate_moves(request, game_map, int max_corrections=90, int angular_step=1, int nb_candidates=SOLVER_CANDIDATES,
+                    double spread=SOLVER_CANDIDATE_SPREAD):
+    """
+    The possible moves of a ship: the headings toward its target (or toward its intermediate position if there is
+    none, as Ship.navigate), then the best heading slowed down, to let the other ships pass.
+    Sets request.coarse if a finer angular_step could find better headings.
+
+    :param MoveRequest request: The navigation of the ship
+    :param game_map: The game_map of the turn
+    :param max_corrections: The max correction of the heading, in degrees
+    :param angular_step: The step between 2 headings tried, in degrees
+    :param nb_candidates: The max number of headings
+    :param spread: The min difference between 2 headings, in degrees
+    :return: The moves, as (speed, angle), the best first
+    :rtype: list[(float, int)]
+    """
+    cdef bint straight
+    ship = request.ship
+    moves = scan_headings(ship.pos, request.target_pos, game_map, request.speed, max_corrections, angular_step,
+                          request.assassin, nb_candidates, spread, &straight)
+    if not moves:
+        new_target, new_speed = ship.intermediate_target(request.intermediate_pos, request.speed)
+        moves = scan_headings(ship.pos, new_target, game_map, new_speed, max_corrections + 30, angular_step,
+                              request.assassin, nb_candidates, spread, &straight)
+        straight = False
+    request.coarse = angular_step > 1 and not straight
+    if moves:
+        speed, angle = moves[0]
+        moves.append((speed * INTERMEDIATE_RATIO, angle))
+    return moves
+
+
+cdef ghost_of(ship, double speed, int angle):
+    """
+    The future position of the ship, as navigate computes it
+    """
+    return Circle(ship.x + cos(angle * M_PI / 180.0) * speed, ship.y + sin(angle * M_PI / 180.0) * speed,
+                  ship.radius * GHOST_RATIO_RADIUS)
+
+
+def solve_moves(requests, game_map, time_left):
+    """
+    Give a move to every ship at once, instead of one after the other with the ghosts of the previous ones:
+        - the candidate moves of every ship are found, without looking at my other ships' moves.
+          With NAVIGATION_ANYTIME, a coarse scan gives candidates to every ship first, then the time left refines
+          the ships that had to turn, by priority. Otherwise the last ships are not moved once the time is spent.
+        - the most constrained ships (the fewest candidates) choose first, the first candidate without conflict
+          with the moves already chosen (see ObstacleGrid.ghost_conflict)
+        - a ship without move takes the move of a candidate if the only ship in conflict with it
+          can switch to another of its candidates
+    The moves are added as ghosts to the game_map as they are chosen, its obstacle grid finds the ghosts close to
+    a candidate.
+
+    :param list[MoveRequest] requests: The navigation of every ship, by priority
+    :param game_map: The game_map of the turn
+    :param float time_left: The time left in the turn, in seconds
+    :return: The thrust commands
+    :rtype: list[str]
+    """
+    deadline = perf_counter() + time_left
+    # The moves chosen, after the ghosts already in the map
+    grid = game_map.obstacle_grid()
+    nb_fixed = len(game_map.ghost_store())
+
+    if NAVIGATION_ANYTIME:
+        for request in requests:
+            request.candidates = candidate_moves(request, game_map, angular_step=ANYTIME_ANGULAR_STEP)
+        nb_coarse = sum(1 for request in requests if request.coarse)
+        nb_refined = 0
+        for request in requests:
+            if not request.coarse:
+                continue
+            if perf_counter() > deadline:
+                logger.warning("No time left to refine the moves of %s ships" % (nb_coarse - nb_refined))
+                break
+            request.candidates = candidate_moves(request, game_map)
+            nb_refined += 1
+        nb_requests = len(requests)
+    else:
+        nb_requests = 0
+        for request in requests:
+            if nb_requests % 10 == 0 and perf_counter() > deadline:
+                logger.warning("No time left to solve the moves of %s ships" % (len(requests) - nb_requests))
+                break
+            request.candidates = candidate_moves(request, game_map)
+            nb_requests += 1
+        requests = requests[:nb_requests]
+
+    # The candidate & the ghost chosen for every ship, the ship of every ghost
+    chosen = [-1] * nb_requests
+    ghost_indices = [-1] * nb_requests
+    owners = {}
+    without_move = []
+    order = sorted(range(nb_requests), key=lambda i: len(requests[i].candidates))
+    for i in order:
+        ship = requests[i].ship.pos
+        fudge = ship.radius + 0.1
+        for k, (speed, angle) in enumerate(requests[i].candidates):
+            ghost = ghost_of(ship, speed, angle)
+            if grid.ghost_conflict(ship.x, ship.y, ghost.x, ghost.y, ghost.radius, fudge) < 0:
+                chosen[i] = k
+                ghost_indices[i] = game_map.add_ghost((ship, ghost))
+                owners[ghost_indices[i]] = i
+                break
+        else:
+            if requests[i].candidates:
+                without_move.append(i)
+
+    # Repair: move the only ship in the way to another of its candidates
+    for i in without_move:
+        ship = requests[i].ship.pos
+        fudge = ship.radius + 0.1
+        for k, (speed, angle) in enumerate(requests[i].candidates):
+            ghost = ghost_of(ship, speed, angle)
+            j = grid.ghost_conflict(ship.x, ship.y, ghost.x, ghost.y, ghost.radius, fudge)
+            if j >= 0:
+                if j < nb_fixed or grid.ghost_conflict(ship.x, ship.y, ghost.x, ghost.y, ghost.radius, fudge,
+                                                       first=j + 1) >= 0:
+                    continue
+                other = owners[j]
+                other_ship = requests[other].ship.pos
+                other_fudge = other_ship.radius + 0.1
+                previous_speed, previous_angle = requests[other].candidates[chosen[other]]
+                previous = ghost_of(other_ship, previous_speed, previous_angle)
+                for other_k, (other_speed, other_angle) in enumerate(requests[other].candidates):
+                    if other_k == chosen[other]:
+                        continue
+                    other_ghost = ghost_of(other_ship, other_speed, other_angle)
+                    if grid.ghost_conflict(other_ship.x, other_ship.y, other_ghost.x, other_ghost.y,
+                                           other_ghost.radius, other_fudge, skip=j) >= 0:
+                        continue
+                    grid.replace_ghost(j, other_ghost)
+                    if grid.ghost_conflict(ship.x, ship.y, ghost.x, ghost.y, ghost.radius, fudge) < 0:
+                        chosen[other] = other_k
+                        break
+                    grid.replace_ghost(j, previous)
+                else:
+                    continue
+            chosen[i] = k
+            ghost_indices[i] = game_map.add_ghost((ship, ghost))
+            owners[ghost_indices[i]] = i
+            break
+
+    command_queue = []
+    for i, request in enumerate(requests):
+        ship = request.ship
+        if chosen[i] < 0:
+            # No move, as navigate without path
+            command_queue.append(ship.thrust(0, 0))
+            continue
+        speed, angle = request.candidates[chosen[i]]
+        command_queue.append(ship.thrust(speed, angle))
+    return command_queue
@@ -1,13 +1,115 @@
 import logging
 
+import numpy as np
+
+from bot.distances import ShipIndex
 from bot.drone import DroneRole, TargetType
 from bot.navigation import Circle, calculate_distance_between
-from bot.settings import SQUAD_SCATTERED_THRESHOLD
+from bot.settings import SQUAD_SCATTERED_THRESHOLD, SQUAD_DISTANCE_CREATION, SQUAD_SIZE
 from hlt.entity import Position
 
 logger = logging.getLogger("squad")
 
 
+def cluster_drones(drones, distance=SQUAD_DISTANCE_CREATION):
+    """
+    Group the drones closer than distance to each other, or linked by a chain of such drones,
+    with the grid of a ShipIndex: a drone is only compared with the drones of the cells around it
+
+    :param list drones: The drones to group
+    :param float distance: The distance under which 2 drones are in the same group
+    :return: The groups, every drone of a group in the order of drones
+    :rtype: list[list]
+    """
+    if not drones:
+        return []
+    x = np.array([drone.ship.pos.x for drone in drones], dtype=np.float64)
+    y = np.array([drone.ship.pos.y for drone in drones], dtype=np.float64)
+    nobody = np.zeros(len(drones), dtype=np.int64)
+    index = ShipIndex(x, y, nobody, nobody, x.max() + 1, y.max() + 1, distance)
+    clusters = {}
+    for drone, group in zip(drones, index.groups(distance)):
+        clusters.setdefault(group, []).append(drone)
+    return list(clusters.values())
+
+
+def strip_order(drone):
+    """
+    The drones in vertical strips as wide as SQUAD_DISTANCE_CREATION, from the left, going up & down the strips
+    alternately: the drones next to each other in this order are close to each other
+
+    :return: The sort key of the drone
+    :rtype: (int, float)
+    """
+    strip = int(drone.ship.pos.x // SQUAD_DISTANCE_CREATION)
+    return strip, drone.ship.pos.y if strip % 2 == 0 else -drone.ship.pos.y
+
+
+def form_squads(drones):
+    """
+    Put the squadless drones in squads of at most SQUAD_SIZE, with the drones of their group (see cluster_drones).
+    The existing squads are kept: the squadless drones first join the squads of their group that are not full,
+    the closest one first, the others are split in new squads of consecutive drones along the strips of
+    strip_order.
+
+    :param list drones: The drones that can be in a squad, with or without one
+    :return: The new squads
+    :rtype: list[Squad]
+    """
+    new_squads = []
+    if all(drone.squad is not None for drone in drones):
+        return new_squads
+    for cluster in cluster_drones(drones):
+        if len(cluster) < 2:
+            continue
+        squadless = [drone for drone in cluster if drone.squad is None]
+        if not squadless:
+            continue
+        # The squads of the group that are not full
+        squads = []
+        for drone in cluster:
+            if drone.squad is not None and drone.squad not in squads and drone.squad.nb_members() < SQUAD_SIZE:
+                squads.append(drone.squad)
+        if squads:
+            centers = [squad.gravitational_center() for squad in squads]
+            remaining = []
+            for drone in squadless:
+                # The closest squad with room
+                best_squad = None
+                min_distance = None
+                for squad, center in zip(squads, centers):
+                    if squad.nb_members() >= SQUAD_SIZE:
+                        continue
+                    distance = calculate_distance_between(drone.ship.pos, center)
+                    if min_distance is None or distance < min_distance:
+                        min_distance = distance
+                        best_squad = squad
+                if best_squad is not None:
+                    logging.debug("Squad exist and not full, joining it")
+                    best_squad.add_member(drone)
+                else:
+                    remaining.append(drone)
+            squadless = remaining
+        if len(squadless) < 2:
+            # A drone alone doesn't make a squad
+            continue
+        # Balanced squads in one pass: consecutive drones along the strips (see strip_order)
+        squadless.sort(key=strip_order)
+        nb_squads = -(-len(squadless) // SQUAD_SIZE)
+        start = 0
+        for nb_left in range(nb_squads, 0, -1):
+            size = -(-(len(squadless) - start) // nb_left)
+            members = squadless[start:start + size]
+            start += size
+            logging.debug("Squad doesn't exist or is full, create it")
+            new_squad = Squad()
+            for drone in members:
+                new_squad.add_member(drone)
+            new_squad.promote_new_leader()
+            new_squads.append(new_squad)
+    return new_squads
+
+
 class Squad(object):
     """
     Contains a group of drone that share the same target and movement
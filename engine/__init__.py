@@ -0,0 +1,15 @@
+"""
+Local Halite II engine, a replacement of halite.exe running anywhere python & numpy do
+
+    - game.py: the rules, GameState is advanced one turn at a time from the parsed commands
+    - physics.py: the vectorized movement, collisions & attacks
+    - mapgen.py: the symmetric maps
+    - runner.py: the bots as sub-processes, speaking the Halite protocol
+    - inprocess.py: the bots as python objects in the engine process, their map is updated from the arrays
+
+See __main__.py for the command line.
+"""
+
+from . import constants, game, inprocess, mapgen, physics, runner
+
+from .game import GameState, parse_commands
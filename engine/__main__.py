@@ -0,0 +1,46 @@
+"""
+Play a game with the local engine, same options as halite.exe:
+    python -m engine -d "240 160" -s 42 "python3 MyBot.py" "python3 opponents/ClosestTargetBot.py"
+Or with the bots in the engine process, given by policy name (see engine/inprocess.py):
+    python -m engine -i -d "240 160" -s 42 rampa closest
+"""
+import argparse
+import json
+import random
+
+from .inprocess import load_policy, run_game_inprocess
+from .runner import run_game, statistics
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Local Halite II engine")
+    parser.add_argument("bots", nargs="+", help="shell command (or policy name with -i) of every bot, from 1 to 4 bots")
+    parser.add_argument("-d", "--dimensions", default="240 160", help='map dimensions, like "240 160"')
+    parser.add_argument("-s", "--seed", type=int, default=None, help="seed of the map generator")
+    parser.add_argument("-t", "--no-timeout", action="store_true", help="don't eliminate the slow bots")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the statistics, as JSON")
+    parser.add_argument("-i", "--in-process", action="store_true", help="play the bots in this process, by policy name")
+    parser.add_argument("-r", "--no-replay", action="store_true", help="ignored, there are no replays")
+    args = parser.parse_args()
+    if not 1 <= len(args.bots) <= 4:
+        parser.error("from 1 to 4 bots")
+
+    width, height = (int(value) for value in args.dimensions.split())
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    if args.in_process:
+        policies = [load_policy(name) for name in args.bots]
+        state, bots = run_game_inprocess(policies, width, height, seed, timeouts=not args.no_timeout)
+    else:
+        state, bots = run_game(args.bots, width, height, seed, timeouts=not args.no_timeout)
+    stats = statistics(state, bots)
+    if args.quiet:
+        print(json.dumps(stats))
+        return
+    print("Map seed was %s, %s turns played" % (seed, state.turn))
+    for player_id, player_stats in sorted(stats["stats"].items(), key=lambda item: item[1]["rank"]):
+        print("Player #%s, %s, came in rank #%s and was last alive on frame #%s!" % (
+            player_id, player_stats["name"], player_stats["rank"], player_stats["last_frame_alive"]))
+
+
+if __name__ == '__main__':
+    main()
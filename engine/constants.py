@@ -0,0 +1,28 @@
+"""
+Rules of the local engine.
+The values shared with the bots come from hlt/constants.py, the others are only known by the engine.
+"""
+from hlt.constants import *
+
+#: Production needed to create a new ship
+PRODUCTION_PER_SHIP = 72
+#: Health of a planet, per unit of radius
+PLANET_HEALTH_PER_RADIUS = 255
+#: Resources of a planet per unit of radius, only reported: the resources are infinite
+RESOURCES_PER_RADIUS = 144
+#: Damage of an explosion at the surface of the planet, decreasing linearly to 0 at EXPLOSION_RADIUS
+EXPLOSION_DAMAGE = MAX_SHIP_HEALTH
+#: Number of ships of each player at the start of the game
+NB_STARTING_SHIPS = 3
+#: The game lasts BASE_TURNS + sqrt(width * height) turns
+BASE_TURNS = 100
+#: Time given to the bots to initialize, in seconds
+INIT_TIME = 60.0
+#: Time given to the bots to play a turn, in seconds
+TURN_TIME = 2.0
+
+#: Docking status, same values as hlt.entity.Ship.DockingStatus
+UNDOCKED = 0
+DOCKING = 1
+DOCKED = 2
+UNDOCKING = 3
@@ -0,0 +1,518 @@
+import math
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from . import constants, mapgen, physics
+from .constants import UNDOCKED, DOCKING, DOCKED, UNDOCKING
+
+
+class Arrays:
+    """
+    Struct of arrays holding one entity per row
+
+    :ivar COLUMNS: (column name, dtype) of every column, overridden by sub-classes
+    """
+
+    COLUMNS = ()
+
+    def __init__(self):
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(0, dtype=dtype))
+
+    def append(self, **values):
+        """
+        Append one row
+
+        :param values: The value of every column
+        :return: The index of the new row
+        :rtype: int
+        """
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.append(getattr(self, name), np.array([values[name]], dtype=dtype)))
+        return len(self) - 1
+
+    def keep(self, mask):
+        """
+        Remove the rows not selected by the mask, the order of the rows is kept
+
+        :param np.ndarray mask: The rows to keep
+        :return: nothing
+        """
+        for name, _ in self.COLUMNS:
+            setattr(self, name, getattr(self, name)[mask])
+
+    def __len__(self):
+        return len(self.id)
+
+
+class ShipArrays(Arrays):
+    """
+    All ships alive, sorted by id
+    """
+
+    COLUMNS = (
+        ("id", np.int64),
+        ("owner", np.int64),
+        ("x", np.float64),
+        ("y", np.float64),
+        ("health", np.int64),
+        ("vel_x", np.float64),
+        ("vel_y", np.float64),
+        ("docking_status", np.int64),
+        # -1 when undocked
+        ("planet", np.int64),
+        ("progress", np.int64),
+        ("cooldown", np.int64),
+    )
+
+
+class PlanetArrays(Arrays):
+    """
+    All planets, destroyed ones included: the row of a planet is its id
+    """
+
+    COLUMNS = (
+        ("id", np.int64),
+        ("x", np.float64),
+        ("y", np.float64),
+        ("radius", np.float64),
+        ("health", np.int64),
+        ("docking_spots", np.int64),
+        ("production", np.int64),
+        # -1 when not owned
+        ("owner", np.int64),
+        ("alive", np.bool_),
+    )
+
+
+# A command is a letter followed by its integer arguments, commands are not separated
+COMMAND_TOKEN = re.compile(r"[a-z]|-?\d+(?:\.\d*)?")
+# Number of arguments of each command, the ship id included
+COMMAND_ARITY = {"t": 3, "d": 2, "u": 1}
+
+
+def parse_commands(line):
+    """
+    Parse the commands sent by a bot, unknown or incomplete commands are ignored
+
+    :param str line: The commands, like "t 0 7 90d 1 3u 2"
+    :return: list of (kind, ship_id, arguments)
+    :rtype: list[(str, int, tuple)]
+    """
+    tokens = COMMAND_TOKEN.findall(line)
+    commands = []
+    cursor = 0
+    while cursor < len(tokens):
+        kind = tokens[cursor]
+        arity = COMMAND_ARITY.get(kind)
+        cursor += 1
+        if arity is None:
+            continue
+        arguments = tokens[cursor:cursor + arity]
+        if len(arguments) < arity or any(argument in COMMAND_ARITY for argument in arguments):
+            continue
+        arguments = tuple(int(float(argument)) for argument in arguments)
+        commands.append((kind, arguments[0], arguments[1:]))
+        cursor += arity
+    return commands
+
+
+class GameState:
+    """
+    The whole state of a game, advanced one turn at a time by step().
+    No I/O here: the bots are driven by engine.runner
+
+    :ivar width: The map width
+    :ivar height: The map height
+    :ivar nb_players: The number of players
+    :ivar seed: The seed of the map generator
+    :ivar turn: The current turn
+    :ivar max_turns: The number of turns of the game
+    :ivar ships: The ships alive
+    :ivar planets: The planets
+    :ivar alive: Per player, True if not eliminated
+    :ivar last_frame_alive: Per player, the last turn the player was alive
+    :ivar total_ship_count: Per player, the number of ships owned during the game
+    :ivar damage_dealt: Per player, the damage dealt by the ships
+    """
+
+    def __init__(self, width, height, nb_players, seed):
+        """
+        :param int width: The map width
+        :param int height: The map height
+        :param int nb_players: The number of players
+        :param int seed: The seed of the map generator
+        """
+        self.width = width
+        self.height = height
+        self.nb_players = nb_players
+        self.seed = seed
+        self.turn = 0
+        self.max_turns = constants.BASE_TURNS + int(math.sqrt(width * height))
+        self.ships = ShipArrays()
+        self.planets = PlanetArrays()
+        self.alive = [True] * nb_players
+        self.last_frame_alive = [0] * nb_players
+        self.total_ship_count = [0] * nb_players
+        self.damage_dealt = [0] * nb_players
+        self._next_ship_id = 0
+
+        planets, starts = mapgen.generate(width, height, nb_players, seed)
+        for planet_id, planet in enumerate(planets):
+            self.planets.append(id=planet_id, x=planet.x, y=planet.y, radius=planet.radius,
+                                health=int(planet.radius * constants.PLANET_HEALTH_PER_RADIUS),
+                                docking_spots=planet.docking_spots, production=0, owner=-1, alive=True)
+        for player_id, (x, y) in enumerate(starts):
+            for i in range(constants.NB_STARTING_SHIPS):
+                # A vertical line of ships
+                self._spawn(player_id, x, y + 2.0 * (i - constants.NB_STARTING_SHIPS // 2))
+
+    def _spawn(self, player_id, x, y):
+        """
+        Create a new ship
+
+        :return: nothing
+        """
+        self.ships.append(id=self._next_ship_id, owner=player_id, x=x, y=y, health=constants.BASE_SHIP_HEALTH,
+                          vel_x=0.0, vel_y=0.0, docking_status=UNDOCKED, planet=-1, progress=0, cooldown=0)
+        self._next_ship_id += 1
+        self.total_ship_count[player_id] += 1
+
+    def _docked_counts(self):
+        """
+        :return: Per planet, the number of ships docked, docking or undocking
+        :rtype: np.ndarray
+        """
+        ships = self.ships
+        docked = ships.docking_status != UNDOCKED
+        return np.bincount(ships.planet[docked], minlength=len(self.planets))
+
+    def frame(self):
+        """
+        The state of the game as sent to the bots at the start of every turn
+
+        :return: The frame, without the trailing new line
+        :rtype: str
+        """
+        ships = self.ships
+        parts = [str(self.nb_players)]
+        # The velocities are always 0 at the start of a turn: the drag stops the ships
+        ship_format = "%d %.4f %.4f %d 0.0 0.0 %d %d %d %d"
+        rows = zip(ships.id.tolist(), ships.owner.tolist(), ships.x.tolist(), ships.y.tolist(),
+                   ships.health.tolist(), ships.docking_status.tolist(), ships.planet.tolist(),
+                   ships.progress.tolist(), ships.cooldown.tolist())
+        by_player = defaultdict(list)
+        docked_by_planet = defaultdict(list)
+        for ship_id, owner, x, y, health, status, planet, progress, cooldown in rows:
+            by_player[owner].append(ship_format % (ship_id, x, y, health, status, max(planet, 0), progress, cooldown))
+            if status != UNDOCKED:
+                docked_by_planet[planet].append(str(ship_id))
+        for player_id in range(self.nb_players):
+            player_ships = by_player[player_id]
+            parts.append("%d %d" % (player_id, len(player_ships)))
+            parts.extend(player_ships)
+
+        planets = self.planets
+        alive = np.flatnonzero(planets.alive).tolist()
+        parts.append(str(len(alive)))
+        resources = constants.RESOURCES_PER_RADIUS
+        for planet_id in alive:
+            owner = int(planets.owner[planet_id])
+            radius = float(planets.radius[planet_id])
+            docked = docked_by_planet[planet_id]
+            parts.append("%d %.4f %.4f %d %.4f %d %d %d %d %d %d" % (
+                planet_id, planets.x[planet_id], planets.y[planet_id], planets.health[planet_id], radius,
+                planets.docking_spots[planet_id], planets.production[planet_id], int(radius * resources),
+                owner >= 0, max(owner, 0), len(docked)))
+            parts.extend(docked)
+        return " ".join(parts)
+
+    def eliminate(self, player_id):
+        """
+        Remove a player from the game, after a timeout or a crash
+
+        :param int player_id: The player
+        :return: nothing
+        """
+        if not self.alive[player_id]:
+            return
+        self.alive[player_id] = False
+        self.last_frame_alive[player_id] = self.turn
+        self.ships.keep(self.ships.owner != player_id)
+        self._release_planets()
+
+    def is_over(self):
+        """
+        :return: True when the turn limit is reached or a single player is left
+        :rtype: bool
+        """
+        if self.turn >= self.max_turns:
+            return True
+        return sum(self.alive) <= (1 if self.nb_players > 1 else 0)
+
+    def ranking(self):
+        """
+        Players still alive are ranked by the total health of their ships then by the damage dealt,
+        eliminated players by the turn of their elimination
+
+        :return: The player ids, the winner first
+        :rtype: list[int]
+        """
+        healths = np.bincount(self.ships.owner, weights=self.ships.health, minlength=self.nb_players)
+
+        def score(player_id):
+            if self.alive[player_id]:
+                return 1, healths[player_id], self.damage_dealt[player_id]
+            return 0, self.last_frame_alive[player_id], self.damage_dealt[player_id]
+
+        return sorted(range(self.nb_players), key=score, reverse=True)
+
+    def step(self, commands):
+        """
+        Play a turn
+
+        :param dict[int, list] commands: Per player, the commands from parse_commands
+        :return: nothing
+        """
+        ships = self.ships
+        ships.vel_x[:] = 0.0
+        ships.vel_y[:] = 0.0
+        self._apply_commands(commands)
+        alive = self._move()
+        # Ships outside of the map are destroyed
+        alive &= (ships.x >= 0) & (ships.x <= self.width) & (ships.y >= 0) & (ships.y <= self.height)
+        ships.keep(alive)
+        self._update_docking()
+        self._release_planets()
+        self._produce()
+
+        self.turn += 1
+        owners = set(ships.owner.tolist())
+        for player_id in range(self.nb_players):
+            if not self.alive[player_id]:
+                continue
+            if player_id in owners:
+                self.last_frame_alive[player_id] = self.turn
+            else:
+                self.alive[player_id] = False
+
+    def _apply_commands(self, commands):
+        """
+        Set the velocities of the thrusting ships, start docking & undocking.
+        Only the first command of a ship is used, invalid commands are ignored.
+
+        :param dict[int, list] commands: Per player, the commands from parse_commands
+        :return: nothing
+        """
+        ships = self.ships
+        planets = self.planets
+        row_of = {ship_id: row for row, ship_id in enumerate(ships.id.tolist())}
+        owners = ships.owner.tolist()
+        statuses = ships.docking_status.tolist()
+        done = set()
+        # planet -> list of rows
+        requests = defaultdict(list)
+        for player_id, player_commands in commands.items():
+            for kind, ship_id, arguments in player_commands:
+                row = row_of.get(ship_id)
+                if row is None or owners[row] != player_id or row in done:
+                    continue
+                done.add(row)
+                if kind == "t":
+                    if statuses[row] != UNDOCKED:
+                        continue
+                    magnitude = max(0, min(constants.MAX_SPEED, arguments[0]))
+                    angle = math.radians(arguments[1])
+                    ships.vel_x[row] = magnitude * math.cos(angle)
+                    ships.vel_y[row] = magnitude * math.sin(angle)
+                elif kind == "d":
+                    planet_id = arguments[0]
+                    if statuses[row] != UNDOCKED or not 0 <= planet_id < len(planets) or not planets.alive[planet_id]:
+                        continue
+                    if planets.owner[planet_id] not in (-1, player_id):
+                        continue
+                    distance = math.hypot(ships.x[row] - planets.x[planet_id], ships.y[row] - planets.y[planet_id])
+                    if distance > planets.radius[planet_id] + constants.DOCK_RADIUS + constants.SHIP_RADIUS:
+                        continue
+                    requests[planet_id].append(row)
+                elif kind == "u":
+                    if statuses[row] != DOCKED:
+                        continue
+                    ships.docking_status[row] = UNDOCKING
+                    ships.progress[row] = constants.DOCK_TURNS
+
+        docked_counts = self._docked_counts()
+        for planet_id, rows in requests.items():
+            players = set(owners[row] for row in rows)
+            # Nobody can take a free planet when several players try the same turn
+            if len(players) > 1:
+                continue
+            free = int(planets.docking_spots[planet_id] - docked_counts[planet_id])
+            for row in sorted(rows)[:max(free, 0)]:
+                ships.docking_status[row] = DOCKING
+                ships.progress[row] = constants.DOCK_TURNS
+                ships.planet[row] = planet_id
+            if free > 0:
+                planets.owner[planet_id] = players.pop()
+
+    def _move(self):
+        """
+        Move the ships, resolving the collisions & the attacks in chronological order
+
+        :return: Per ship, False if destroyed during the movement
+        :rtype: np.ndarray
+        """
+        ships = self.ships
+        planets = self.planets
+        times, kinds, firsts, seconds = physics.find_events(ships, planets)
+        alive = np.ones(len(ships), dtype=np.bool_)
+        health = ships.health
+        can_fire = (ships.docking_status == UNDOCKED) & (ships.cooldown == 0)
+        # Events closer than a nano turn are simultaneous
+        group_times, group_starts = np.unique(np.round(times, 9), return_index=True)
+        group_ends = np.append(group_starts[1:], len(times))
+        times = times.tolist()
+        kinds = kinds.tolist()
+        firsts = firsts.tolist()
+        seconds = seconds.tolist()
+        owners = ships.owner.tolist()
+
+        for start, end in zip(group_starts.tolist(), group_ends.tolist()):
+            time = times[start]
+            damages = defaultdict(int)
+            planet_damages = defaultdict(int)
+            targets = defaultdict(list)
+            for event in range(start, end):
+                kind, first, second = kinds[event], firsts[event], seconds[event]
+                if not alive[first]:
+                    continue
+                if kind == physics.SHIP_COLLISION:
+                    if alive[second]:
+                        damages[first] += int(health[second])
+                        damages[second] += int(health[first])
+                elif kind == physics.PLANET_COLLISION:
+                    if planets.alive[second]:
+                        damages[first] += int(health[first])
+                        planet_damages[second] += int(health[first])
+                elif alive[second]:
+                    if can_fire[first]:
+                        targets[first].append(second)
+                    if can_fire[second]:
+                        targets[second].append(first)
+
+            # Every ship in range is attacked at the same time, the damage is split between the targets
+            for attacker, attacked in targets.items():
+                can_fire[attacker] = False
+                ships.cooldown[attacker] = constants.WEAPON_COOLDOWN
+                damage = constants.WEAPON_DAMAGE // len(attacked)
+                for target in attacked:
+                    damages[target] += damage
+                self.damage_dealt[owners[attacker]] += damage * len(attacked)
+
+            for ship, damage in damages.items():
+                health[ship] -= damage
+            for planet_id, damage in planet_damages.items():
+                planets.health[planet_id] -= damage
+                if planets.health[planet_id] <= 0:
+                    self._explode(planet_id, time, alive)
+            alive &= health > 0
+
+        ships.x += ships.vel_x
+        ships.y += ships.vel_y
+        return alive
+
+    def _explode(self, planet_id, time, alive):
+        """
+        Destroy a planet, its docked ships and damage the ships around
+
+        :param int planet_id: The planet
+        :param float time: The time of the explosion during the turn
+        :param np.ndarray alive: Per ship, False if destroyed, updated
+        :return: nothing
+        """
+        ships = self.ships
+        planets = self.planets
+        planets.alive[planet_id] = False
+        planets.owner[planet_id] = -1
+        docked = (ships.docking_status != UNDOCKED) & (ships.planet == planet_id)
+        alive &= ~docked
+        x = ships.x + ships.vel_x * time - planets.x[planet_id]
+        y = ships.y + ships.vel_y * time - planets.y[planet_id]
+        surface_distance = np.maximum(np.hypot(x, y) - planets.radius[planet_id], 0.0)
+        in_range = alive & (surface_distance <= constants.EXPLOSION_RADIUS)
+        damage = constants.EXPLOSION_DAMAGE * (1.0 - surface_distance[in_range] / constants.EXPLOSION_RADIUS)
+        ships.health[in_range] -= damage.astype(np.int64)
+
+    def _update_docking(self):
+        """
+        Advance the docking & undocking progress, reset the weapon cooldowns
+
+        :return: nothing
+        """
+        ships = self.ships
+        ships.cooldown = np.maximum(ships.cooldown - 1, 0)
+        moving = (ships.docking_status == DOCKING) | (ships.docking_status == UNDOCKING)
+        ships.progress[moving] -= 1
+        over = moving & (ships.progress <= 0)
+        docked = over & (ships.docking_status == DOCKING)
+        undocked = over & (ships.docking_status == UNDOCKING)
+        ships.docking_status[docked] = DOCKED
+        ships.docking_status[undocked] = UNDOCKED
+        ships.planet[undocked] = -1
+        ships.progress[over] = 0
+
+    def _release_planets(self):
+        """
+        A planet without docked ships is not owned anymore
+
+        :return: nothing
+        """
+        planets = self.planets
+        empty = (self._docked_counts() == 0) & (planets.owner >= 0)
+        planets.owner[empty] = -1
+        planets.production[empty] = 0
+
+    def _produce(self):
+        """
+        Every docked ship adds to the production of its planet, a ship is created when enough is produced
+
+        :return: nothing
+        """
+        ships = self.ships
+        planets = self.planets
+        docked = ships.docking_status == DOCKED
+        producers = np.bincount(ships.planet[docked], minlength=len(planets))
+        planets.production += constants.BASE_PRODUCTIVITY * producers
+        for planet_id in np.flatnonzero(planets.production >= constants.PRODUCTION_PER_SHIP).tolist():
+            while planets.production[planet_id] >= constants.PRODUCTION_PER_SHIP:
+                location = self._spawn_location(planet_id)
+                if location is None:
+                    break
+                self._spawn(int(planets.owner[planet_id]), *location)
+                planets.production[planet_id] -= constants.PRODUCTION_PER_SHIP
+
+    def _spawn_location(self, planet_id):
+        """
+        A free location at SPAWN_RADIUS from the surface of a planet, as close as possible to the map center
+
+        :param int planet_id: The planet
+        :return: (x, y) or None if there is no room
+        :rtype: (float, float)
+        """
+        ships = self.ships
+        planets = self.planets
+        x, y = planets.x[planet_id], planets.y[planet_id]
+        distance = planets.radius[planet_id] + constants.SPAWN_RADIUS
+        to_center = math.degrees(math.atan2(self.height / 2.0 - y, self.width / 2.0 - x))
+        for offset in range(0, 181, 15):
+            for angle in ((to_center + offset, to_center - offset) if offset else (to_center,)):
+                spawn_x = x + distance * math.cos(math.radians(angle))
+                spawn_y = y + distance * math.sin(math.radians(angle))
+                if not (0 <= spawn_x <= self.width and 0 <= spawn_y <= self.height):
+                    continue
+                if np.any(np.hypot(ships.x - spawn_x, ships.y - spawn_y) < 2 * constants.SHIP_RADIUS):
+                    continue
+                return spawn_x, spawn_y
+        return None
@@ -0,0 +1,165 @@
+import importlib
+import logging
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from hlt.game_map import Map
+from . import constants
+from .game import GameState, parse_commands
+
+# The policies playable by name, as "module:class". A policy has a name & a play_turn(game_map) method
+# returning its command queue, like the bots of opponents/
+POLICIES = {
+    "rampa": "engine.inprocess:RampaPolicy",
+    "closest": "opponents.ClosestTargetBot:ClosestTargetBot",
+    "settler": "opponents.RandomBot:Settler",
+}
+
+
+class RampaPolicy:
+    """
+    MyBot as a policy: Rampa with the start time of the turn
+    """
+
+    name = "Rampa"
+
+    def __init__(self):
+        # Imported here: the bot modules are only loaded when MyBot plays
+        from bot.rampa import Rampa
+        self._bot = Rampa()
+
+    def play_turn(self, game_map):
+        """
+        :param game_map: the game_map for the current turn
+        :return: the command_queue for the game to process
+        """
+        return self._bot.play_turn(game_map, datetime.utcnow())
+
+
+def load_policy(name):
+    """
+    :param str name: A key of POLICIES, or "module:class"
+    :return: A new instance of the policy
+    """
+    module_name, class_name = POLICIES.get(name, name).split(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class InProcessBot:
+    """
+    A policy living in the engine process, counterpart of runner.BotProcess.
+    Its map is updated in place from the arrays of the game: no frame is formatted nor parsed.
+
+    :ivar policy: The policy deciding the commands
+    :ivar name: The name of the policy
+    :ivar game_map: The hlt map of the player, kept between turns like hlt.Game(incremental=True) does
+    :ivar response_times: The duration of every turn, in seconds
+    """
+
+    def __init__(self, policy, player_id, width, height):
+        """
+        :param policy: The policy deciding the commands
+        :param int player_id: The id of the player
+        :param int width: The map width
+        :param int height: The map height
+        """
+        self.policy = policy
+        self.name = getattr(policy, "name", type(policy).__name__)
+        self.game_map = Map(player_id, width, height)
+        self.response_times = []
+
+
+def map_columns(state):
+    """
+    The state of the game as the columns of hlt.table.ShipTable & PlanetTable, same content as GameState.frame()
+
+    :param GameState state: The game
+    :return: The ship columns, sorted by owner then id, and the columns of the planets alive
+    :rtype: (dict[str, np.ndarray], dict[str, np.ndarray])
+    """
+    ships = state.ships
+    order = np.argsort(ships.owner, kind="stable")
+    # The frames hold 4 decimals, the bots see the same positions in both kinds of games
+    ship_columns = {
+        "id": ships.id[order],
+        "owner": ships.owner[order],
+        "x": np.round(ships.x[order], 4),
+        "y": np.round(ships.y[order], 4),
+        "health": ships.health[order],
+        # The velocities are always 0 at the start of a turn: the drag stops the ships
+        "vel_x": np.zeros(len(order)),
+        "vel_y": np.zeros(len(order)),
+        "docking_status": ships.docking_status[order],
+        "planet": ships.planet[order],
+        "progress": ships.progress[order],
+        "cooldown": ships.cooldown[order],
+    }
+
+    planets = state.planets
+    alive = np.flatnonzero(planets.alive)
+    radius = np.round(planets.radius[alive], 4)
+    planet_columns = {
+        "id": planets.id[alive],
+        "x": np.round(planets.x[alive], 4),
+        "y": np.round(planets.y[alive], 4),
+        "health": planets.health[alive],
+        "radius": radius,
+        "docking_spots": planets.docking_spots[alive],
+        "current_production": planets.production[alive],
+        "remaining_resources": (radius * constants.RESOURCES_PER_RADIUS).astype(np.int64),
+        "owner": planets.owner[alive],
+        "nb_docked": state._docked_counts()[alive],
+    }
+    return ship_columns, planet_columns
+
+
+def run_game_inprocess(policies, width, height, seed, timeouts=True):
+    """
+    Play a game between policies living in this process. The bots play one after the other,
+    a crash (any exception) eliminates the player as a crashed bot process would be.
+
+    :param list policies: The policy of every player, see load_policy
+    :param int width: The map width
+    :param int height: The map height
+    :param int seed: The seed of the map generator
+    :param bool timeouts: Eliminate the bots too slow to answer
+    :return: The final state of the game & the bots
+    :rtype: (GameState, list[InProcessBot])
+    """
+    state = GameState(width, height, len(policies), seed)
+    bots = [InProcessBot(policy, player_id, width, height) for player_id, policy in enumerate(policies)]
+    player_ids = list(range(len(bots)))
+
+    # The initial map, hlt.Game parses it before the first turn
+    ship_columns, planet_columns = map_columns(state)
+    for bot in bots:
+        start = perf_counter()
+        bot.game_map._load_columns(-1, ship_columns, planet_columns, player_ids)
+        bot.response_times.append(perf_counter() - start)
+
+    while not state.is_over():
+        ship_columns, planet_columns = map_columns(state)
+        turn_commands = {}
+        for player_id, bot in enumerate(bots):
+            if not state.alive[player_id]:
+                continue
+            start = perf_counter()
+            try:
+                bot.game_map._load_columns(state.turn, ship_columns, planet_columns, player_ids)
+                command_queue = bot.policy.play_turn(bot.game_map)
+            except Exception:
+                logging.exception("Player %s (%s) crashed on turn %s", player_id, bot.name, state.turn)
+                state.eliminate(player_id)
+                continue
+            duration = perf_counter() - start
+            bot.response_times.append(duration)
+            if timeouts and duration > constants.TURN_TIME:
+                logging.warning("Player %s (%s) timed out on turn %s", player_id, bot.name, state.turn)
+                state.eliminate(player_id)
+                continue
+            turn_commands[player_id] = parse_commands("".join(command_queue))
+        state.step(turn_commands)
+
+    return state, bots
@@ -0,0 +1,123 @@
+"""
+Symmetric map generation: planets are placed randomly in one sector of the map, then mirrored in the other ones.
+Two players get a left & a right half, other player counts get the four quarters of the map.
+"""
+import math
+import random
+
+# Min distance between the surfaces of two planets
+PLANET_MARGIN = 6.0
+# Min distance between a planet surface and the start of a player
+START_MARGIN = 15.0
+# Min distance between a planet surface and the border of the map
+BORDER_MARGIN = 4.0
+# Number of planets generated in each sector (the 4 central planets excepted)
+MIN_PLANETS_PER_SECTOR = 2
+MAX_PLANETS_PER_SECTOR = 5
+# Max number of random positions tried for each planet
+MAX_TRIES = 200
+
+
+class Planet:
+    """
+    A planet as generated, before the game starts
+
+    :ivar x: The x-coordinate
+    :ivar y: The y-coordinate
+    :ivar radius: The radius
+    :ivar docking_spots: The max number of docked ships
+    """
+
+    def __init__(self, x, y, radius, docking_spots):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.docking_spots = docking_spots
+
+    def overlaps(self, x, y, radius, margin):
+        """
+        :return: True if a planet at (x, y) with the given radius would be closer than margin
+        :rtype: bool
+        """
+        return math.hypot(self.x - x, self.y - y) < self.radius + radius + margin
+
+
+def _mirrors(width, height, nb_players, x, y):
+    """
+    The positions of a point of the first sector in all sectors
+
+    :return: list of (x, y), the first one is the point itself
+    :rtype: list[(float, float)]
+    """
+    if nb_players == 2:
+        return [(x, y), (width - x, height - y)]
+    return [(x, y), (width - x, y), (x, height - y), (width - x, height - y)]
+
+
+def _sector(width, height, nb_players):
+    """
+    :return: The bounds (x_max, y_max) of the first sector, its origin is (0, 0)
+    :rtype: (float, float)
+    """
+    if nb_players == 2:
+        return width / 2.0, height
+    return width / 2.0, height / 2.0
+
+
+def _docking_spots(radius):
+    """
+    :return: The number of docking spots of a planet, from 2 to 6 depending on its size
+    :rtype: int
+    """
+    return max(2, min(6, int(round(radius / 2.0))))
+
+
+def generate(width, height, nb_players, seed):
+    """
+    Generate the planets and the start position of the players
+
+    :param int width: The map width
+    :param int height: The map height
+    :param int nb_players: The number of players, from 1 to 4
+    :param int seed: The seed of the random generator
+    :return: The planets and one start position (x, y) per player
+    :rtype: (list[Planet], list[(float, float)])
+    """
+    rng = random.Random(seed)
+    sector_width, sector_height = _sector(width, height, nb_players)
+    # Players start in the middle of their sector
+    starts = _mirrors(width, height, nb_players, sector_width / 2.0, sector_height / 2.0)[:nb_players]
+    min_radius = 3.0
+    max_radius = 3.0 + min(width, height) / 32.0
+
+    planets = []
+    # 4 central planets, symmetric for both kinds of sectors
+    radius = round(rng.uniform(min_radius, max_radius), 4)
+    # Two neighbours are sqrt(2) * distance apart
+    distance = (2 * radius + PLANET_MARGIN) / math.sqrt(2) + rng.uniform(0, min(width, height) / 16.0)
+    cx, cy = width / 2.0, height / 2.0
+    for x, y in ((cx - distance, cy), (cx + distance, cy), (cx, cy - distance), (cx, cy + distance)):
+        planets.append(Planet(x, y, radius, _docking_spots(radius)))
+
+    nb_planets = rng.randint(MIN_PLANETS_PER_SECTOR, MAX_PLANETS_PER_SECTOR)
+    for _ in range(nb_planets):
+        for _ in range(MAX_TRIES):
+            radius = round(rng.uniform(min_radius, max_radius), 4)
+            low = radius + BORDER_MARGIN
+            if sector_width - low <= low or sector_height - low <= low:
+                continue
+            x = round(rng.uniform(low, sector_width - PLANET_MARGIN / 2.0 - radius), 4)
+            y = round(rng.uniform(low, sector_height - (BORDER_MARGIN if nb_players == 2 else PLANET_MARGIN / 2.0) - radius), 4)
+            mirrors = _mirrors(width, height, nb_players, x, y)
+            if any(planet.overlaps(mx, my, radius, PLANET_MARGIN) for planet in planets for mx, my in mirrors):
+                continue
+            # The mirrors must not overlap each other either
+            if any(math.hypot(mx - x, my - y) < 2 * radius + PLANET_MARGIN for mx, my in mirrors[1:]):
+                continue
+            if any(math.hypot(sx - mx, sy - my) < radius + START_MARGIN for sx, sy in starts for mx, my in mirrors):
+                continue
+            for mx, my in mirrors:
+                planets.append(Planet(mx, my, radius, _docking_spots(radius)))
+            break
+    return planets, starts
+
@@ -0,0 +1,150 @@
+"""
+Vectorized movement of the ships during a turn.
+Every ship moves in straight line at constant velocity between t=0 and t=1, the events (collisions and attacks)
+are found by solving |delta_position + delta_velocity * t| = radius for every close enough pair of entities.
+"""
+import numpy as np
+
+from . import constants
+
+# Collision distance between two ships
+SHIP_COLLISION_RADIUS = 2 * constants.SHIP_RADIUS
+# Distance between two ship centers at which they can attack each other
+ATTACK_RADIUS = constants.WEAPON_RADIUS + 2 * constants.SHIP_RADIUS
+# Max distance between two ships at the start of the turn for any event to happen during the turn
+SHIP_REACH = ATTACK_RADIUS + 2 * constants.MAX_SPEED
+
+# Event kinds, in processing order for events happening at the same time
+SHIP_COLLISION = 0
+PLANET_COLLISION = 1
+ATTACK = 2
+
+
+def event_times(dx, dy, dvx, dvy, radius):
+    """
+    Earliest time in [0, 1] at which two entities are closer than radius
+
+    :param np.ndarray dx: x-coordinates of the second entity relative to the first one at t=0
+    :param np.ndarray dy: y-coordinates of the second entity relative to the first one at t=0
+    :param np.ndarray dvx: x-velocities of the second entity relative to the first one
+    :param np.ndarray dvy: y-velocities of the second entity relative to the first one
+    :param radius: The distance triggering the event, scalar or array
+    :return: The times of the events, inf if there is no event during the turn
+    :rtype: np.ndarray
+    """
+    a = dvx * dvx + dvy * dvy
+    b = 2.0 * (dx * dvx + dy * dvy)
+    c = dx * dx + dy * dy - radius * radius
+    times = np.full(dx.shape, np.inf)
+    # Already in range at the start of the turn
+    times[c <= 0] = 0.0
+    # Getting in range during the turn: first root of a.t^2 + b.t + c = 0
+    discriminant = b * b - 4.0 * a * c
+    moving = (c > 0) & (a > 0) & (discriminant >= 0)
+    roots = (-b[moving] - np.sqrt(discriminant[moving])) / (2.0 * a[moving])
+    roots[(roots < 0) | (roots > 1)] = np.inf
+    times[moving] = roots
+    return times
+
+
+def close_pairs(x, y, reach):
+    """
+    All pairs of points closer than reach, using a sweep along the x-axis
+
+    :param np.ndarray x: The x-coordinates
+    :param np.ndarray y: The y-coordinates
+    :param float reach: The max distance
+    :return: Two arrays of indices (i, j) with i < j
+    :rtype: (np.ndarray, np.ndarray)
+    """
+    nb = len(x)
+    if nb < 2:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    order = np.argsort(x, kind="mergesort")
+    sorted_x = x[order]
+    # For each point, the points after it in the sorted order are candidates until x + reach
+    ends = np.searchsorted(sorted_x, sorted_x + reach, side="right")
+    counts = ends - np.arange(1, nb + 1)
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    first = np.repeat(np.arange(nb), counts)
+    # Offset of each candidate inside the window of its point
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    second = first + 1 + offsets
+    i = order[first]
+    j = order[second]
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    close = dx * dx + dy * dy <= reach * reach
+    i = i[close]
+    j = j[close]
+    swap = i > j
+    i[swap], j[swap] = j[swap], i[swap]
+    return i, j
+
+
+def find_events(ships, planets):
+    """
+    Every event that may happen during the turn, sorted by time then kind.
+    Events are only candidates: an event involving a ship destroyed earlier in the turn is skipped.
+
+    :param engine.game.ShipArrays ships: The ships, with their velocities for this turn
+    :param engine.game.PlanetArrays planets: The planets
+    :return: Arrays (times, kinds, first, second), second is a planet index for PLANET_COLLISION
+    :rtype: (np.ndarray, np.ndarray, np.ndarray, np.ndarray)
+    """
+    times = []
+    kinds = []
+    firsts = []
+    seconds = []
+
+    # Ship against ship, collisions between any ships & attacks between enemies
+    i, j = close_pairs(ships.x, ships.y, SHIP_REACH)
+    if len(i):
+        dx = ships.x[j] - ships.x[i]
+        dy = ships.y[j] - ships.y[i]
+        dvx = ships.vel_x[j] - ships.vel_x[i]
+        dvy = ships.vel_y[j] - ships.vel_y[i]
+        collision = event_times(dx, dy, dvx, dvy, SHIP_COLLISION_RADIUS)
+        hit = np.isfinite(collision)
+        times.append(collision[hit])
+        kinds.append(np.full(int(hit.sum()), SHIP_COLLISION))
+        firsts.append(i[hit])
+        seconds.append(j[hit])
+
+        enemies = ships.owner[i] != ships.owner[j]
+        attack = event_times(dx[enemies], dy[enemies], dvx[enemies], dvy[enemies], ATTACK_RADIUS)
+        in_range = np.isfinite(attack)
+        times.append(attack[in_range])
+        kinds.append(np.full(int(in_range.sum()), ATTACK))
+        firsts.append(i[enemies][in_range])
+        seconds.append(j[enemies][in_range])
+
+    # Ship against planet, only the moving ships can collide
+    moving = np.flatnonzero((ships.vel_x != 0) | (ships.vel_y != 0))
+    alive_planets = np.flatnonzero(planets.alive)
+    if len(moving) and len(alive_planets):
+        ship_index = np.repeat(moving, len(alive_planets))
+        planet_index = np.tile(alive_planets, len(moving))
+        dx = planets.x[planet_index] - ships.x[ship_index]
+        dy = planets.y[planet_index] - ships.y[ship_index]
+        collision = event_times(dx, dy, -ships.vel_x[ship_index], -ships.vel_y[ship_index],
+                                planets.radius[planet_index] + constants.SHIP_RADIUS)
+        hit = np.isfinite(collision)
+        times.append(collision[hit])
+        kinds.append(np.full(int(hit.sum()), PLANET_COLLISION))
+        firsts.append(ship_index[hit])
+        seconds.append(planet_index[hit])
+
+    if not times:
+        empty = np.zeros(0, dtype=np.intp)
+        return np.zeros(0), empty, empty, empty
+    times = np.concatenate(times)
+    kinds = np.concatenate(kinds)
+    firsts = np.concatenate(firsts)
+    seconds = np.concatenate(seconds)
+    order = np.lexsort((kinds, times))
+    return times[order], kinds[order], firsts[order], seconds[order]
@@ -0,0 +1,171 @@
+import logging
+import queue
+import subprocess
+import threading
+from time import perf_counter
+
+from . import constants
+from .game import GameState, parse_commands
+
+
+class BotProcess:
+    """
+    A bot running in its own process, speaking the Halite protocol on its stdin/stdout
+
+    :ivar command: The shell command starting the bot
+    :ivar name: The name sent by the bot after the initialization
+    :ivar response_times: The duration of every turn, in seconds
+    """
+
+    def __init__(self, command):
+        """
+        :param str command: The shell command starting the bot
+        """
+        self.command = command
+        self.name = command
+        self.response_times = []
+        self._process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL, bufsize=0)
+        # A thread reads the lines of the bot, so reads can time out
+        self._lines = queue.Queue()
+        self._reader = threading.Thread(target=self._read_lines, daemon=True)
+        self._reader.start()
+
+    def _read_lines(self):
+        for line in iter(self._process.stdout.readline, b''):
+            self._lines.put(line.decode().rstrip("\r\n"))
+        # End of output, the bot exited
+        self._lines.put(None)
+
+    def send(self, text):
+        """
+        Send one or several lines to the bot
+
+        :param str text: The lines, without the trailing new line
+        :return: False if the bot can't be reached anymore
+        :rtype: bool
+        """
+        try:
+            self._process.stdin.write(text.encode() + b'\n')
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return False
+        return True
+
+    def receive(self, timeout):
+        """
+        Wait for the next line of the bot
+
+        :param float timeout: The max time to wait, in seconds, None to wait forever
+        :return: The line, None on timeout or if the bot exited
+        :rtype: str
+        """
+        try:
+            return self._lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        """
+        Close the input of the bot: it reads an empty frame & ends its game. Kill it if it doesn't exit.
+
+        :return: nothing
+        """
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout=2.0)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+
+def run_game(commands, width, height, seed, timeouts=True):
+    """
+    Play a game between bots started with shell commands
+
+    :param list[str] commands: The shell command of every bot
+    :param int width: The map width
+    :param int height: The map height
+    :param int seed: The seed of the map generator
+    :param bool timeouts: Eliminate the bots too slow to answer
+    :return: The final state of the game & the bots
+    :rtype: (GameState, list[BotProcess])
+    """
+    state = GameState(width, height, len(commands), seed)
+    bots = [BotProcess(command) for command in commands]
+    init_time = constants.INIT_TIME if timeouts else None
+    turn_time = constants.TURN_TIME if timeouts else None
+
+    frame = state.frame()
+    for player_id, bot in enumerate(bots):
+        bot.send("%d\n%d %d\n%s" % (player_id, width, height, frame))
+    start = perf_counter()
+    for player_id, bot in enumerate(bots):
+        # The bots run in parallel: the timeout counts from the common start
+        name = bot.receive(None if init_time is None else max(init_time - (perf_counter() - start), 0.0))
+        bot.response_times.append(perf_counter() - start)
+        if name is None:
+            logging.warning("Player %s (%s) failed to initialize", player_id, bot.command)
+            state.eliminate(player_id)
+        else:
+            bot.name = name
+
+    while not state.is_over():
+        frame = state.frame()
+        players = [player_id for player_id in range(len(bots)) if state.alive[player_id]]
+        # Every bot thinks at the same time, as with the official engine
+        for player_id in players:
+            bots[player_id].send(frame)
+        turn_commands = {}
+        start = perf_counter()
+        for player_id in players:
+            bot = bots[player_id]
+            line = bot.receive(None if turn_time is None else max(turn_time - (perf_counter() - start), 0.0))
+            bot.response_times.append(perf_counter() - start)
+            if line is None:
+                logging.warning("Player %s (%s) timed out or crashed on turn %s", player_id, bot.name, state.turn)
+                state.eliminate(player_id)
+                continue
+            turn_commands[player_id] = parse_commands(line)
+        state.step(turn_commands)
+
+    for bot in bots:
+        bot.stop()
+    return state, bots
+
+
+def statistics(state, bots):
+    """
+    The result of a game, in the format of the JSON output of halite.exe
+
+    :param GameState state: The final state of the game
+    :param list[BotProcess] bots: The bots (or inprocess.InProcessBot)
+    :return: The statistics, ready for json.dumps
+    :rtype: dict
+    """
+    ranking = state.ranking()
+    stats = {}
+    for player_id, bot in enumerate(bots):
+        frame_times = bot.response_times[1:]
+        stats[str(player_id)] = {
+            "name": bot.name,
+            "rank": ranking.index(player_id) + 1,
+            "last_frame_alive": state.last_frame_alive[player_id],
+            "total_ship_count": state.total_ship_count[player_id],
+            "damage_dealt": state.damage_dealt[player_id],
+            "init_response_time": int(bot.response_times[0] * 1000) if bot.response_times else 0,
+            "average_frame_response_time": sum(frame_times) * 1000.0 / len(frame_times) if frame_times else 0.0,
+        }
+    return {
+        "map_generator": "engine.mapgen",
+        "map_width": state.width,
+        "map_height": state.height,
+        "map_seed": state.seed,
+        "turns": state.turn,
+        "replay": None,
+        "error_logs": {},
+        "stats": stats,
+    }
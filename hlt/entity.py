@@ -172,51 +172,104 @@ class Planet(Entity):
             for ship in self._docked_ship_ids:
                 self._docked_ships[ship] = self.owner.get_ship(ship)
 
-    @staticmethod
-    def _parse_single(tokens):
+    def _update(self, players, tokens, cursor, changes):
         """
-        Parse a single planet given tokenized input from the game environment.
+        Update the planet in place given tokenized input from the game environment.
 
-        :return: The planet ID, planet object, and unused tokens.
-        :rtype: (int, Planet, list[str])
+        :param dict[int, game_map.Player] players: A dictionary of player objects keyed by id
+        :param list[str] tokens: The tokenized input
+        :param int cursor: The index of the first token of this planet
+        :param game_map.MapChanges changes: Where to report the changes
+        :return: the index of the next unused token.
+        :rtype: int
+        """
+        num_docked_ships = int(tokens[cursor + 10])
+        docked_ships = [int(ship_id) for ship_id in tokens[cursor + 11:cursor + 11 + num_docked_ships]]
+        owner_id = int(tokens[cursor + 9]) if bool(int(tokens[cursor + 8])) else None
+        self._set(players, int(tokens[cursor + 3]), int(tokens[cursor + 6]), int(tokens[cursor + 7]),
+                  owner_id, docked_ships, changes)
+        return cursor + 11 + num_docked_ships
+
+    def _set(self, players, health, current, remaining, owner_id, docked_ships, changes):
+        """
+        Update the planet in place given already parsed values (see _update, or Map._load_columns)
+
+        :param dict[int, game_map.Player] players: A dictionary of player objects keyed by id
+        :param int health: The planet health
+        :param int current: The current production
+        :param int remaining: The remaining resources
+        :param int owner_id: The player id of the owner, None if not owned
+        :param list[int] docked_ships: The ids of the docked ships
+        :param game_map.MapChanges changes: Where to report the changes
+        :return: nothing
         """
-        (plid, x, y, hp, r, docking, current, remaining,
-         owned, owner, num_docked_ships, *remainder) = tokens
+        if health != self.health:
+            self.health = health
+            changes.damaged_planets.add(self.id)
+        self.current_production = current
+        self.remaining_resources = remaining
 
-        plid = int(plid)
-        docked_ships = []
+        owner = players.get(owner_id) if owner_id is not None else None
 
-        for _ in range(int(num_docked_ships)):
-            ship_id, *remainder = remainder
-            docked_ships.append(int(ship_id))
+        owner_changed = owner is not self.owner
+        if owner_changed:
+            self.owner = owner
+            changes.owner_planets.add(self.id)
+        if docked_ships != self._docked_ship_ids:
+            self._docked_ship_ids = docked_ships
+            changes.docked_planets.add(self.id)
+        elif not owner_changed and changes.destroyed_ships.isdisjoint(self._docked_ships):
+            # Nothing to link again
+            return
 
-        planet = Planet(int(plid),
-                        float(x), float(y),
-                        int(hp), float(r), int(docking),
-                        int(current), int(remaining),
-                        bool(int(owned)), int(owner),
+        self._docked_ships = {}
+        if self.owner is not None:
+            for ship in self._docked_ship_ids:
+                self._docked_ships[ship] = self.owner.get_ship(ship)
+
+    @staticmethod
+    def _parse_single(tokens, cursor):
+        """
+        Parse a single planet given tokenized input from the game environment.
+
+        :param list[str] tokens: The tokenized input
+        :param int cursor: The index of the first token of this planet
+        :return: The planet ID, planet object, and the index of the next unused token.
+        :rtype: (int, Planet, int)
+        """
+        plid = int(tokens[cursor])
+        num_docked_ships = int(tokens[cursor + 10])
+        # The docked ship ids follow the 11 fixed fields
+        docked_ships = [int(ship_id) for ship_id in tokens[cursor + 11:cursor + 11 + num_docked_ships]]
+
+        planet = Planet(plid,
+                        float(tokens[cursor + 1]), float(tokens[cursor + 2]),
+                        int(tokens[cursor + 3]), float(tokens[cursor + 4]), int(tokens[cursor + 5]),
+                        int(tokens[cursor + 6]), int(tokens[cursor + 7]),
+                        bool(int(tokens[cursor + 8])), int(tokens[cursor + 9]),
                         docked_ships)
 
-        return plid, planet, remainder
+        return plid, planet, cursor + 11 + num_docked_ships
 
     @staticmethod
-    def _parse(tokens):
+    def _parse(tokens, cursor):
         """
         Parse planet data given a tokenized input.
 
         :param list[str] tokens: The tokenized input
-        :return: the populated planet dict and the unused tokens.
-        :rtype: (dict, list[str])
+        :param int cursor: The index of the first token of the planets section
+        :return: the populated planet dict and the index of the next unused token.
+        :rtype: (dict, int)
         """
-        num_planets, *remainder = tokens
-        num_planets = int(num_planets)
+        num_planets = int(tokens[cursor])
+        cursor += 1
         planets = {}
 
         for _ in range(num_planets):
-            plid, planet, remainder = Planet._parse_single(remainder)
+            plid, planet, cursor = Planet._parse_single(tokens, cursor)
             planets[plid] = planet
 
-        return planets, remainder
+        return planets, cursor
 
 
 class Ship(Entity):
@@ -288,7 +341,8 @@ class Ship(Entity):
         return "u {}".format(self.id)
 
     def navigate(self, target, game_map, speed, max_corrections=90, angular_step=1, ignore_ships=False,
-                 ignore_planets=False, ignore_ghosts=False, assassin=False, closest=False):
+                 ignore_planets=False, ignore_ghosts=False, assassin=False, closest=False, routing=False,
+                 flow=False):
         """
         # Will calculate a valid path between the ship and the target
 
@@ -302,16 +356,15 @@ class Ship(Entity):
         :param ignore_ghosts:  Should we ignore ghosts in obstacles list
         :param assassin:  Is the ship an assassin
         :param closest:  Shold we navigate to the target's position? or the closest position within the radius
+        :param routing:  Go around the planets on the waypoints of the planet graph, see navigation_target
+        :param flow:  Follow the flow field shared by the drones going to the target, see navigation_target
         :return:
         """
 
-        # Should we navigate to the point directly? or the closest points inside our radius?
-        if closest:
-            closest_target = self.closest_point_to(target)
-        else:
-            closest_target = target
+        target_pos, intermediate_pos = self.navigation_target(target, game_map, speed, ignore_planets=ignore_planets,
+                                                              closest=closest, routing=routing, flow=flow)
 
-        final_speed, angle, ghost = navigate(self.pos, closest_target.pos, game_map, speed, max_corrections=max_corrections, angular_step=angular_step, ignore_ships=ignore_ships,
+        final_speed, angle, ghost = navigate(self.pos, target_pos, game_map, speed, max_corrections=max_corrections, angular_step=angular_step, ignore_ships=ignore_ships,
                                              ignore_planets=ignore_planets, ignore_ghosts=ignore_ghosts, assassin=assassin)
 
         # If there is a ghost it means we found a way to navigate
@@ -320,11 +373,75 @@ class Ship(Entity):
             game_map.add_ghost((self.pos, ghost))
             # Move
             return self.thrust(final_speed, angle)
-        # Calculate the intermediate position
+        new_target, new_speed = self.intermediate_target(intermediate_pos, speed)
+        final_speed, angle, ghost = navigate(self.pos, new_target, game_map, new_speed,
+                                             max_corrections=max_corrections + 30, angular_step=angular_step,
+                                             ignore_ships=ignore_ships, ignore_planets=ignore_planets,
+                                             ignore_ghosts=ignore_ghosts, assassin=assassin)
+        if ghost is not None:
+            game_map.add_ghost((self.pos, ghost))
+
+        return self.thrust(final_speed, angle)
+
+    def navigation_target(self, target, game_map, speed, ignore_planets=False, closest=False, routing=False,
+                          flow=False):
+        """
+        The position to navigate to this turn, the first waypoint around the planets if one is in the way
+
+        :param target: The target to move to
+        :param game_map: The game_map, for its planet graph
+        :param speed: The maximum speed for this move
+        :param ignore_planets: Should we ignore planets in obstacles list
+        :param closest: Shold we navigate to the target's position? or the closest position within the radius
+        :param routing: Go around the planets on the waypoints of the planet graph (built on the first call),
+                        otherwise the target is returned as is
+        :param flow: Follow the flow field of the target once enough drones go to it (see Map.flow_field), when routing
+        :return: The position to navigate to, and the position of the intermediate navigation if it fails
+        :rtype: (Circle, Circle)
+        """
+        # Should we navigate to the point directly? or the closest points inside our radius?
+        if closest:
+            closest_target = self.closest_point_to(target)
+        else:
+            closest_target = target
+        target_pos = closest_target.pos
+        # The intermediate position, if no path is found, is toward the target
+        intermediate_pos = target.pos
+
+        # Go around the planets on the way: the navigation only has to avoid the ships until the first waypoint
+        if routing and not ignore_planets:
+            graph = game_map.planet_graph()
+            waypoint = None
+            if graph.crosses(self.pos, target_pos):
+                # Many drones going to the same target follow its flow field instead of searching their own route
+                field = game_map.flow_field(target) if flow else None
+                if field is not None:
+                    waypoint = field.next_target(self.pos, graph)
+                if waypoint is None:
+                    waypoint = graph.first_waypoint(self.pos, target_pos)
+            if waypoint is not None:
+                # Don't stop on a waypoint closer than the speed: keep going in its direction
+                waypoint_distance = calculate_distance_between(self.pos, waypoint)
+                if 0 < waypoint_distance < speed:
+                    waypoint.x = self.pos.x + (waypoint.x - self.pos.x) * speed / waypoint_distance
+                    waypoint.y = self.pos.y + (waypoint.y - self.pos.y) * speed / waypoint_distance
+                target_pos = waypoint
+                intermediate_pos = waypoint
+        return target_pos, intermediate_pos
+
+    def intermediate_target(self, intermediate_pos, speed):
+        """
+        The target of the navigation when no path is found: much slower, toward the intermediate position
+
+        :param intermediate_pos: The position to move toward
+        :param speed: The maximum speed for this move
+        :return: The target & the speed of the intermediate navigation
+        :rtype: (Circle, float)
+        """
         # Take the direction
-        new_target = calculate_direction(self.pos, target.pos)
+        new_target = calculate_direction(self.pos, intermediate_pos)
         # Calculate length of the direction
-        distance = calculate_distance_between(self.pos, target.pos)
+        distance = calculate_distance_between(self.pos, intermediate_pos)
 
         # Create a new speed, much slower
         new_speed = min(speed, distance)
@@ -335,14 +452,7 @@ class Ship(Entity):
         # Add the direction to the ship position
         new_target.x += self.pos.x
         new_target.y += self.pos.y
-        final_speed, angle, ghost = navigate(self.pos, new_target, game_map, new_speed,
-                                             max_corrections=max_corrections + 30, angular_step=angular_step,
-                                             ignore_ships=ignore_ships, ignore_planets=ignore_planets,
-                                             ignore_ghosts=ignore_ghosts, assassin=assassin)
-        if ghost is not None:
-            game_map.add_ghost((self.pos, ghost))
-
-        return self.thrust(final_speed, angle)
+        return new_target, new_speed
 
     def can_dock(self, planet):
         """
@@ -366,47 +476,101 @@ class Ship(Entity):
         self.owner = players.get(self.owner)  # All ships should have an owner. If not, this will just reset to None
         self.planet = planets.get(self.planet)  # If not will just reset to none
 
+    def _update(self, planets, tokens, cursor, changes):
+        """
+        Update the ship in place given tokenized input from the game environment.
+
+        :param dict[int, Planet] planets: A dictionary of planet objects keyed by id
+        :param list[str] tokens: The tokenized input
+        :param int cursor: The index of the first token of this ship
+        :param game_map.MapChanges changes: Where to report the changes
+        :return: the index of the next unused token.
+        :rtype: int
+        """
+        self._set(planets, float(tokens[cursor + 1]), float(tokens[cursor + 2]), int(tokens[cursor + 3]),
+                  float(tokens[cursor + 4]), float(tokens[cursor + 5]), int(tokens[cursor + 6]),
+                  int(tokens[cursor + 7]), int(tokens[cursor + 8]), int(tokens[cursor + 9]), changes)
+        return cursor + 10
+
+    def _set(self, planets, x, y, health, vel_x, vel_y, docking_status, planet, progress, cooldown, changes):
+        """
+        Update the ship in place given already parsed values (see _update, or Map._load_columns)
+
+        :param dict[int, Planet] planets: A dictionary of planet objects keyed by id
+        :param float x: The x-coordinate
+        :param float y: The y-coordinate
+        :param int health: The ship health
+        :param float vel_x: The x-velocity
+        :param float vel_y: The y-velocity
+        :param int docking_status: The docking status, as sent by the engine
+        :param int planet: The id of the planet the ship is docked to
+        :param int progress: The docking progress
+        :param int cooldown: The weapon cooldown
+        :param game_map.MapChanges changes: Where to report the changes
+        :return: nothing
+        """
+        if x != self.pos.x or y != self.pos.y:
+            self.pos.x = x
+            self.pos.y = y
+            changes.moved_ships.add(self.id)
+
+        if health != self.health:
+            self.health = health
+            changes.damaged_ships.add(self.id)
+
+        self.velocity.x = vel_x
+        self.velocity.y = vel_y
+
+        docking_status = Ship.DockingStatus(docking_status)
+        if docking_status is not self.docking_status:
+            self.docking_status = docking_status
+            changes.docking_ships.add(self.id)
+        self.planet = planets.get(planet) if (docking_status is not Ship.DockingStatus.UNDOCKED) else None
+        self._docking_progress = progress
+        self._weapon_cooldown = cooldown
+
     @staticmethod
-    def _parse_single(player_id, tokens):
+    def _parse_single(player_id, tokens, cursor):
         """
         Parse a single ship given tokenized input from the game environment.
 
         :param int player_id: The id of the player who controls the ships
-        :param list[tokens]: The remaining tokens
-        :return: The ship ID, ship object, and unused tokens.
-        :rtype: int, Ship, list[str]
+        :param list[str] tokens: The tokenized input
+        :param int cursor: The index of the first token of this ship
+        :return: The ship ID, ship object, and the index of the next unused token.
+        :rtype: int, Ship, int
         """
-        (sid, x, y, hp, vel_x, vel_y,
-         docked, docked_planet, progress, cooldown, *remainder) = tokens
-
-        sid = int(sid)
-        docked = Ship.DockingStatus(int(docked))
+        sid = int(tokens[cursor])
+        docked = Ship.DockingStatus(int(tokens[cursor + 6]))
 
         ship = Ship(player_id,
                     sid,
-                    float(x), float(y),
-                    int(hp),
-                    float(vel_x), float(vel_y),
-                    docked, int(docked_planet),
-                    int(progress), int(cooldown))
+                    float(tokens[cursor + 1]), float(tokens[cursor + 2]),
+                    int(tokens[cursor + 3]),
+                    float(tokens[cursor + 4]), float(tokens[cursor + 5]),
+                    docked, int(tokens[cursor + 7]),
+                    int(tokens[cursor + 8]), int(tokens[cursor + 9]))
 
-        return sid, ship, remainder
+        return sid, ship, cursor + 10
 
     @staticmethod
-    def _parse(player_id, tokens):
+    def _parse(player_id, tokens, cursor):
         """
         Parse ship data given a tokenized input.
 
         :param int player_id: The id of the player who owns the ships
         :param list[str] tokens: The tokenized input
-        :return: The dict of Players and unused tokens.
-        :rtype: (dict, list[str])
+        :param int cursor: The index of the first token of the ships section
+        :return: The dict of ships and the index of the next unused token.
+        :rtype: (dict, int)
         """
         ships = {}
-        num_ships, *remainder = tokens
-        for _ in range(int(num_ships)):
-            ship_id, ships[ship_id], remainder = Ship._parse_single(player_id, remainder)
-        return ships, remainder
+        num_ships = int(tokens[cursor])
+        cursor += 1
+        for _ in range(num_ships):
+            ship_id, ship, cursor = Ship._parse_single(player_id, tokens, cursor)
+            ships[ship_id] = ship
+        return ships, cursor
 
 
 class Position(Entity):
@@ -1,6 +1,9 @@
-from bot.navigation import calculate_distance_between
+from collections import namedtuple
+
+from bot.navigation import calculate_distance_between, GhostStore, ObstacleGrid
 from . import  entity
 from .collision import intersect_segment_circle
+from .table import ShipTable, PlanetTable
 
 
 class Map:
@@ -23,8 +26,22 @@ class Map:
         self.height = height
         self._players = {}
         self._planets = {}
-        self._ghosts = {}
+        # The moves given to my ships this turn, the store is kept between turns
+        self._ghosts = GhostStore()
+        # Built on the first navigation of the turn, see obstacle_grid
+        self._obstacle_grid = None
+        # Kept between turns, the planets never move, see planet_graph
+        self._planet_graph = None
+        # The flow fields of the popular targets & the number of drones going to every target this turn,
+        # see flow_field
+        self._flow_fields = {}
+        self._flow_demand = {}
+        self._flow_turn = None
         self.turn = 0
+        self.changes = MapChanges()
+        # Columnar copy of the entities, the buffers are kept between turns
+        self._ship_table = ShipTable()
+        self._planet_table = PlanetTable()
 
     def get_me(self):
         """
@@ -63,6 +80,30 @@ class Map:
         """
         return list(self._planets.values())
 
+    def ship_table(self):
+        """
+        :return: All ships of the current turn as a struct of arrays
+        :rtype: ShipTable
+        """
+        return self._ship_table
+
+    def planet_table(self):
+        """
+        :return: All planets of the current turn as a struct of arrays
+        :rtype: PlanetTable
+        """
+        return self._planet_table
+
+    def _fill_tables(self, tokens):
+        """
+        Fill the ship & planet tables from the tokenized frame
+
+        :param list[str] tokens: The tokenized input
+        :return: nothing
+        """
+        cursor = self._ship_table._load(tokens)
+        self._planet_table._load(tokens, cursor)
+
     def nearby_entities_by_distance(self, entity):
         """
         :param entity: The source entity to find distances from
@@ -93,20 +134,169 @@ class Map:
         :return: nothing
         """
         tokens = map_string.split()
+        if not tokens:
+            # The engine closes the stream once the game is over
+            raise ValueError("Empty map description, the game is over")
         self.turn = turn
-        self._ghosts = []
-        self._players, tokens = Player._parse(tokens)
-        self._planets, tokens = entity.Planet._parse(tokens)
+        self._ghosts.clear()
+        self._obstacle_grid = None
+        # Walk the tokens with a cursor instead of slicing the list for every field
+        self._players, cursor = Player._parse(tokens, 0)
+        self._planets, cursor = entity.Planet._parse(tokens, cursor)
 
-        assert(len(tokens) == 0)  # There should be no remaining tokens at this point
+        assert(cursor == len(tokens))  # There should be no remaining tokens at this point
         self._link()
+        self._fill_tables(tokens)
+        # Every entity is brand new
+        self.changes = MapChanges()
+        self.changes.spawned_ships.update(ship.id for ship in self.all_ships())
+
+    def _update(self, map_string, turn):
+        """
+        Update the map in place from the description of the game.
+        Existing players, ships and planets are kept and updated, only spawned entities are created
+        and only destroyed entities are removed. What changed is stored in self.changes
+
+        :param map_string: The string which the Halite engine outputs
+        :param turn: The current turn
+        :return: nothing
+        """
+        tokens = map_string.split()
+        if not tokens:
+            # The engine closes the stream once the game is over
+            raise ValueError("Empty map description, the game is over")
+        self.turn = turn
+        self._ghosts.clear()
+        self._obstacle_grid = None
+        changes = MapChanges()
+
+        # Players and their ships
+        num_players = int(tokens[0])
+        cursor = 1
+        players = {}
+        for _ in range(num_players):
+            player_id = int(tokens[cursor])
+            player = self._players.get(player_id)
+            if player is None:
+                player = Player(player_id, {})
+            # Ships are linked to the planets of the previous turn, planets are never created during a game
+            cursor = player._update(self._players, self._planets, tokens, cursor + 1, changes)
+            players[player_id] = player
+        # Players that are not sent anymore lost all their ships
+        for player_id, player in self._players.items():
+            if player_id not in players:
+                changes.destroyed_ships.update(player._ships.keys())
+        self._players = players
+
+        # Planets
+        num_planets = int(tokens[cursor])
+        cursor += 1
+        planets = {}
+        for _ in range(num_planets):
+            planet_id = int(tokens[cursor])
+            planet = self._planets.get(planet_id)
+            if planet is None:
+                planet_id, planet, cursor = entity.Planet._parse_single(tokens, cursor)
+                planet._link(self._players, self._planets)
+            else:
+                cursor = planet._update(self._players, tokens, cursor, changes)
+            planets[planet_id] = planet
+        # Planets that are not sent anymore have been destroyed
+        for planet_id in self._planets.keys():
+            if planet_id not in planets:
+                changes.destroyed_planets.add(planet_id)
+        self._planets = planets
+
+        assert(cursor == len(tokens))  # There should be no remaining tokens at this point
+        self.changes = changes
+        self._fill_tables(tokens)
+
+    def _load_columns(self, turn, ships, planets, player_ids):
+        """
+        Update the map in place from columns of values instead of a frame, used by the in-process games
+        (see engine/inprocess.py). Same result as _parse for a new map, then as _update.
+
+        :param int turn: The current turn
+        :param dict[str, np.ndarray] ships: Every column of the ShipTable, rows sorted by owner then by id
+        :param dict[str, np.ndarray] planets: Every column of the PlanetTable, for the planets alive
+        :param list[int] player_ids: Every player of the game, even the ones without ships
+        :return: nothing
+        """
+        self.turn = turn
+        self._ghosts.clear()
+        self._obstacle_grid = None
+        changes = MapChanges()
+
+        # Ship rows grouped by owner & docked ship ids grouped by planet, the ships are sorted by owner
+        rows_by_player = {player_id: [] for player_id in player_ids}
+        docked_by_planet = {}
+        for row in zip(ships["owner"].tolist(), ships["id"].tolist(), ships["x"].tolist(), ships["y"].tolist(),
+                       ships["health"].tolist(), ships["vel_x"].tolist(), ships["vel_y"].tolist(),
+                       ships["docking_status"].tolist(), ships["planet"].tolist(), ships["progress"].tolist(),
+                       ships["cooldown"].tolist()):
+            rows_by_player[row[0]].append(row[1:])
+            if row[7] != entity.Ship.DockingStatus.UNDOCKED.value:
+                docked_by_planet.setdefault(row[8], []).append(row[1])
+
+        # Planets are never created during a game: only a new map creates them, they are linked once the ships exist
+        planet_rows = zip(planets["id"].tolist(), planets["x"].tolist(), planets["y"].tolist(),
+                          planets["health"].tolist(), planets["radius"].tolist(), planets["docking_spots"].tolist(),
+                          planets["current_production"].tolist(), planets["remaining_resources"].tolist(),
+                          planets["owner"].tolist())
+        planets_by_id = {}
+        created_planets = []
+        updated_planets = []
+        for planet_id, x, y, health, radius, docking_spots, current, remaining, owner in planet_rows:
+            planet = self._planets.get(planet_id)
+            if planet is None:
+                planet = entity.Planet(planet_id, x, y, health, radius, docking_spots, current, remaining,
+                                       owner >= 0, owner, docked_by_planet.get(planet_id, []))
+                created_planets.append(planet)
+            else:
+                updated_planets.append((planet, health, current, remaining, owner if owner >= 0 else None,
+                                        docked_by_planet.get(planet_id, [])))
+            planets_by_id[planet_id] = planet
+
+        # Players and their ships
+        players = {}
+        for player_id, rows in rows_by_player.items():
+            player = self._players.get(player_id)
+            if player is None:
+                player = Player(player_id, {})
+            player._update_rows(planets_by_id, rows, changes)
+            players[player_id] = player
+        for player_id, player in self._players.items():
+            if player_id not in players:
+                changes.destroyed_ships.update(player._ships.keys())
+        self._players = players
+
+        for planet in created_planets:
+            planet._link(self._players, planets_by_id)
+        for planet_id in self._planets.keys():
+            if planet_id not in planets_by_id:
+                changes.destroyed_planets.add(planet_id)
+        self._planets = planets_by_id
+        # The existing planets are updated once the destroyed ships are known, as in _update
+        for planet, health, current, remaining, owner_id, docked_ships in updated_planets:
+            planet._set(self._players, health, current, remaining, owner_id, docked_ships, changes)
+
+        self.changes = changes
+        self._ship_table._assign(ships)
+        self._planet_table._assign(planets)
 
     def all_ghost(self):
         """
         Helper function to extract all ghosts
 
-        :return: List of ghost
-        :rtype: List[Circle]
+        :return: List of ghost, as (current position, future position) of the ships
+        :rtype: List[(Circle, Circle)]
+        """
+        return self._ghosts.all()
+
+    def ghost_store(self):
+        """
+        :return: The ghosts of the turn, in arrays
+        :rtype: GhostStore
         """
         return self._ghosts
 
@@ -166,7 +356,201 @@ class Map:
         return obstacles
 
     def add_ghost(self,ghost):
-        self._ghosts.append(ghost)
+        """
+        :param ghost: The current & the future position of a ship, as (start, ghost)
+        :return: The index of the ghost in the GhostStore
+        """
+        index = self._ghosts.add(*ghost)
+        if self._obstacle_grid is not None:
+            self._obstacle_grid.index_ghost(index)
+        return index
+
+    def obstacle_grid(self):
+        """
+        The obstacles of the turn (ships, planets & ghosts) in a uniform grid, built once per turn
+
+        :return: The grid used by the navigation
+        :rtype: ObstacleGrid
+        """
+        if self._obstacle_grid is None:
+            self._obstacle_grid = ObstacleGrid(self)
+        return self._obstacle_grid
+
+    def planet_graph(self):
+        """
+        The waypoints around the planets & the shortest paths between them, rebuilt only when a planet is destroyed
+
+        :return: The graph used to route the ships around the planets
+        :rtype: PlanetGraph
+        """
+        # Imported here: only the bots routing their ships (see Ship.navigate) build the graph
+        from bot.routing import PlanetGraph
+        if self._planet_graph is None or self._planet_graph.nb_planets != len(self._planets):
+            self._planet_graph = PlanetGraph(self)
+            # The flow fields go around the planets too
+            self._flow_fields = {}
+        return self._planet_graph
+
+    def flow_field(self, target):
+        """
+        The flow field toward a target, shared by the drones going to it. It's built once FLOW_MIN_DRONES drones
+        asked for it this turn, then kept while no planet is destroyed for a planet, for this turn only otherwise.
+
+        :param target: The target of the drones: a planet or a position
+        :return: The flow field, None while too few drones go to the target, or for a ship
+        :rtype: FlowField
+        """
+        # Imported here: only the bots asking for flow fields (see Ship.navigate) build them
+        from bot.routing import FlowField
+        from bot.settings import FLOW_MIN_DRONES
+        # The fields of the planets are reset with the planet graph
+        self.planet_graph()
+        if self._flow_turn != self.turn:
+            self._flow_turn = self.turn
+            self._flow_demand = {}
+            self._flow_fields = {key: field for key, field in self._flow_fields.items() if key[0] == "planet"}
+        if isinstance(target, entity.Planet):
+            key = ("planet", target.id)
+        elif isinstance(target, entity.Position):
+            key = ("position", int(round(target.pos.x)), int(round(target.pos.y)))
+        else:
+            # The ships move every turn, their fields would be built for a single turn & a few drones
+            return None
+        field = self._flow_fields.get(key)
+        if field is None:
+            self._flow_demand[key] = self._flow_demand.get(key, 0) + 1
+            if self._flow_demand[key] >= FLOW_MIN_DRONES:
+                field = FlowField(self, target.pos)
+                self._flow_fields[key] = field
+        return field
+
+#: Static description of a planet in the initial map
+PlanetGeometry = namedtuple("PlanetGeometry", "id x y radius docking_spots health")
+#: Starting position of a ship in the initial map
+ShipStart = namedtuple("ShipStart", "id owner x y")
+
+
+class InitialMap(namedtuple("InitialMap", "my_id width height player_ids planets ships")):
+    """
+    Immutable snapshot of the map before the game starts.
+    Only made of tuples so it can be shared freely, nothing needs to be copied.
+
+    :ivar my_id: Current player id associated with the map
+    :ivar width: Map width
+    :ivar height: Map height
+    :ivar player_ids: Tuple of all player ids
+    :ivar planets: Tuple of PlanetGeometry, ordered as sent by the engine
+    :ivar ships: Tuple of ShipStart, ordered as sent by the engine
+    """
+    __slots__ = ()
+
+    def get_planet(self, planet_id):
+        """
+        :param int planet_id:
+        :return: The geometry of the planet, None if not found
+        :rtype: PlanetGeometry
+        """
+        for planet in self.planets:
+            if planet.id == planet_id:
+                return planet
+        return None
+
+    def player_ships(self, player_id):
+        """
+        :param int player_id: The id of the player
+        :return: The starting positions of the player's ships
+        :rtype: tuple[ShipStart]
+        """
+        return tuple(ship for ship in self.ships if ship.owner == player_id)
+
+    @staticmethod
+    def _parse(my_id, width, height, map_string):
+        """
+        Build the snapshot directly from the initial map description
+
+        :param my_id: User's id (tag)
+        :param width: Map width
+        :param height: Map height
+        :param map_string: The string which the Halite engine outputs
+        :return: the snapshot
+        :rtype: InitialMap
+        """
+        tokens = map_string.split()
+        player_ids = []
+        ships = []
+        num_players = int(tokens[0])
+        cursor = 1
+        for _ in range(num_players):
+            player_id = int(tokens[cursor])
+            num_ships = int(tokens[cursor + 1])
+            cursor += 2
+            for _ in range(num_ships):
+                ships.append(ShipStart(int(tokens[cursor]), player_id, float(tokens[cursor + 1]), float(tokens[cursor + 2])))
+                cursor += 10
+            player_ids.append(player_id)
+
+        planets = []
+        num_planets = int(tokens[cursor])
+        cursor += 1
+        for _ in range(num_planets):
+            planets.append(PlanetGeometry(int(tokens[cursor]), float(tokens[cursor + 1]), float(tokens[cursor + 2]),
+                                          float(tokens[cursor + 4]), int(tokens[cursor + 5]), int(tokens[cursor + 3])))
+            # Skip the docked ships
+            cursor += 11 + int(tokens[cursor + 10])
+
+        return InitialMap(my_id, width, height, tuple(player_ids), tuple(planets), tuple(ships))
+
+
+class MapChanges:
+    """
+    Entities that changed since the previous turn, filled by Map._update
+
+    :ivar spawned_ships: Ids of the ships created this turn
+    :ivar destroyed_ships: Ids of the ships destroyed this turn
+    :ivar moved_ships: Ids of the ships whose position changed
+    :ivar docking_ships: Ids of the ships whose docking status changed
+    :ivar damaged_ships: Ids of the ships whose health changed
+    :ivar destroyed_planets: Ids of the planets destroyed this turn
+    :ivar owner_planets: Ids of the planets whose owner changed
+    :ivar docked_planets: Ids of the planets whose list of docked ships changed
+    :ivar damaged_planets: Ids of the planets whose health changed
+    """
+    def __init__(self):
+        self.spawned_ships = set()
+        self.destroyed_ships = set()
+        self.moved_ships = set()
+        self.docking_ships = set()
+        self.damaged_ships = set()
+        self.destroyed_planets = set()
+        self.owner_planets = set()
+        self.docked_planets = set()
+        self.damaged_planets = set()
+
+    def ship_changed(self, ship_id):
+        """
+        :param int ship_id: The id of the ship
+        :return: True if the ship was spawned, moved, damaged or changed its docking status
+        :rtype: bool
+        """
+        return ship_id in self.spawned_ships or ship_id in self.moved_ships or \
+            ship_id in self.docking_ships or ship_id in self.damaged_ships
+
+    def planet_changed(self, planet_id):
+        """
+        :param int planet_id: The id of the planet
+        :return: True if the planet changed owner, docked ships or health
+        :rtype: bool
+        """
+        return planet_id in self.owner_planets or planet_id in self.docked_planets or \
+            planet_id in self.damaged_planets
+
+    def __str__(self):
+        return "MapChanges(spawned={}, destroyed={}, moved={}, docking={}, damaged={}, planets destroyed={}, " \
+               "owner={}, docked={}, damaged={})".format(
+                len(self.spawned_ships), len(self.destroyed_ships), len(self.moved_ships), len(self.docking_ships),
+                len(self.damaged_ships), len(self.destroyed_planets), len(self.owner_planets),
+                len(self.docked_planets), len(self.damaged_planets))
+
 
 class Player:
     """
@@ -180,6 +564,76 @@ class Player:
         self.id = player_id
         self._ships = ships
 
+    def _update(self, players, planets, tokens, cursor, changes):
+        """
+        Update the player's ships in place from tokenized input, create the spawned ships
+        and drop the destroyed ones.
+
+        :param dict[int, Player] players: The players of the map, used to link spawned ships
+        :param dict[int, entity.Planet] planets: The planets of the map, used to link docked ships
+        :param list[str] tokens: The tokenized input
+        :param int cursor: The index of the first token of the ships section
+        :param MapChanges changes: Where to report the changes
+        :return: the index of the next unused token
+        :rtype: int
+        """
+        num_ships = int(tokens[cursor])
+        cursor += 1
+        ships = {}
+        nb_spawned = 0
+        for _ in range(num_ships):
+            ship_id = int(tokens[cursor])
+            ship = self._ships.get(ship_id)
+            if ship is None:
+                # Newly spawned ship
+                ship_id, ship, cursor = entity.Ship._parse_single(self.id, tokens, cursor)
+                ship.owner = self
+                ship.planet = planets.get(ship.planet)
+                changes.spawned_ships.add(ship_id)
+                nb_spawned += 1
+            else:
+                cursor = ship._update(planets, tokens, cursor, changes)
+            ships[ship_id] = ship
+        # Ships that are not sent anymore are dead
+        if len(ships) != len(self._ships) + nb_spawned:
+            for ship_id in self._ships.keys():
+                if ship_id not in ships:
+                    changes.destroyed_ships.add(ship_id)
+        self._ships = ships
+        return cursor
+
+    def _update_rows(self, planets, rows, changes):
+        """
+        Update the player's ships in place from rows of values, create the spawned ships
+        and drop the destroyed ones (see _update & Map._load_columns)
+
+        :param dict[int, entity.Planet] planets: The planets of the map, used to link docked ships
+        :param list[tuple] rows: (id, x, y, health, vel_x, vel_y, docking_status, planet, progress, cooldown) per ship
+        :param MapChanges changes: Where to report the changes
+        :return: nothing
+        """
+        ships = {}
+        nb_spawned = 0
+        for ship_id, x, y, health, vel_x, vel_y, docking_status, planet, progress, cooldown in rows:
+            ship = self._ships.get(ship_id)
+            if ship is None:
+                # Newly spawned ship
+                ship = entity.Ship(self.id, ship_id, x, y, health, vel_x, vel_y,
+                                   entity.Ship.DockingStatus(docking_status), planet, progress, cooldown)
+                ship.owner = self
+                ship.planet = planets.get(ship.planet)
+                changes.spawned_ships.add(ship_id)
+                nb_spawned += 1
+            else:
+                ship._set(planets, x, y, health, vel_x, vel_y, docking_status, planet, progress, cooldown, changes)
+            ships[ship_id] = ship
+        # Ships that are not sent anymore are dead
+        if len(ships) != len(self._ships) + nb_spawned:
+            for ship_id in self._ships.keys():
+                if ship_id not in ships:
+                    changes.destroyed_ships.add(ship_id)
+        self._ships = ships
+
     def all_ships(self):
         """
         :return: A list of all ships which belong to the user
@@ -198,37 +652,39 @@ class Player:
 
 
     @staticmethod
-    def _parse_single(tokens):
+    def _parse_single(tokens, cursor):
         """
         Parse one user given an input string from the Halite engine.
 
         :param list[str] tokens: The input string as a list of str from the Halite engine.
-        :return: The parsed player id, player object, and remaining tokens
-        :rtype: (int, Player, list[str])
+        :param int cursor: The index of the first token of this player
+        :return: The parsed player id, player object, and the index of the next unused token
+        :rtype: (int, Player, int)
         """
-        player_id, *remainder = tokens
-        player_id = int(player_id)
-        ships, remainder = entity.Ship._parse(player_id, remainder)
+        player_id = int(tokens[cursor])
+        ships, cursor = entity.Ship._parse(player_id, tokens, cursor + 1)
         player = Player(player_id, ships)
-        return player_id, player, remainder
+        return player_id, player, cursor
 
     @staticmethod
-    def _parse(tokens):
+    def _parse(tokens, cursor):
         """
         Parse an entire user input string from the Halite engine for all users.
 
         :param list[str] tokens: The input string as a list of str from the Halite engine.
-        :return: The parsed players in the form of player dict, and remaining tokens
-        :rtype: (dict, list[str])
+        :param int cursor: The index of the first token of the players section
+        :return: The parsed players in the form of player dict, and the index of the next unused token
+        :rtype: (dict, int)
         """
-        num_players, *remainder = tokens
-        num_players = int(num_players)
+        num_players = int(tokens[cursor])
+        cursor += 1
         players = {}
 
         for _ in range(num_players):
-            player, players[player], remainder = Player._parse_single(remainder)
+            player_id, player, cursor = Player._parse_single(tokens, cursor)
+            players[player_id] = player
 
-        return players, remainder
+        return players, cursor
 
     def __str__(self):
         return "Player {} with ships {}".format(self.id, self.all_ships())
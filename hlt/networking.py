@@ -1,63 +1,219 @@
 import sys
+import atexit
+import gzip
 import logging
-import copy
+from datetime import datetime
+from time import perf_counter
 from . import game_map
 import os
 
-class Game:
+
+class Transport:
     """
-    :ivar map: Current map representation
-    :ivar initial_map: The initial version of the map before game starts
+    Link with the Halite engine through the binary stdin/stdout buffers.
+    Frames are read as raw bytes and each message is written as a single pre-joined payload.
+    Every exchange is timestamped (time.perf_counter) to tell engine stalls apart from bot stalls.
+
+    :ivar frame_received: When the last frame was received
+    :ivar commands_sent: When the last message was sent
+    :ivar engine_time: Time between the last message sent and the frame that followed (engine + other bots)
+    :ivar bot_time: Time between the last frame received and the message that answered it
     """
 
+    def __init__(self, stdin=None, stdout=None):
+        """
+        :param stdin: Binary stream to read the frames from, defaults to sys.stdin.buffer
+        :param stdout: Binary stream to write the commands to, defaults to sys.stdout.buffer
+        """
+        self._stdin = stdin if stdin is not None else sys.stdin.buffer
+        self._stdout = stdout if stdout is not None else sys.stdout.buffer
+        self.frame_received = None
+        self.commands_sent = None
+        self.engine_time = None
+        self.bot_time = None
 
+    def read_frame(self):
+        """
+        Read a single line from the engine.
 
-    @staticmethod
-    def _send_string(s):
-        global _connection
+        :return: The line, without the line break
+        :rtype: str
         """
-        Send data to the game. Call :function:`done_sending` once finished.
+        frame = self._stdin.readline()
+        self.frame_received = perf_counter()
+        if self.commands_sent is not None:
+            self.engine_time = self.frame_received - self.commands_sent
+        return frame.rstrip(b'\r\n').decode()
 
-        :param str s: String to send
+    def send_line(self, line):
+        """
+        Send a single line to the engine and flush it.
+
+        :param str line: The line, without the line break
         :return: nothing
         """
-        sys.stdout.write(s)
+        self._stdout.write(line.encode() + b'\n')
+        self._stdout.flush()
+        self.commands_sent = perf_counter()
+        if self.frame_received is not None:
+            self.bot_time = self.commands_sent - self.frame_received
 
-    @staticmethod
-    def _done_sending():
-        global _connection
+    def send_commands(self, command_queue):
         """
-        Finish sending commands to the game.
+        Send the whole command queue as a single payload.
 
+        :param list[str] command_queue: List of commands to send the Halite engine
         :return: nothing
         """
-        sys.stdout.write('\n')
-        sys.stdout.flush()
+        self.send_line(''.join(command_queue))
+
+
+class RecordingTransport(Transport):
+    """
+    Transport that also saves every line exchanged with the engine in a gzip file, so the game can be
+    replayed without the engine (see ReplayTransport & tools/replay.py).
+    Received lines are prefixed with RECEIVED, sent lines with SENT.
+    """
+
+    RECEIVED = "<"
+    SENT = ">"
+
+    def __init__(self, record_file, stdin=None, stdout=None):
+        """
+        :param record_file: Path of the recording to create
+        :param stdin: Binary stream to read the frames from, defaults to sys.stdin.buffer
+        :param stdout: Binary stream to write the commands to, defaults to sys.stdout.buffer
+        """
+        super().__init__(stdin, stdout)
+        self._record = gzip.open(record_file, 'wt')
+        atexit.register(self.close)
+
+    def read_frame(self):
+        frame = super().read_frame()
+        self._record.write(RecordingTransport.RECEIVED + frame + '\n')
+        return frame
+
+    def send_line(self, line):
+        super().send_line(line)
+        self._record.write(RecordingTransport.SENT + line + '\n')
+        # Flush once the commands are sent, not to delay them
+        self._record.flush()
+
+    def close(self):
+        """
+        Close the recording
+
+        :return: nothing
+        """
+        if not self._record.closed:
+            self._record.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Transport feeding a recording back to the bot, no engine needed.
+    Once the recording is exhausted an empty frame is returned, like the engine does when the game is over.
+
+    :ivar received: Every line received by the recorded bot
+    :ivar recorded: Every line sent by the recorded bot
+    :ivar sent: Every line sent during the replay
+    """
+
+    def __init__(self, record_file):
+        """
+        :param record_file: Path of the recording to replay
+        """
+        super().__init__(stdin=sys.stdin, stdout=sys.stdout)
+        self.received, self.recorded = ReplayTransport.load(record_file)
+        self.sent = []
+        self._next = 0
 
     @staticmethod
-    def _get_string():
-        global _connection
+    def load(record_file):
+        """
+        Read a recording
+
+        :param record_file: Path of the recording
+        :return: the lines received and the lines sent by the recorded bot
+        :rtype: (list[str], list[str])
+        """
+        received = []
+        sent = []
+        with gzip.open(record_file, 'rt') as record:
+            for line in record:
+                line = line.rstrip('\n')
+                if line.startswith(RecordingTransport.RECEIVED):
+                    received.append(line[1:])
+                else:
+                    sent.append(line[1:])
+        return received, sent
+
+    def read_frame(self):
+        self.frame_received = perf_counter()
+        if self.commands_sent is not None:
+            self.engine_time = self.frame_received - self.commands_sent
+        if self._next >= len(self.received):
+            return ""
+        self._next += 1
+        return self.received[self._next - 1]
+
+    def send_line(self, line):
+        self.sent.append(line)
+        self.commands_sent = perf_counter()
+        if self.frame_received is not None:
+            self.bot_time = self.commands_sent - self.frame_received
+
+
+class Game:
+    """
+    :ivar map: Current map representation
+    :ivar initial_map: The initial version of the map before game starts (game_map.InitialMap)
+    :ivar transport: The link with the engine (Transport)
+    """
+
+    def _send_string(self, s):
+        """
+        Send a single line to the game.
+
+        :param str s: String to send
+        :return: nothing
+        """
+        self.transport.send_line(s)
+
+    def _get_string(self):
         """
         Read input from the game.
 
         :return: The input read from the Halite engine
         :rtype: str
         """
-        result = sys.stdin.readline().rstrip('\n')
-        return result
+        return self.transport.read_frame()
 
-    @staticmethod
-    def send_command_queue(command_queue):
+    def send_command_queue(self, command_queue):
         """
         Issue the given list of commands.
 
         :param list[str] command_queue: List of commands to send the Halite engine
         :return: nothing
         """
-        for command in command_queue:
-            Game._send_string(command)
+        self.transport.send_commands(command_queue)
+        logging.info("Time in bot: %.4f" % self.transport.bot_time)
+
+    @staticmethod
+    def _default_transport(name):
+        """
+        Create the link with the engine, if RAMPA_RECORD is set to a directory the game is recorded in it
 
-        Game._done_sending()
+        :param name: The bot name (used for naming the recording)
+        :return: the transport
+        :rtype: Transport
+        """
+        record_dir = os.environ.get('RAMPA_RECORD')
+        if not record_dir:
+            return Transport()
+        record_file = os.path.join(record_dir, "{}_{}_{}.rec.gz".format(
+            name, datetime.now().strftime("%Y-%m-%d_%H-%M-%S"), os.getpid()))
+        return RecordingTransport(record_file)
 
     @staticmethod
     def _set_up_logging(tag, name):
@@ -79,23 +235,29 @@ class Game:
             logging.basicConfig(filename=log_file, level=logging.WARNING, filemode='w')
         logging.info("Initialized bot {}".format(name))
 
-    def __init__(self, name):
-        global _connection
+    def __init__(self, name, incremental=False, transport=None):
         """
         Initialize the bot with the given name.
 
         :param name: The name of the bot.
+        :param incremental: Update the map in place every turn instead of rebuilding it, see Map._update
+        :param transport: The link with the engine, defaults to a Transport on stdin/stdout
+                          (recorded if the RAMPA_RECORD environment variable is set)
         """
 
+        self.transport = transport if transport is not None else Game._default_transport(name)
         self.turn = -1
+        self._incremental = incremental
         self._name = name
         self._send_name = False
         tag = int(self._get_string())
         Game._set_up_logging(tag, name)
         width, height = [int(x) for x in self._get_string().strip().split()]
         self.map = game_map.Map(tag, width, height)
-        self.update_map()
-        self.initial_map = copy.deepcopy(self.map)
+        initial_string = self._get_string()
+        # Frozen snapshot of the initial state, built from the tokens so the map doesn't need to be copied
+        self.initial_map = game_map.InitialMap._parse(tag, width, height, initial_string)
+        self._update_map(initial_string)
         self._send_name = True
 
     def update_map(self):
@@ -107,9 +269,25 @@ class Game:
         """
         if self._send_name:
             self._send_string(self._name)
-            self._done_sending()
             self._send_name = False
+        map_string = self._get_string()
+        if self.transport.engine_time is not None:
+            logging.info("Time in engine: %.4f" % self.transport.engine_time)
+        return self._update_map(map_string)
+
+    def _update_map(self, map_string):
+        """
+        Parse the given map description into the current map
+
+        :param str map_string: The map description sent by the engine
+        :return: new parsed map
+        :rtype: game_map.Map
+        """
         logging.info("---[%s]---NEW TURN---" % self.turn)
-        self.map._parse(self._get_string(), self.turn)
+        if self._incremental and self.turn >= 0:
+            # Keep the entities of the previous turn, only spawned & destroyed ones are created/removed
+            self.map._update(map_string, self.turn)
+        else:
+            self.map._parse(map_string, self.turn)
         self.turn+=1
         return self.map
@@ -0,0 +1,241 @@
+import numpy as np
+
+
+class Table:
+    """
+    Struct of arrays holding one entity per row, filled by the map parser every turn.
+    The buffers are allocated once and only grow when the number of rows exceeds the capacity,
+    every column is exposed as a view on the first `size` rows of its buffer.
+
+    :ivar size: The number of valid rows for the current turn
+    """
+
+    # (column name, dtype), overridden by sub-classes
+    COLUMNS = ()
+
+    def __init__(self, capacity=64):
+        """
+        :param capacity: The initial number of rows of the buffers
+        """
+        self.size = 0
+        self._capacity = 0
+        self._buffers = {}
+        self._index = None
+        self._grow(capacity)
+        self._expose()
+
+    def _grow(self, capacity):
+        """
+        Make sure the buffers can hold `capacity` rows, valid rows are kept
+
+        :param int capacity: The number of rows needed
+        :return: nothing
+        """
+        if capacity <= self._capacity:
+            return
+        # Double the capacity to avoid growing every turn
+        new_capacity = max(capacity, self._capacity * 2)
+        for name, dtype in self.COLUMNS:
+            buffer = np.zeros(new_capacity, dtype=dtype)
+            if name in self._buffers:
+                buffer[:self.size] = self._buffers[name][:self.size]
+            self._buffers[name] = buffer
+        self._capacity = new_capacity
+
+    def _expose(self):
+        """
+        Expose every column as a view of the valid rows
+
+        :return: nothing
+        """
+        for name, _ in self.COLUMNS:
+            setattr(self, name, self._buffers[name][:self.size])
+        # The id -> row dictionary is rebuilt lazily
+        self._index = None
+
+    def buffer(self, name):
+        """
+        :param str name: The column name
+        :return: The whole buffer of the column, including the unused rows
+        :rtype: np.ndarray
+        """
+        return self._buffers[name]
+
+    def row(self, entity_id):
+        """
+        :param int entity_id: The id of the entity
+        :return: The row of the entity in the table, None if not found
+        :rtype: int
+        """
+        if self._index is None:
+            self._index = {other_id: row for row, other_id in enumerate(self.id.tolist())}
+        return self._index.get(entity_id)
+
+    def _assign(self, columns):
+        """
+        Fill the table with whole columns of values, instead of parsing a frame
+
+        :param dict[str, np.ndarray] columns: Every column of the table, indexed by name
+        :return: nothing
+        """
+        size = len(columns["id"])
+        self._grow(size)
+        for name, _ in self.COLUMNS:
+            self._buffers[name][:size] = columns[name]
+        self.size = size
+        self._expose()
+
+    def __len__(self):
+        return self.size
+
+
+class ShipTable(Table):
+    """
+    Every ship of the current turn, one ship per row.
+    Rows follow the order of the frame, which is also the order of Map.all_ships()
+
+    :ivar id: The ship ids
+    :ivar owner: The player ids
+    :ivar x: The x-coordinates
+    :ivar y: The y-coordinates
+    :ivar health: The healths
+    :ivar vel_x: The x-velocities sent by the engine
+    :ivar vel_y: The y-velocities sent by the engine
+    :ivar docking_status: The docking status (see Ship.DockingStatus)
+    :ivar planet: The id of the planet the ship is docked to, -1 if undocked
+    :ivar progress: The docking progress
+    :ivar cooldown: The weapon cooldown
+    """
+
+    COLUMNS = (
+        ("id", np.int32),
+        ("owner", np.int32),
+        ("x", np.float64),
+        ("y", np.float64),
+        ("health", np.int32),
+        ("vel_x", np.float64),
+        ("vel_y", np.float64),
+        ("docking_status", np.int8),
+        ("planet", np.int32),
+        ("progress", np.int32),
+        ("cooldown", np.int32),
+    )
+
+    # Number of tokens describing a ship
+    NB_TOKENS = 10
+
+    def __init__(self, capacity=256):
+        super().__init__(capacity)
+
+    def _load_player(self, player_id, tokens, cursor, num_ships):
+        """
+        Append all ships of a player, converting the whole block of tokens at once
+
+        :param int player_id: The owner of the ships
+        :param list[str] tokens: The tokenized input
+        :param int cursor: The index of the first token of the first ship
+        :param int num_ships: The number of ships of the player
+        :return: the index of the next unused token
+        :rtype: int
+        """
+        end = cursor + num_ships * ShipTable.NB_TOKENS
+        if num_ships == 0:
+            return end
+        start = self.size
+        self._grow(start + num_ships)
+        block = np.array(tokens[cursor:end], dtype=np.float64).reshape(num_ships, ShipTable.NB_TOKENS)
+        rows = slice(start, start + num_ships)
+        buffers = self._buffers
+        buffers["id"][rows] = block[:, 0]
+        buffers["owner"][rows] = player_id
+        buffers["x"][rows] = block[:, 1]
+        buffers["y"][rows] = block[:, 2]
+        buffers["health"][rows] = block[:, 3]
+        buffers["vel_x"][rows] = block[:, 4]
+        buffers["vel_y"][rows] = block[:, 5]
+        buffers["docking_status"][rows] = block[:, 6]
+        # Same convention as Ship.planet: no planet when undocked
+        buffers["planet"][rows] = np.where(block[:, 6] == 0, -1, block[:, 7])
+        buffers["progress"][rows] = block[:, 8]
+        buffers["cooldown"][rows] = block[:, 9]
+        self.size = start + num_ships
+        return end
+
+    def _load(self, tokens):
+        """
+        Fill the table with the players section of a frame
+
+        :param list[str] tokens: The tokenized input
+        :return: the index of the first token after the players section
+        :rtype: int
+        """
+        self.size = 0
+        num_players = int(tokens[0])
+        cursor = 1
+        for _ in range(num_players):
+            player_id = int(tokens[cursor])
+            num_ships = int(tokens[cursor + 1])
+            cursor = self._load_player(player_id, tokens, cursor + 2, num_ships)
+        self._expose()
+        return cursor
+
+
+class PlanetTable(Table):
+    """
+    Every planet of the current turn, one planet per row
+
+    :ivar id: The planet ids
+    :ivar x: The x-coordinates
+    :ivar y: The y-coordinates
+    :ivar health: The healths
+    :ivar radius: The radius
+    :ivar docking_spots: The max number of docked ships
+    :ivar current_production: The current production
+    :ivar remaining_resources: The remaining resources
+    :ivar owner: The player id of the owner, -1 if not owned
+    :ivar nb_docked: The number of docked ships
+    """
+
+    COLUMNS = (
+        ("id", np.int32),
+        ("x", np.float64),
+        ("y", np.float64),
+        ("health", np.int32),
+        ("radius", np.float64),
+        ("docking_spots", np.int32),
+        ("current_production", np.int32),
+        ("remaining_resources", np.int32),
+        ("owner", np.int32),
+        ("nb_docked", np.int32),
+    )
+
+    def _load(self, tokens, cursor):
+        """
+        Fill the table with the planets section of a frame
+
+        :param list[str] tokens: The tokenized input
+        :param int cursor: The index of the first token of the planets section
+        :return: the index of the next unused token
+        :rtype: int
+        """
+        num_planets = int(tokens[cursor])
+        cursor += 1
+        self.size = 0
+        self._grow(num_planets)
+        buffers = self._buffers
+        for row in range(num_planets):
+            num_docked = int(tokens[cursor + 10])
+            buffers["id"][row] = int(tokens[cursor])
+            buffers["x"][row] = float(tokens[cursor + 1])
+            buffers["y"][row] = float(tokens[cursor + 2])
+            buffers["health"][row] = int(tokens[cursor + 3])
+            buffers["radius"][row] = float(tokens[cursor + 4])
+            buffers["docking_spots"][row] = int(tokens[cursor + 5])
+            buffers["current_production"][row] = int(tokens[cursor + 6])
+            buffers["remaining_resources"][row] = int(tokens[cursor + 7])
+            buffers["owner"][row] = int(tokens[cursor + 9]) if int(tokens[cursor + 8]) else -1
+            buffers["nb_docked"][row] = num_docked
+            cursor += 11 + num_docked
+        self.size = num_planets
+        self._expose()
+        return cursor
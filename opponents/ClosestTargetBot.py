@@ -1,14 +1,12 @@
 import sys
 import os
-dir_path = os.path.join(os.path.dirname(os.path.realpath(__file__)),"..")
+dir_path = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)),".."))
 sys.path.append(dir_path)
 import pyximport
 pyximport.install()
 import hlt
 import logging
 from collections import OrderedDict
-game = hlt.Game("Rampa-V6")
-logging.info("Starting Rampa Bot")
 logger = logging.getLogger(__name__)
 
 #Some global
@@ -21,17 +19,30 @@ MAX_RATIO_SHIP_ATTACKERS = 0.25
 #NB of docked ship per planet
 MAX_NB_DOCKED_SHIP = 5
 
-#Store all the ships that are dedicated to the attacks between MIN_SHIP_ATTACKERS and MAX_RATIO_SHIP_ATTACKERS
-ship_attackers = {}
-#Store all ship that are dedicated to conquest, between MAX_RATIO_SHIP_ATTACKERS and (100%  -  MIN_SHIP_ATTACKERS)
-ship_conquerors = {}
-#Store new ship that has never been seen before (to allocate between attack & conquest)
-new_ship =[]
-try:
-    while True:
+
+class ClosestTargetBot:
+    """
+    Split the ships between attackers, going for the closest enemy ship, and conquerors, going for the closest
+    empty planet. Used as a script by halite.exe or as a policy by the in-process engine (engine/inprocess.py)
+    """
+
+    name = "Rampa-V6"
+
+    def __init__(self):
+        #Store all the ships that are dedicated to the attacks between MIN_SHIP_ATTACKERS and MAX_RATIO_SHIP_ATTACKERS
+        self.ship_attackers = {}
+        #Store all ship that are dedicated to conquest, between MAX_RATIO_SHIP_ATTACKERS and (100%  -  MIN_SHIP_ATTACKERS)
+        self.ship_conquerors = {}
+
+    def play_turn(self, game_map):
+        """
+        :param game_map: the game_map for the current turn
+        :return: the command_queue for the game to process
+        """
         logger.debug("In new turn loop")
-        game_map = game.update_map()
         command_queue = []
+        #Store new ship that has never been seen before (to allocate between attack & conquest)
+        new_ship = []
 
         #Count nb of owned planets:
         all_planets = game_map.all_planets()
@@ -51,7 +62,7 @@ try:
 
         nb_attackers_died = 0
         #Check if attackers are still alive
-        for ship_id in list(ship_attackers.keys()):
+        for ship_id in list(self.ship_attackers.keys()):
             dead = False
             try:
                 ship = team_ships_dict[ship_id]
@@ -65,11 +76,11 @@ try:
             if dead:
                 logger.debug("Attacker died")
                 nb_attackers_died+=1
-                del ship_attackers[ship_id]
+                del self.ship_attackers[ship_id]
 
         nb_conquerors_died = 0
         #Check if attackers are still alive
-        for ship_id in list(ship_conquerors.keys()):
+        for ship_id in list(self.ship_conquerors.keys()):
             dead = False
             try:
                 ship = team_ships_dict[ship_id]
@@ -83,7 +94,7 @@ try:
             if dead:
                 logger.debug("Conqueror died")
                 nb_conquerors_died+=1
-                del ship_conquerors[ship_id]
+                del self.ship_conquerors[ship_id]
 
         #Now check for new ships
         for ship in team_ships:
@@ -93,12 +104,12 @@ try:
                 continue
             found = False
             try:
-                t = ship_attackers[ship.id]
+                t = self.ship_attackers[ship.id]
                 found = True
             except:
                 pass
             try:
-                t = ship_conquerors[ship.id]
+                t = self.ship_conquerors[ship.id]
                 found = True
             except:
                 pass
@@ -112,7 +123,7 @@ try:
 
         #If there are not enough attackers, take some ship in the new ship list
         #TODO if there are not empty planet left, send all to attack
-        nb_attackers = len(ship_attackers)
+        nb_attackers = len(self.ship_attackers)
         current_ratio = nb_attackers / float(len(team_ships))
         logger.debug("nb_attackers: %s, current_ratio: %s" % (nb_attackers,current_ratio))
         while ((nb_attackers < MIN_SHIP_ATTACKERS) or (current_ratio < MAX_RATIO_SHIP_ATTACKERS)) and (len(new_ship)>0) :
@@ -123,22 +134,19 @@ try:
             logger.debug("Take ship: %s " % ship.id)
             logger.debug("Removed from new_ship: %s " % ship.id)
             #Add to attackers
-            ship_attackers[ship.id] = 1
+            self.ship_attackers[ship.id] = 1
             logger.debug("Added to attackers: %s " % ship.id)
-            nb_attackers = len(ship_attackers)
+            nb_attackers = len(self.ship_attackers)
             current_ratio = nb_attackers / float(len(team_ships))
             logger.debug("nb_attackers: %s, current_ratio: %s" % (nb_attackers,current_ratio))
 
         #Add all the other new_ship to conquerors
         for ship in new_ship:
             #Add to attackers
-            ship_conquerors[ship.id] = 1
-
-        #Reset new_ship
-        new_ship = []
+            self.ship_conquerors[ship.id] = 1
 
         #HANDLE all attackers
-        for ship_id in ship_attackers:
+        for ship_id in self.ship_attackers:
             ship = team_ships_dict[ship_id]
             entities_by_distance = game_map.nearby_entities_by_distance(ship)
             entities_by_distance = OrderedDict(sorted(entities_by_distance.items(), key=lambda t: t[0]))
@@ -163,7 +171,7 @@ try:
         #HANDLE all conquerors
         nb_ship_per_planet = {}
 
-        for ship_id in ship_conquerors:
+        for ship_id in self.ship_conquerors:
             ship = team_ships_dict[ship_id]
 
             entities_by_distance = game_map.nearby_entities_by_distance(ship)
@@ -208,9 +216,9 @@ try:
                     continue
 
             #If there is only 1 ship left, no need to coordinate them, go to the closest planet
-            if len(ship_conquerors) == 1:
+            if len(self.ship_conquerors) == 1:
                 navigate_command = ship.navigate(
-                    ship.closest_point_to(target_planet),
+                    ship.closest_point_to(closest_empty_planets[0]),
                     game_map,
                     speed=int(hlt.constants.MAX_SPEED),
                     ignore_ships=False)
@@ -243,8 +251,17 @@ try:
                     #Exit target planet loop
                     break
 
-        game.send_command_queue(command_queue)
-        # TURN END
-    # GAME END
-except:
-    logger.exception("BIG CRASH")
\ No newline at end of file
+        return command_queue
+
+
+if __name__ == '__main__':
+    game = hlt.Game(ClosestTargetBot.name)
+    logging.info("Starting Rampa Bot")
+    bot = ClosestTargetBot()
+    try:
+        while True:
+            game.send_command_queue(bot.play_turn(game.update_map()))
+            # TURN END
+        # GAME END
+    except:
+        logger.exception("BIG CRASH")
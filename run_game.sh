@@ -1,3 +1,4 @@
 #!/bin/sh
 
-./halite -d "240 160" "python3 MyBot.py" "python3 MyBot.py"
\ No newline at end of file
+python3 setup.py build_ext --inplace || exit 1
+python3 -m engine -d "240 160" "python3 MyBot.py" "python3 MyBot.py"
@@ -3,5 +3,5 @@ from Cython.Build import cythonize
 
 setup(
     name = "RampaBot",
-    ext_modules = cythonize('bot/*.pyx'), requires=['PIL']
+    ext_modules = cythonize('bot/*.pyx'), requires=['numpy']
 )
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+# The game of the benchmarks of tests/: MyBot against rampa & 2 closest, played in-process on the same map
+# The benchmark of a script is called back on the turns it benchmarks, with the map of MyBot.
+"""
+from time import time
+
+import bootstrap
+from engine.inprocess import RampaPolicy, load_policy, run_game_inprocess
+
+WIDTH = 384
+HEIGHT = 256
+SEED = 5
+
+
+class BenchmarkPolicy(RampaPolicy):
+    """
+    MyBot, calling the benchmark back on the turns benchmarked
+
+    :ivar turns: The turns benchmarked
+    :ivar turn_duration: The duration of the last turn played by MyBot, in seconds
+    """
+
+    def __init__(self, turns, before=None, after=None):
+        super().__init__()
+        self.turns = turns
+        self.__before = before
+        self.__after = after
+        self.turn_duration = 0.0
+
+    @property
+    def manager(self):
+        """
+        :return: The manager of MyBot, with its monitor & its influence
+        """
+        return self._bot.manager
+
+    def play_turn(self, game_map):
+        benchmarked = game_map.turn in self.turns
+        if benchmarked and self.__before is not None:
+            self.__before(self, game_map)
+        start_time = time()
+        command_queue = super().play_turn(game_map)
+        self.turn_duration = time() - start_time
+        if benchmarked and self.__after is not None:
+            self.__after(self, game_map)
+        return command_queue
+
+
+def play_benchmark(turns, before=None, after=None):
+    """
+    Play the game of the benchmarks
+    :param turns: The turn benchmarked, or a range of turns
+    :param before: Called with (policy, game_map) before MyBot plays a turn benchmarked
+    :param after: Called with (policy, game_map) once MyBot played it: the velocities, the monitor & the influence
+    are up to date
+    :return: The final state of the game & the bots, see run_game_inprocess
+    """
+    if isinstance(turns, int):
+        turns = (turns,)
+    policies = [BenchmarkPolicy(turns, before, after), load_policy("rampa"), load_policy("closest"),
+                load_policy("closest")]
+    return run_game_inprocess(policies, WIDTH, HEIGHT, SEED, timeouts=False)
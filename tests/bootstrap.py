@@ -0,0 +1,16 @@
+"""
+# Make the repository importable from the scripts of tests/, launched as: python tests/<name>_test.py
+# Imported first by every script, before any module of the repository.
+"""
+import os
+import sys
+
+# Normalized: pyximport builds the cython modules in directories named after their path, a "tests/.." path fails
+# as long as the cache of pyximport is empty
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+if ROOT_PATH not in sys.path:
+    sys.path.append(ROOT_PATH)
+
+# Import & build cython at runtime
+import pyximport
+pyximport.install()
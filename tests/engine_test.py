@@ -0,0 +1,99 @@
+"""
+Benchmark of the local engine: a whole 4 players game without any bot process.
+Every player uses the same greedy policy: dock to the closest planet available, otherwise attack the closest enemy,
+turning around the obstacles on the way.
+"""
+import math
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+import numpy as np
+
+from engine import constants
+from engine.game import GameState
+
+
+def avoid_obstacles(state, row, x, y, speed, angle):
+    """
+    Turn the ship until its move of this turn doesn't cross a planet or the position of another ship
+
+    :return: (speed, angle) of the thrust
+    :rtype: (int, int)
+    """
+    planets = state.planets
+    ships = state.ships
+    others = np.arange(len(ships)) != row
+    obstacles_x = np.concatenate((planets.x[planets.alive], ships.x[others]))
+    obstacles_y = np.concatenate((planets.y[planets.alive], ships.y[others]))
+    obstacles_radius = np.concatenate((planets.radius[planets.alive] + 1.0, np.full(int(others.sum()), 1.5)))
+    for offset in (0, 15, -15, 30, -30, 45, -45, 60, -60, 90, -90):
+        radians = math.radians(angle + offset)
+        dx, dy = speed * math.cos(radians), speed * math.sin(radians)
+        # Distance between the planet centers and the segment of the move
+        length = max(dx * dx + dy * dy, 1e-9)
+        ratio = np.clip(((obstacles_x - x) * dx + (obstacles_y - y) * dy) / length, 0.0, 1.0)
+        distances = np.hypot(x + ratio * dx - obstacles_x, y + ratio * dy - obstacles_y)
+        if not np.any(distances <= obstacles_radius):
+            return speed, (angle + offset) % 360
+    return 0, angle
+
+
+def greedy_commands(state):
+    """
+    :param GameState state: The game
+    :return: The commands of every player
+    :rtype: dict[int, list]
+    """
+    ships = state.ships
+    planets = state.planets
+    undocked = np.flatnonzero(ships.docking_status == constants.UNDOCKED)
+    docked_counts = state._docked_counts()
+    commands = {player_id: [] for player_id in range(state.nb_players)}
+    for row in undocked.tolist():
+        owner = int(ships.owner[row])
+        x, y = ships.x[row], ships.y[row]
+        available = planets.alive & ((planets.owner == -1) | (planets.owner == owner)) & \
+            (docked_counts < planets.docking_spots)
+        distances = np.hypot(planets.x - x, planets.y - y) - planets.radius
+        distances[~available] = np.inf
+        target = int(np.argmin(distances))
+        if np.isfinite(distances[target]):
+            if distances[target] <= constants.DOCK_RADIUS:
+                commands[owner].append(("d", int(ships.id[row]), (target,)))
+                continue
+            target_x, target_y = planets.x[target], planets.y[target]
+            distance = distances[target] - constants.DOCK_RADIUS / 2
+        else:
+            enemies = ships.owner != owner
+            if not enemies.any():
+                continue
+            distances = np.hypot(ships.x - x, ships.y - y)
+            distances[~enemies] = np.inf
+            enemy = int(np.argmin(distances))
+            target_x, target_y = ships.x[enemy], ships.y[enemy]
+            distance = distances[enemy] - 2
+        angle = int(round(math.degrees(math.atan2(target_y - y, target_x - x)))) % 360
+        speed = int(max(0, min(constants.MAX_SPEED, distance)))
+        commands[owner].append(("t", int(ships.id[row]), avoid_obstacles(state, row, x, y, speed, angle)))
+    return commands
+
+
+nb_games = 3
+for seed in range(nb_games):
+    state = GameState(384, 256, 4, seed)
+    start_time = time()
+    engine_duration = 0.0
+    max_ships = 0
+    while not state.is_over():
+        commands = greedy_commands(state)
+        start_engine = time()
+        state.frame()
+        state.step(commands)
+        engine_duration += time() - start_engine
+        max_ships = max(max_ships, len(state.ships))
+    duration = time() - start_time
+    print("seed %s: %s turns, max ships: %s, ranking: %s" % (seed, state.turn, max_ships, state.ranking()))
+    print("engine duration : %.2f s (%.2f ms per turn)" % (engine_duration, engine_duration * 1000.0 / state.turn))
+    print("total duration (with the policy) : %.2f s" % duration)
@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from PIL import Image, ImageDraw
+
+from bot.settings import SHIP_INFLUENCE, PLANET_INFLUENCE, INFLUENCE_STEP, INFLUENCE_ZONE
+from hlt.entity import Ship
+
+"""
+# Original influence images, kept as the reference for influence_test.py
+# Every source draws INFLUENCE_STEP nested ellipses on a PIL image, sorted by color
+"""
+
+
+class ImageInfluence(object):
+
+    def __init__(self, player_id, monitor):
+        self.width = 0
+        self.height = 0
+        self.defense_img = None
+        self.__circle_to_draw_dict = defaultdict(list)
+        self.player_id = player_id
+        self.planet_img = None
+        self.game_map = None
+        self.monitor = monitor
+
+    def add_circle_position(self, entity, influence, free_planet=False):
+        # By default empty planet have a very thin influence zone
+        if free_planet:
+            min_x = entity.pos.x - entity.pos.radius - influence * 2
+            min_y = entity.pos.y - entity.pos.radius - influence * 2
+            max_x = entity.pos.x + entity.pos.radius + influence * 2
+            max_y = entity.pos.y + entity.pos.radius + influence * 2
+            color = entity.id + 1
+            self.__circle_to_draw_dict[color].append([min_x, min_y, max_x, max_y])
+        else:
+            # Other planets or ships have a gradient of influence zone
+            for i in range(INFLUENCE_STEP):
+                min_x = entity.pos.x - entity.pos.radius - influence * (INFLUENCE_STEP - i)
+                min_y = entity.pos.y - entity.pos.radius - influence * (INFLUENCE_STEP - i)
+                max_x = entity.pos.x + entity.pos.radius + influence * (INFLUENCE_STEP - i)
+                max_y = entity.pos.y + entity.pos.radius + influence * (INFLUENCE_STEP - i)
+                color = INFLUENCE_ZONE * (i + 1)
+                self.__circle_to_draw_dict[color].append([min_x, min_y, max_x, max_y])
+
+    def update_game_map(self, game_map):
+        self.width = game_map.width
+        self.height = game_map.height
+        self.game_map = game_map
+
+        self.draw_defense_zone()
+        self.draw_free_planet_zone()
+
+    def draw_defense_zone(self):
+        self.__circle_to_draw_dict = defaultdict(list)
+        self.defense_img = Image.new('L', (self.width, self.height))
+        draw = ImageDraw.Draw(self.defense_img)
+
+        # Get the influence zone of every ships
+        for ship in self.game_map.get_me().all_ships():
+            # Draw a circle for every ship that is docked
+            if ship.docking_status != Ship.DockingStatus.UNDOCKED:
+                self.add_circle_position(ship, SHIP_INFLUENCE, free_planet=False)
+
+        # Get the influence zone of every planets
+        for planet in self.game_map.all_planets():
+            # Make sure it's our planet
+            if planet.is_owned() and planet.owner.id == self.player_id:
+                self.add_circle_position(planet, PLANET_INFLUENCE, free_planet=False)
+
+        # Now draw , ordered by color
+        for color in sorted(self.__circle_to_draw_dict.keys()):
+            for circle in self.__circle_to_draw_dict[color]:
+                draw.ellipse(circle, fill=color, outline=color)
+
+    def draw_free_planet_zone(self):
+        self.__circle_to_draw_dict = defaultdict(list)
+        self.planet_img = Image.new('L', (self.width, self.height))
+        draw = ImageDraw.Draw(self.planet_img)
+
+        # Get the influence zone of every ships
+        for planet_id, planet in self.monitor.get_all_planets_dict().items():
+            # Draw a circle for every planet that is free
+            if (not planet.is_owned() or planet.owner.id == self.player_id) and self.monitor.get_nb_spots_for_miners(planet_id) > 0:
+                self.add_circle_position(planet, SHIP_INFLUENCE, free_planet=True)
+
+        # Now draw , ordered by color
+        for color in sorted(self.__circle_to_draw_dict.keys()):
+            for circle in self.__circle_to_draw_dict[color]:
+                draw.ellipse(circle, fill=color, outline=color)
+
+    def get_point_defense_influence(self, pos):
+        return self.defense_img.getpixel((pos.x, pos.y))
+
+    def get_point_planet_influence(self, pos):
+        return self.planet_img.getpixel((pos.x, pos.y))
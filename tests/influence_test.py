@@ -0,0 +1,141 @@
+from time import time
+
+import numpy as np
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+from benchmark_game import play_benchmark
+from bot.distances import DistanceMatrix
+from bot.influence import Influence
+from influence_python import ImageInfluence
+
+"""
+# Benchmark the influence fields: numpy arrays stamped in cython against the ellipses drawn on PIL images
+# A 4 players game is played in-process until BENCHMARK_TURN, then the influence of MyBot is drawn both ways
+# and every ship of the map asks for its influence.
+# Every ship of the map then asks for its influence one after the other and in a single query.
+# From BENCHMARK_TURN - NB_INCREMENTAL_TURNS, an influence is kept and updated every turn: its fields are compared
+# with the fields of an influence cleared every turn.
+"""
+
+BENCHMARK_TURN = 150
+NB_REPEATS = 10
+NB_INCREMENTAL_TURNS = 10
+
+
+class InfluenceBenchmark(object):
+    """
+    The influence kept between the turns of MyBot, from BENCHMARK_TURN - NB_INCREMENTAL_TURNS
+    """
+
+    def __init__(self):
+        self.influence = None
+        self.full_influence = None
+        self.durations = [0.0, 0.0]
+        self.nb_stamped = [0, 0]
+        self.same_fields = True
+
+    def after_turn(self, policy, game_map):
+        self.benchmark_incremental(policy.manager, game_map)
+        if game_map.turn == BENCHMARK_TURN:
+            benchmark(policy.manager.influence, policy.manager.monitor, game_map)
+
+    def benchmark_incremental(self, manager, game_map):
+        """
+        Update the influence kept between the turns & compare it with an influence cleared every turn
+        """
+        if self.influence is None:
+            self.influence = Influence(manager.player_id, manager.monitor)
+            self.influence.update_game_map(game_map)
+            self.full_influence = Influence(manager.player_id, manager.monitor)
+            self.full_influence.update_game_map(game_map)
+            return
+        start_time = time()
+        self.influence.update_game_map(game_map)
+        self.durations[0] += time() - start_time
+        # Cleared every turn: all the zones are drawn again
+        influence = self.full_influence
+        start_time = time()
+        influence.defense_field.clear()
+        influence.planet_field.clear()
+        influence.update_game_map(game_map)
+        self.durations[1] += time() - start_time
+        for i, updated_influence in enumerate((self.influence, influence)):
+            self.nb_stamped[i] += updated_influence.defense_field.nb_stamped + updated_influence.planet_field.nb_stamped
+        self.same_fields &= bool((self.influence.defense_field.values == influence.defense_field.values).all() and
+                                 (self.influence.planet_field.values == influence.planet_field.values).all())
+        if game_map.turn == BENCHMARK_TURN:
+            print("Turns %s-%s: incremental duration : %.2f ms, %s stamps, cleared influence duration : %.2f ms, "
+                  "%s stamps" % (game_map.turn - NB_INCREMENTAL_TURNS + 1, game_map.turn,
+                                 self.durations[0] * 1000.0 / NB_INCREMENTAL_TURNS, self.nb_stamped[0],
+                                 self.durations[1] * 1000.0 / NB_INCREMENTAL_TURNS, self.nb_stamped[1]))
+            print("same fields: %s" % self.same_fields)
+
+
+def benchmark(influence, monitor, game_map):
+    print("Turn %s: %s ships, %s planets" % (game_map.turn, len(game_map.all_ships()), len(game_map.all_planets())))
+    image_influence = ImageInfluence(influence.player_id, monitor)
+
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        image_influence.update_game_map(game_map)
+    print("PIL images duration : %.2f ms" % ((time() - start_time) * 1000.0 / NB_REPEATS))
+
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        # Cleared: all the zones are drawn again
+        influence.defense_field.clear()
+        influence.planet_field.clear()
+        influence.update_game_map(game_map)
+    print("numpy fields duration : %.2f ms" % ((time() - start_time) * 1000.0 / NB_REPEATS))
+
+    defense = np.array(image_influence.defense_img, dtype=np.float64)
+    planet = np.array(image_influence.planet_img, dtype=np.float64)
+    print("same defense pixels: %.4f, same planet pixels: %.4f" % (
+        (defense == influence.defense_field.values).mean(), (planet == influence.planet_field.values).mean()))
+    ships = game_map.all_ships()
+    print("same ship queries: %s / %s" % (sum(
+        image_influence.get_point_defense_influence(ship.pos) == influence.get_point_defense_influence(ship.pos) and
+        image_influence.get_point_planet_influence(ship.pos) == influence.get_point_planet_influence(ship.pos)
+        for ship in ships), len(ships)))
+
+    positions = [ship.pos for ship in ships]
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        single = [(influence.get_point_defense_influence(pos), influence.is_in_influence_zone(pos),
+                   influence.get_planet_influence(pos)) for pos in positions]
+    print("single queries duration : %.3f ms" % ((time() - start_time) * 1000.0 / NB_REPEATS))
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        batch = list(zip(influence.get_points_defense_influence(positions).tolist(),
+                         influence.are_in_influence_zone(positions).tolist(),
+                         influence.get_planets_influence(positions).tolist()))
+    print("batch queries duration : %.3f ms" % ((time() - start_time) * 1000.0 / NB_REPEATS))
+    print("same batch queries: %s" % (single == batch))
+
+    # The closest enemy ship in the influence zone of every drone: a query per enemy ship sorted by distance,
+    # against a single mask for all the drones
+    matrix = DistanceMatrix(game_map, influence.player_id)
+    drones = game_map.get_player(influence.player_id).all_ships()
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        closest1 = []
+        for drone in drones:
+            closest1.append((None, None))
+            for distance, enemy_ship in matrix.ships_by_distance(drone.id):
+                if influence.is_in_influence_zone(enemy_ship.pos):
+                    closest1[-1] = (distance, enemy_ship)
+                    break
+    print("closest in influence, one query per ship duration : %.2f ms" % (
+        (time() - start_time) * 1000.0 / NB_REPEATS))
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        mask = influence.are_in_influence_zone([ship.pos for ship in matrix.ships])
+        closest2 = [matrix.closest_ship_in(drone.id, mask) for drone in drones]
+    print("closest in influence, single mask duration : %.2f ms" % ((time() - start_time) * 1000.0 / NB_REPEATS))
+    print("same closest in influence: %s" % (closest1 == closest2))
+
+
+play_benchmark(range(BENCHMARK_TURN - NB_INCREMENTAL_TURNS, BENCHMARK_TURN + 1),
+               after=InfluenceBenchmark().after_turn)
@@ -0,0 +1,39 @@
+"""
+Benchmark of the in-process games against the same games played by bot processes:
+MyBot against ClosestTargetBot, the results must be the same & the in-process games faster.
+"""
+import os
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+os.chdir(bootstrap.ROOT_PATH)
+
+from engine.inprocess import load_policy, run_game_inprocess
+from engine.runner import run_game
+
+# Build the cython modules before the games, for the bot processes & out of the durations
+load_policy("rampa")
+
+nb_games = 3
+duration_processes = 0.0
+duration_inprocess = 0.0
+for seed in range(nb_games):
+    start_time = time()
+    state_inprocess, _ = run_game_inprocess([load_policy("rampa"), load_policy("closest")], 240, 160, seed,
+                                            timeouts=False)
+    duration_inprocess += time() - start_time
+    start_time = time()
+    state, bots = run_game(["python3 tests/run_bot.py MyBot.py",
+                            "python3 tests/run_bot.py opponents/ClosestTargetBot.py"], 240, 160, seed, timeouts=False)
+    duration_processes += time() - start_time
+    # A bot that never sent its name failed to initialize: the game would be compared with a game of 0 turns
+    failed = [bot.command for bot in bots if bot.name == bot.command]
+    if failed:
+        raise RuntimeError("seed %s: %s failed to initialize" % (seed, ", ".join(failed)))
+    same = state.turn == state_inprocess.turn and state.ranking() == state_inprocess.ranking() and \
+        state.damage_dealt == state_inprocess.damage_dealt
+    print("seed %s: %s turns, ranking: %s, same game in-process: %s" % (seed, state.turn, state.ranking(), same))
+
+print("bot processes : %.2f s (%.2f games per minute)" % (duration_processes, nb_games * 60.0 / duration_processes))
+print("in-process : %.2f s (%.2f games per minute)" % (duration_inprocess, nb_games * 60.0 / duration_inprocess))
@@ -0,0 +1,47 @@
+from bot.navigation import calculate_distance_between
+from hlt.entity import Ship
+
+"""
+# Original per drone distances, kept as the reference for matrix_test.py
+# Every drone computes & sorts its distance to every enemy ship and every planet
+"""
+
+
+class DroneDistances(object):
+
+    def __init__(self, ship):
+        self.ship = ship
+        self.enemy_by_distance = []
+        self.planet_by_distance = []
+        self.enemy_distance = {}
+        self.planet_distance = {}
+
+    def calculate_all_ships_distance(self, all_ships):
+        self.enemy_by_distance = []
+        self.enemy_distance = {}
+        for _, ship in all_ships.items():
+            # Don't calculate distance with ship of our team
+            if ship.owner == self.ship.owner:
+                continue
+            distance = calculate_distance_between(self.ship.pos, ship.pos)
+            self.enemy_distance[ship.id] = distance
+            self.enemy_by_distance.append((distance, ship))
+        self.enemy_by_distance = sorted(self.enemy_by_distance, key=lambda l: l[0])
+
+    def calculate_all_planets_distance(self, all_planets):
+        self.planet_by_distance = []
+        self.planet_distance = {}
+        for planet_id, planet in all_planets.items():
+            distance = calculate_distance_between(self.ship.pos, planet.pos)
+            self.planet_distance[planet.id] = distance
+            self.planet_by_distance.append((distance, planet))
+        self.planet_by_distance = sorted(self.planet_by_distance, key=lambda l: l[0])
+
+    def get_closest_ship(self, player_id=None, docked_only=False, reverse=False):
+        for distance, enemy_ship in (reversed(self.enemy_by_distance) if reverse else self.enemy_by_distance):
+            if docked_only and enemy_ship.docking_status == Ship.DockingStatus.UNDOCKED:
+                continue
+            if player_id is not None and player_id != enemy_ship.owner.id:
+                continue
+            return distance, enemy_ship
+        return None, None
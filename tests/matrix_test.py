@@ -0,0 +1,104 @@
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+from benchmark_game import play_benchmark
+from bot.distances import DistanceMatrix
+from hlt.entity import Ship
+from matrix_python import DroneDistances
+
+"""
+# Benchmark the distance matrix of the drones against the sorted lists of every drone
+# A 4 players game is played in-process until BENCHMARK_TURN, then the distances of the largest fleet are computed
+# both ways, and every drone looks for its closest enemy ship, with every filter: the sorted lists against the
+# grid of the enemy ships.
+# From BENCHMARK_TURN - NB_INCREMENTAL_TURNS, a matrix is kept and updated every turn, every drone asking for its
+# rows: at BENCHMARK_TURN its rows are compared with the rows of a new matrix.
+"""
+
+BENCHMARK_TURN = 120
+NB_INCREMENTAL_TURNS = 10
+
+
+def benchmark_incremental(matrix, game_map):
+    """
+    Update the matrix kept between the turns & ask for the rows of every drone, docked miners included
+    """
+    if matrix is None:
+        me = max(game_map.all_players(), key=lambda player: len(player.all_ships()))
+        return DistanceMatrix(game_map, me.id)
+    start_time = time()
+    matrix.update(game_map)
+    drones = game_map.get_player(matrix.player_id).all_ships()
+    rows = [(matrix.ship_row(ship.id), matrix.planet_row(ship.id)) for ship in drones]
+    duration = time() - start_time
+    if game_map.turn == BENCHMARK_TURN:
+        start_time = time()
+        fresh = DistanceMatrix(game_map, matrix.player_id)
+        fresh_rows = [(fresh.ship_row(ship.id), fresh.planet_row(ship.id)) for ship in drones]
+        nb_docked = sum(1 for ship in drones if ship.docking_status != Ship.DockingStatus.UNDOCKED)
+        print("Turn %s: %s drones, %s docked, hit rate %.2f" % (game_map.turn, len(drones), nb_docked,
+                                                                matrix.hit_rate()))
+        print("incremental duration : %.2f ms, new matrix duration : %.2f ms" % (
+            duration * 1000.0, (time() - start_time) * 1000.0))
+        print("same rows: %s" % all((ship_row == fresh_ship_row).all() and (planet_row == fresh_planet_row).all()
+                                    for (ship_row, planet_row), (fresh_ship_row, fresh_planet_row)
+                                    in zip(rows, fresh_rows)))
+    return matrix
+
+
+def benchmark(game_map):
+    me = max(game_map.all_players(), key=lambda player: len(player.all_ships()))
+    my_ships = me.all_ships()
+    all_ships = {ship.id: ship for ship in game_map.all_ships()}
+    all_planets = {planet.id: planet for planet in game_map.all_planets()}
+    print("Turn %s: %s drones, %s enemy ships, %s planets" % (
+        game_map.turn, len(my_ships), len(all_ships) - len(my_ships), len(all_planets)))
+
+    # Every filter of Drone.get_closest_ship
+    queries = [(None, False), (None, True)]
+    queries += [(player.id, docked_only) for player in game_map.all_players() if player is not me
+                for docked_only in (False, True)]
+
+    start_time = time()
+    drones = [DroneDistances(ship) for ship in my_ships]
+    for drone in drones:
+        drone.calculate_all_ships_distance(all_ships)
+        drone.calculate_all_planets_distance(all_planets)
+    results1 = [drone.get_closest_ship(player_id, docked_only) for drone in drones for player_id, docked_only in queries]
+    print("sorted lists duration : %.2f ms, %s queries" % ((time() - start_time) * 1000.0, len(results1)))
+
+    start_time = time()
+    matrix = DistanceMatrix(game_map, me.id)
+    build_duration = time() - start_time
+    results2 = [matrix.closest_ship(ship.id, player_id, docked_only) for ship in my_ships
+                for player_id, docked_only in queries]
+    print("ship index duration : %.2f ms, %.2f ms to build" % ((time() - start_time) * 1000.0, build_duration * 1000.0))
+    print("same closest ships: %s" % all(distance1 == distance2 and ship1 is ship2
+                                         for (distance1, ship1), (distance2, ship2) in zip(results1, results2)))
+
+    print("same furthest ships: %s" % all(
+        drone.get_closest_ship(player_id, docked_only, reverse=True)[0] ==
+        matrix.closest_ship(drone.ship.id, player_id, docked_only, furthest=True)[0]
+        for drone in drones for player_id, docked_only in queries))
+    print("same planet distances: %s" % all(
+        [distance for distance, _ in drone.planet_by_distance] ==
+        [distance for distance, _ in matrix.planets_by_distance(drone.ship.id)] for drone in drones))
+
+
+class MatrixBenchmark(object):
+    """
+    The matrix kept between the turns of MyBot, from BENCHMARK_TURN - NB_INCREMENTAL_TURNS
+    """
+
+    def __init__(self):
+        self.matrix = None
+
+    def before_turn(self, policy, game_map):
+        self.matrix = benchmark_incremental(self.matrix, game_map)
+        if game_map.turn == BENCHMARK_TURN:
+            benchmark(game_map)
+
+
+play_benchmark(range(BENCHMARK_TURN - NB_INCREMENTAL_TURNS, BENCHMARK_TURN + 1), before=MatrixBenchmark().before_turn)
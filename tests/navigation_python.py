@@ -0,0 +1,50 @@
+from bot.navigation import intersect_segment_circle, segment_intersect, calculate_distance_between
+from bot.settings import ASSASSIN_AVOID_RADIUS
+
+"""
+# Linear scan of every obstacle, kept as the reference for navigation_test.py
+# Every segment tests all my ships, all ghosts, all planets and all enemy ships
+"""
+
+
+def obstacles_between(ship, target, game_map, ignore_ships=False, ignore_planets=False, ignore_ghosts=False,
+                      assassin=False):
+    if target.x < 1 or target.y < 1 or target.x + 1 > game_map.width or target.y + 1 > game_map.height:
+        return True
+
+    fudge = ship.radius + 0.1
+    if not ignore_ships:
+        for my_ship in game_map.get_me().all_ships():
+            if my_ship.pos is ship:
+                continue
+            if intersect_segment_circle(ship, target, my_ship.pos, fudge=fudge):
+                return True
+
+    if not ignore_ghosts:
+        for start, ghost in game_map.all_ghost():
+            if segment_intersect(start, ghost, ship, target):
+                return True
+            if intersect_segment_circle(ship, target, ghost, fudge=fudge + 1):
+                return True
+            if calculate_distance_between(target, ghost) < ghost.radius + fudge:
+                return True
+
+    if not ignore_planets:
+        for planet in game_map.all_planets():
+            if planet.pos is ship or planet.pos is target:
+                continue
+            if intersect_segment_circle(ship, target, planet.pos, fudge=fudge):
+                return True
+
+    undocked_fudge = fudge + ASSASSIN_AVOID_RADIUS if assassin else fudge
+    if not ignore_ships:
+        for enemy_ship in game_map.all_ships():
+            if enemy_ship.owner.id == game_map.get_me().id or enemy_ship.pos is target:
+                continue
+            if enemy_ship.docking_status == 0:
+                if intersect_segment_circle(ship, target, enemy_ship.pos, fudge=undocked_fudge):
+                    return True
+            elif intersect_segment_circle(ship, target, enemy_ship.pos, fudge=fudge):
+                return True
+
+    return False
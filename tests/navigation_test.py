@@ -0,0 +1,79 @@
+import math
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+from benchmark_game import play_benchmark
+from bot.navigation import Circle, navigate, obstacles_between as obstacles_between2
+from navigation_python import obstacles_between as obstacles_between1
+
+"""
+# Benchmark the obstacle grid of the navigation against the linear scan of every obstacle
+# A 4 players game is played in-process until BENCHMARK_TURN, then the segments of every ship of the first player
+# are tested against its map. The linear scan being the slowest part of a turn, the turn itself is timed too.
+"""
+
+BENCHMARK_TURN = 200
+
+
+def benchmark(game_map):
+    ships = game_map.get_me().all_ships()
+    queries = []
+    for ship in ships:
+        for angle in range(0, 360, 3):
+            for distance in (7, 30, 90):
+                target = Circle(ship.pos.x + distance * math.cos(math.radians(angle)),
+                                ship.pos.y + distance * math.sin(math.radians(angle)))
+                queries.append((ship.pos, target))
+    print("Turn %s: %s ships, %s planets, %s segments" % (
+        game_map.turn, len(game_map.all_ships()), len(game_map.all_planets()), len(queries)))
+
+    start_time = time()
+    results1 = [obstacles_between1(ship, target, game_map) for ship, target in queries]
+    duration = time() - start_time
+    print("linear scan duration : %.2f ms" % (duration * 1000.0))
+
+    start_time = time()
+    game_map.obstacle_grid()
+    print("grid build duration : %.2f ms" % ((time() - start_time) * 1000.0))
+    start_time = time()
+    results2 = [obstacles_between2(ship, target, game_map) for ship, target in queries]
+    duration = time() - start_time
+    print("grid duration : %.2f ms" % (duration * 1000.0))
+    print("same results: %s (%s blocked)" % (results1 == results2, sum(results2)))
+
+    # Whole navigations, with the ghosts of the ships that already moved, as during a turn
+    navigations = []
+    for ship in ships:
+        for angle in range(0, 360, 15):
+            for distance in (7, 30, 90):
+                navigations.append((ship, Circle(ship.pos.x + distance * math.cos(math.radians(angle)),
+                                                 ship.pos.y + distance * math.sin(math.radians(angle)))))
+    print("%s navigations" % len(navigations))
+    for sweep in (False, True):
+        game_map.ghost_store().clear()
+        game_map._obstacle_grid = None
+        results = []
+        start_time = time()
+        for ship, target in navigations:
+            speed, angle, ghost = navigate(ship.pos, target, game_map, 7, sweep=sweep)
+            results.append((speed, angle))
+            if ghost is not None and len(game_map.ghost_store()) < len(ships):
+                game_map.add_ghost((ship.pos, ghost))
+        duration = time() - start_time
+        print("%s duration : %.2f ms" % ("sweep" if sweep else "angle by angle", duration * 1000.0))
+        if sweep:
+            print("same navigations: %s" % (results == results_loop))
+            print("ghost rejections: %s" % game_map.ghost_store().statistics())
+        results_loop = results
+    game_map.ghost_store().clear()
+    game_map._obstacle_grid = None
+
+
+
+def report_turn(policy, game_map):
+    print("turn duration : %.2f ms, %s ghosts" % (policy.turn_duration * 1000.0, len(game_map.all_ghost())))
+
+
+play_benchmark(BENCHMARK_TURN, before=lambda policy, game_map: benchmark(game_map), after=report_turn)
@@ -0,0 +1,98 @@
+from hlt import entity
+from hlt.game_map import Player
+
+"""
+# Original starter kit parser, kept as the reference for parser_test.py
+# Every field is consumed with "x, *remainder = tokens" which copies the remaining tokens each time
+"""
+
+
+def parse_ship_single(player_id, tokens):
+    (sid, x, y, hp, vel_x, vel_y,
+     docked, docked_planet, progress, cooldown, *remainder) = tokens
+
+    sid = int(sid)
+    docked = entity.Ship.DockingStatus(int(docked))
+
+    ship = entity.Ship(player_id,
+                       sid,
+                       float(x), float(y),
+                       int(hp),
+                       float(vel_x), float(vel_y),
+                       docked, int(docked_planet),
+                       int(progress), int(cooldown))
+
+    return sid, ship, remainder
+
+
+def parse_ships(player_id, tokens):
+    ships = {}
+    num_ships, *remainder = tokens
+    for _ in range(int(num_ships)):
+        ship_id, ships[ship_id], remainder = parse_ship_single(player_id, remainder)
+    return ships, remainder
+
+
+def parse_player_single(tokens):
+    player_id, *remainder = tokens
+    player_id = int(player_id)
+    ships, remainder = parse_ships(player_id, remainder)
+    player = Player(player_id, ships)
+    return player_id, player, remainder
+
+
+def parse_players(tokens):
+    num_players, *remainder = tokens
+    num_players = int(num_players)
+    players = {}
+
+    for _ in range(num_players):
+        player, players[player], remainder = parse_player_single(remainder)
+
+    return players, remainder
+
+
+def parse_planet_single(tokens):
+    (plid, x, y, hp, r, docking, current, remaining,
+     owned, owner, num_docked_ships, *remainder) = tokens
+
+    plid = int(plid)
+    docked_ships = []
+
+    for _ in range(int(num_docked_ships)):
+        ship_id, *remainder = remainder
+        docked_ships.append(int(ship_id))
+
+    planet = entity.Planet(int(plid),
+                           float(x), float(y),
+                           int(hp), float(r), int(docking),
+                           int(current), int(remaining),
+                           bool(int(owned)), int(owner),
+                           docked_ships)
+
+    return plid, planet, remainder
+
+
+def parse_planets(tokens):
+    num_planets, *remainder = tokens
+    num_planets = int(num_planets)
+    planets = {}
+
+    for _ in range(num_planets):
+        plid, planet, remainder = parse_planet_single(remainder)
+        planets[plid] = planet
+
+    return planets, remainder
+
+
+def parse(map_string):
+    """
+    Parse a whole frame the way the starter kit did
+    :param map_string: the frame sent by the Halite engine
+    :return: players dict, planets dict
+    """
+    tokens = map_string.split()
+    players, tokens = parse_players(tokens)
+    planets, tokens = parse_planets(tokens)
+    assert (len(tokens) == 0)
+    return players, planets
@@ -0,0 +1,127 @@
+import random
+import sys
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+from hlt import entity
+from hlt.game_map import Map, Player
+from hlt.networking import ReplayTransport
+from parser_python import parse as parse1
+
+"""
+# Benchmark the cursor based frame parser against the original starter kit parser
+# Usage: python tests/parser_test.py [frames_file]
+    - frames_file: optional recording (RAMPA_RECORD) or text file with one frame per line
+    - Without file, a late game 4 players frame is generated (600+ ships)
+"""
+
+
+def generate_frame(nb_players=4, nb_ships_per_player=160, nb_planets=28, width=384, height=256, seed=42):
+    """
+    Generate a large frame in the Halite engine format
+    :return: the frame as a single string
+    """
+    rnd = random.Random(seed)
+    tokens = [str(nb_players)]
+    ship_id = 0
+    docked_ships = {}
+    for player_id in range(nb_players):
+        tokens.extend([str(player_id), str(nb_ships_per_player)])
+        for _ in range(nb_ships_per_player):
+            # Dock one ship out of four
+            docked = 2 if rnd.random() < 0.25 else 0
+            planet_id = rnd.randrange(nb_planets) if docked else 0
+            if docked:
+                docked_ships.setdefault(planet_id, []).append((player_id, ship_id))
+            tokens.extend([str(ship_id), "%.4f" % rnd.uniform(0, width), "%.4f" % rnd.uniform(0, height),
+                           str(rnd.randint(1, 255)), "0.0000", "0.0000", str(docked), str(planet_id), "0", "0"])
+            ship_id += 1
+    tokens.append(str(nb_planets))
+    for planet_id in range(nb_planets):
+        docked = docked_ships.get(planet_id, [])
+        # A planet is owned by the owner of its first docked ship
+        owner = docked[0][0] if docked else 0
+        ship_ids = [str(sid) for player_id, sid in docked if player_id == owner]
+        tokens.extend([str(planet_id), "%.4f" % rnd.uniform(0, width), "%.4f" % rnd.uniform(0, height),
+                       str(rnd.randint(1000, 3000)), "%.4f" % rnd.uniform(3, 16), str(max(2, len(ship_ids))),
+                       "0", "1000", "1" if docked else "0", str(owner), str(len(ship_ids))])
+        tokens.extend(ship_ids)
+    return " ".join(tokens)
+
+
+def parse2(map_string):
+    """
+    Parse a whole frame with the cursor based parser
+    :param map_string: the frame sent by the Halite engine
+    :return: players dict, planets dict
+    """
+    tokens = map_string.split()
+    players, cursor = Player._parse(tokens, 0)
+    planets, cursor = entity.Planet._parse(tokens, cursor)
+    assert (cursor == len(tokens))
+    return players, planets
+
+
+def same_result(result1, result2):
+    """
+    Make sure both parsers built the same objects
+    """
+    players1, planets1 = result1
+    players2, planets2 = result2
+    if players1.keys() != players2.keys() or planets1.keys() != planets2.keys():
+        return False
+    for player_id, player in players1.items():
+        for ship1 in player.all_ships():
+            ship2 = players2[player_id].get_ship(ship1.id)
+            if ship2 is None:
+                return False
+            if (ship1.pos.x, ship1.pos.y, ship1.health, ship1.docking_status, ship1.planet, ship1._weapon_cooldown) != \
+                    (ship2.pos.x, ship2.pos.y, ship2.health, ship2.docking_status, ship2.planet, ship2._weapon_cooldown):
+                return False
+    for planet_id, planet1 in planets1.items():
+        planet2 = planets2[planet_id]
+        if (planet1.pos.x, planet1.pos.y, planet1.pos.radius, planet1.owner, planet1._docked_ship_ids) != \
+                (planet2.pos.x, planet2.pos.y, planet2.pos.radius, planet2.owner, planet2._docked_ship_ids):
+            return False
+    return True
+
+
+if len(sys.argv) > 1 and sys.argv[1].endswith(".gz"):
+    # Skip the player tag & the map size
+    frames = [frame for frame in ReplayTransport.load(sys.argv[1])[0][2:] if frame]
+elif len(sys.argv) > 1:
+    with open(sys.argv[1]) as frames_file:
+        frames = [line.strip() for line in frames_file if line.strip()]
+else:
+    frames = [generate_frame()]
+
+nb = 50
+
+for frame in frames:
+    print("\n\nFrame: %s tokens" % len(frame.split()))
+    print("same objects: %s" % same_result(parse1(frame), parse2(frame)))
+
+    start_time = time()
+    for i in range(nb):
+        parse1(frame)
+    end_time = time()
+    duration = (end_time - start_time) / nb
+    print("python duration : %.2f ms" % (duration * 1000))
+
+    start_time = time()
+    for i in range(nb):
+        parse2(frame)
+    end_time = time()
+    duration = (end_time - start_time) / nb
+    print("cursor duration : %.2f ms" % (duration * 1000))
+
+    # Whole map parsing, including the link between entities
+    game_map = Map(0, 384, 256)
+    start_time = time()
+    for i in range(nb):
+        game_map._parse(frame, i)
+    end_time = time()
+    duration = (end_time - start_time) / nb
+    print("Map._parse duration : %.2f ms" % (duration * 1000))
@@ -0,0 +1,70 @@
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+from benchmark_game import play_benchmark
+from bot.navigation import navigate, obstacles_between
+from bot.routing import PlanetGraph, FlowField
+
+"""
+# Benchmark the planet graph against the navigation turning around the planets
+# A 4 players game is played in-process until BENCHMARK_TURN, then every ship of the first player navigates
+# to every planet of its map: straight to the planet, or to the first waypoint of the graph when a planet is in the way.
+# Then the same navigations read their heading from the flow field of every planet.
+"""
+
+BENCHMARK_TURN = 30
+
+
+def benchmark(game_map):
+    start_time = time()
+    graph = PlanetGraph(game_map)
+    print("graph build duration : %.2f ms, %s planets, %s waypoints" % (
+        (time() - start_time) * 1000.0, graph.nb_planets, graph.nb_nodes))
+
+    queries = []
+    for ship in game_map.get_me().all_ships():
+        for planet in game_map.all_planets():
+            queries.append((ship.pos, ship.closest_point_to(planet).pos))
+    print("Turn %s: %s ships, %s navigations" % (game_map.turn, len(game_map.all_ships()), len(queries)))
+
+    start_time = time()
+    results1 = [navigate(ship, target, game_map, 7) for ship, target in queries]
+    duration = time() - start_time
+    print("turning duration : %.2f ms, %s without thrust" % (
+        duration * 1000.0, sum(1 for result in results1 if result[2] is None)))
+
+    start_time = time()
+    waypoints = [graph.first_waypoint(ship, target) for ship, target in queries]
+    print("routing duration : %.2f ms, %s routed" % (
+        (time() - start_time) * 1000.0, sum(1 for waypoint in waypoints if waypoint is not None)))
+    start_time = time()
+    results2 = [navigate(ship, target if waypoint is None else waypoint, game_map, 7)
+                for (ship, target), waypoint in zip(queries, waypoints)]
+    duration = time() - start_time
+    print("routed navigation duration : %.2f ms, %s without thrust" % (
+        duration * 1000.0, sum(1 for result in results2 if result[2] is None)))
+
+    # The first leg of a route never crosses a planet
+    print("waypoints visible: %s" % all(
+        not obstacles_between(ship, waypoint, game_map, ignore_ships=True, ignore_ghosts=True)
+        for (ship, target), waypoint in zip(queries, waypoints) if waypoint is not None))
+
+    start_time = time()
+    fields = {planet.id: FlowField(game_map, planet.pos) for planet in game_map.all_planets()}
+    field = next(iter(fields.values()))
+    print("flow fields build duration : %.2f ms, %s fields of %sx%s cells" % (
+        (time() - start_time) * 1000.0, len(fields), field.nb_columns, field.nb_rows))
+    blocked = [(ship, target, planet) for ship in game_map.get_me().all_ships() for planet in game_map.all_planets()
+               for target in [ship.closest_point_to(planet).pos] if graph.crosses(ship.pos, target)]
+    start_time = time()
+    waypoints = [graph.first_waypoint(ship.pos, target) for ship, target, planet in blocked]
+    print("routing duration of the %s blocked navigations : %.2f ms" % (len(blocked), (time() - start_time) * 1000.0))
+    start_time = time()
+    waypoints = [fields[planet.id].next_target(ship.pos, graph) for ship, target, planet in blocked]
+    print("flow field duration : %.2f ms, %s without heading" % (
+        (time() - start_time) * 1000.0, sum(1 for waypoint in waypoints if waypoint is None)))
+
+
+play_benchmark(BENCHMARK_TURN, before=lambda policy, game_map: benchmark(game_map))
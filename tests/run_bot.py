@@ -0,0 +1,14 @@
+"""
+# Start a bot script with the cython modules built at runtime, as the bot processes of the tests
+# Usage: python tests/run_bot.py <script> [arguments]
+    - MyBot.py only imports the modules built by setup.py, the extensions of a clean tree are not built yet
+"""
+import runpy
+import sys
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+script = sys.argv[1]
+sys.argv = sys.argv[1:]
+runpy.run_path(script, run_name="__main__")
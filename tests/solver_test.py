@@ -0,0 +1,106 @@
+import math
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+from benchmark_game import play_benchmark
+from bot.navigation import GhostStore
+from bot.settings import NAVIGATION_FLOW, NAVIGATION_ROUTING
+from bot.solver import MoveRequest, solve_moves
+from hlt.constants import MAX_SPEED
+
+"""
+# Benchmark the joint solver of the moves against the navigation of the ships one after the other
+# A 4 players game is played in-process until BENCHMARK_TURN, then every ship of MyBot (the docked ones
+# as if they were undocked) goes to the same enemy ship, the worst case for the ghosts: the ships block each other.
+Then the ships of every player are solved together, for the cost of the conflicts between many moves.
+"""
+
+BENCHMARK_TURN = 180
+
+
+def moves_of(command_queue, ships):
+    """
+    :return: The moves of the thrust commands, as (ship, speed, angle)
+    """
+    moves = []
+    for command in command_queue:
+        _, ship_id, speed, angle = command.split()
+        moves.append((ships[int(ship_id)], int(speed), int(angle)))
+    return moves
+
+
+def report(name, duration, moves, target):
+    """
+    Print the number of ships moved, their progress toward the target & the conflicts between their moves
+    """
+    store = GhostStore()
+    progress = 0.0
+    nb_conflicts = 0
+    for ship, speed, angle in moves:
+        if speed == 0:
+            continue
+        x = ship.pos.x + speed * math.cos(math.radians(angle))
+        y = ship.pos.y + speed * math.sin(math.radians(angle))
+        progress += math.hypot(target.pos.x - ship.pos.x, target.pos.y - ship.pos.y) - math.hypot(target.pos.x - x, target.pos.y - y)
+        if store.conflict(ship.pos.x, ship.pos.y, x, y, ship.pos.radius, ship.pos.radius) >= 0:
+            nb_conflicts += 1
+        store.add(ship.pos, type(ship.pos)(x, y, ship.pos.radius))
+    print("%s : %.2f ms, %s ships moved, progress %.1f, %s moves closer than the radiuses" % (
+        name, duration * 1000.0, sum(1 for _, speed, _ in moves if speed > 0), progress, nb_conflicts))
+
+
+def benchmark(game_map):
+    me = game_map.get_me()
+    ships = {ship.id: ship for ship in me.all_ships()}
+    enemies = [ship for ship in game_map.all_ships() if ship.owner.id != me.id]
+    if not ships or not enemies:
+        print("Turn %s: nothing to benchmark" % game_map.turn)
+        return
+    # The enemy the closest to the center of my ships
+    center_x = sum(ship.pos.x for ship in ships.values()) / len(ships)
+    center_y = sum(ship.pos.y for ship in ships.values()) / len(ships)
+    target = min(enemies, key=lambda enemy: math.hypot(enemy.pos.x - center_x, enemy.pos.y - center_y))
+    print("Turn %s: %s ships going to the enemy %s" % (game_map.turn, len(ships), target.id))
+
+    game_map.ghost_store().clear()
+    game_map._obstacle_grid = None
+    start_time = time()
+    command_queue = [ship.navigate(target, game_map, speed=int(MAX_SPEED), closest=True, routing=NAVIGATION_ROUTING,
+                                   flow=NAVIGATION_FLOW)
+                     for ship in ships.values()]
+    report("one after the other", time() - start_time, moves_of(command_queue, ships), target)
+
+    game_map.ghost_store().clear()
+    game_map._obstacle_grid = None
+    start_time = time()
+    requests = [MoveRequest(ship, target, game_map, int(MAX_SPEED), closest=True) for ship in ships.values()]
+    command_queue = solve_moves(requests, game_map, 1.0)
+    report("solver", time() - start_time, moves_of(command_queue, ships), target)
+
+    # Anytime navigation: the coarse moves only
+    game_map.ghost_store().clear()
+    game_map._obstacle_grid = None
+    start_time = time()
+    requests = [MoveRequest(ship, target, game_map, int(MAX_SPEED), closest=True) for ship in ships.values()]
+    command_queue = solve_moves(requests, game_map, 0.0)
+    report("solver without time left", time() - start_time, moves_of(command_queue, ships), target)
+
+    # Every ship of the map going to the same enemy: the conflicts between many moves
+    everyone = {ship.id: ship for ship in game_map.all_ships() if ship is not target}
+    game_map.ghost_store().clear()
+    game_map._obstacle_grid = None
+    nb_tests = game_map.ghost_store().statistics()["tests"]
+    start_time = time()
+    requests = [MoveRequest(ship, target, game_map, int(MAX_SPEED), closest=True) for ship in everyone.values()]
+    command_queue = solve_moves(requests, game_map, 1.0)
+    report("solver, the %s ships of the map" % len(everyone), time() - start_time, moves_of(command_queue, everyone),
+           target)
+    print("%s moves tested against a ghost" % (game_map.ghost_store().statistics()["tests"] - nb_tests))
+
+    game_map.ghost_store().clear()
+    game_map._obstacle_grid = None
+
+
+play_benchmark(BENCHMARK_TURN, before=lambda policy, game_map: benchmark(game_map))
@@ -0,0 +1,27 @@
+from bot.navigation import calculate_distance_between
+from bot.settings import SQUAD_DISTANCE_CREATION, SQUAD_SIZE
+from bot.squad import Squad
+
+"""
+# Original squad creation of Manager.order_attacker, kept as the reference for squad_test.py
+# Every squadless drone is compared with every other drone
+"""
+
+
+def form_squads(drones):
+    for drone in drones:
+        if drone.squad is None:
+            for other_drone in drones:
+                # Don't look at itself
+                if other_drone is drone:
+                    continue
+                if calculate_distance_between(drone.ship.pos, other_drone.ship.pos) < SQUAD_DISTANCE_CREATION:
+                    if other_drone.squad is not None and other_drone.squad.nb_members() < SQUAD_SIZE:
+                        other_drone.squad.add_member(drone)
+                    else:
+                        new_squad = Squad()
+                        new_squad.add_member(drone)
+                        new_squad.add_member(other_drone)
+                        new_squad.promote_new_leader()
+                    # Don't look for other drone
+                    break
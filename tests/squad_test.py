@@ -0,0 +1,91 @@
+import math
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+import squad_python
+from benchmark_game import play_benchmark
+from bot.settings import SQUAD_DISTANCE_CREATION, SQUAD_SIZE
+from bot.squad import form_squads
+
+"""
+# Benchmark the squad creation: a grid & a union-find against the comparison of every pair of drones
+# A 4 players game is played in-process until BENCHMARK_TURN, then every ship of the largest fleet is an attacker
+# without squad, and the squads are created both ways. Then the same with every ship of the map.
+"""
+
+BENCHMARK_TURN = 150
+NB_REPEATS = 100
+
+
+class Attacker(object):
+    """
+    The part of a drone a squad uses
+    """
+
+    def __init__(self, ship):
+        self.ship = ship
+        self.squad = None
+
+
+def report(name, duration, attackers):
+    """
+    Print the squads of the attackers: their number, their sizes & the members closer than SQUAD_DISTANCE_CREATION
+    to none of the other members
+    """
+    squads = {}
+    for attacker in attackers:
+        if attacker.squad is not None:
+            squads.setdefault(attacker.squad, []).append(attacker)
+    nb_isolated = 0
+    for members in squads.values():
+        for attacker in members:
+            if all(math.hypot(attacker.ship.pos.x - other.ship.pos.x, attacker.ship.pos.y - other.ship.pos.y) >= SQUAD_DISTANCE_CREATION
+                   for other in members if other is not attacker):
+                nb_isolated += 1
+    sizes = sorted((len(members) for members in squads.values()), reverse=True)
+    print("%s : %.2f ms, %s squads %s, %s above SQUAD_SIZE, %s drones in a squad, %s isolated in their squad" % (
+        name, duration * 1000.0, len(squads), sizes, sum(1 for size in sizes if size > SQUAD_SIZE),
+        sum(sizes), nb_isolated))
+
+
+def compare(ships):
+    """
+    Create the squads of the ships both ways
+    :return: The attackers of the ships, in the squads of form_squads
+    """
+    duration = 0.0
+    for _ in range(NB_REPEATS):
+        attackers = [Attacker(ship) for ship in ships]
+        start_time = time()
+        squad_python.form_squads(attackers)
+        duration += time() - start_time
+    report("every pair", duration / NB_REPEATS, attackers)
+
+    duration = 0.0
+    for _ in range(NB_REPEATS):
+        attackers = [Attacker(ship) for ship in ships]
+        start_time = time()
+        form_squads(attackers)
+        duration += time() - start_time
+    report("grid", duration / NB_REPEATS, attackers)
+    return attackers
+
+
+def benchmark(game_map):
+    me = max(game_map.all_players(), key=lambda player: len(player.all_ships()))
+    ships = me.all_ships()
+    print("Turn %s: %s attackers" % (game_map.turn, len(ships)))
+    attackers = compare(ships)
+
+    # Next turn: the squads are kept, the new attackers join them
+    kept = {attacker.ship.id: attacker.squad for attacker in attackers}
+    form_squads(attackers)
+    print("squads kept: %s" % all(attacker.squad is kept[attacker.ship.id] for attacker in attackers))
+
+    print("The %s ships of the map as attackers" % len(game_map.all_ships()))
+    compare(game_map.all_ships())
+
+
+play_benchmark(BENCHMARK_TURN, before=lambda policy, game_map: benchmark(game_map))
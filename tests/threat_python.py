@@ -0,0 +1,31 @@
+from bot.navigation import calculate_direction, calculate_angle_vector
+
+"""
+# Original guess of the targets of the enemy ships, kept as the reference for threat_test.py
+# An angle per pair of ships, the smallest one is the target
+"""
+
+
+def guess_targets(moving_ships, all_ships_dict):
+    targets = []
+    angles = []
+    for ship in moving_ships:
+        smallest_angle = 360
+        possible_target = None
+        for other_ship_id, other_ship in all_ships_dict.items():
+            # If they belong to the same owner, don't look
+            if ship.owner == other_ship.owner:
+                continue
+
+            # Calculate the direction between the 2 ships
+            delta = calculate_direction(ship.pos, other_ship.pos)
+            # Calculate the angle between the direction and the velocity
+            angle = calculate_angle_vector(ship.velocity, delta)
+            # Get an absolute angle: 10° == 350°
+            angle = min(angle, 360 - angle)
+            if angle < smallest_angle:
+                smallest_angle = angle
+                possible_target = other_ship
+        targets.append(possible_target)
+        angles.append(smallest_angle)
+    return targets, angles
@@ -0,0 +1,41 @@
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+from benchmark_game import play_benchmark
+from hlt.entity import Ship
+from threat_python import guess_targets
+
+"""
+# Benchmark the guess of the targets of the enemy ships: a numpy matrix of cosines against an angle per pair of ships
+# A 4 players game is played in-process until BENCHMARK_TURN, then the monitor of MyBot guesses the target of every
+# moving enemy ship both ways.
+"""
+
+BENCHMARK_TURN = 150
+NB_REPEATS = 10
+
+
+def benchmark(monitor, game_map):
+    all_ships_dict = monitor.get_all_ships_dict()
+    moving_ships = [ship for ship in all_ships_dict.values() if ship.owner.id != monitor.player_id
+                    and ship.docking_status == Ship.DockingStatus.UNDOCKED
+                    and (ship.velocity.x != 0 or ship.velocity.y != 0)]
+    print("Turn %s: %s moving enemy ships, %s ships" % (game_map.turn, len(moving_ships), len(all_ships_dict)))
+
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        targets1, angles1 = guess_targets(moving_ships, all_ships_dict)
+    print("angle per pair duration : %.2f ms" % ((time() - start_time) * 1000.0 / NB_REPEATS))
+
+    start_time = time()
+    for _ in range(NB_REPEATS):
+        targets2, angles2 = monitor.guess_targets(moving_ships)
+    print("cosine matrix duration : %.2f ms" % ((time() - start_time) * 1000.0 / NB_REPEATS))
+
+    print("same targets: %s" % (targets1 == targets2))
+    print("max angle difference: %.6f" % max([abs(angle1 - angle2) for angle1, angle2 in zip(angles1, angles2)] + [0]))
+
+
+play_benchmark(BENCHMARK_TURN, after=lambda policy, game_map: benchmark(policy.manager.monitor, game_map))
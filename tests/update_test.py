@@ -0,0 +1,192 @@
+import sys
+from time import time
+
+# Make the repository importable & build cython at runtime
+import bootstrap
+
+import numpy as np
+
+from engine.game import GameState, parse_commands
+from engine.inprocess import load_policy
+from hlt.game_map import Map, MapChanges
+from hlt.networking import ReplayTransport
+
+"""
+# Check the maps updated in place (Map._update) against the maps parsed again (Map._parse), turn after turn
+# Usage: python tests/update_test.py [recording ...]
+    - recording: a game recorded by a bot (RAMPA_RECORD, see hlt.networking.RecordingTransport)
+    - Without recording, NB_GAMES 4 players games are played by the local engine, the bots updating their maps
+      from the frames like hlt.Game(incremental=True)
+Every turn the entities, their links, the table columns & the changes reported by _update are compared.
+"""
+
+NB_GAMES = 2
+WIDTH = 384
+HEIGHT = 256
+POLICIES = ("rampa", "rampa", "closest", "closest")
+
+
+def play_game(seed):
+    """
+    Play a 4 players game with the local engine, the bots reading the frames
+    :return: The frames of the game, the initial one first
+    """
+    state = GameState(WIDTH, HEIGHT, len(POLICIES), seed)
+    policies = [load_policy(name) for name in POLICIES]
+    maps = [Map(player_id, WIDTH, HEIGHT) for player_id in range(len(POLICIES))]
+    frames = [state.frame()]
+    for game_map in maps:
+        game_map._parse(frames[0], -1)
+    while not state.is_over():
+        frame = state.frame()
+        frames.append(frame)
+        commands = {}
+        for player_id, (policy, game_map) in enumerate(zip(policies, maps)):
+            if not state.alive[player_id]:
+                continue
+            game_map._update(frame, state.turn)
+            commands[player_id] = parse_commands("".join(policy.play_turn(game_map)))
+        state.step(commands)
+    return frames
+
+
+def describe_ship(ship):
+    return (ship.owner.id, ship.pos.x, ship.pos.y, ship.pos.radius, ship.health, ship.velocity.x, ship.velocity.y,
+            ship.docking_status, None if ship.planet is None else ship.planet.id, ship._docking_progress,
+            ship._weapon_cooldown)
+
+
+def describe_planet(planet):
+    return (planet.pos.x, planet.pos.y, planet.pos.radius, planet.health, planet.num_docking_spots,
+            planet.current_production, planet.remaining_resources, None if planet.owner is None else planet.owner.id,
+            planet._docked_ship_ids, sorted(planet._docked_ships.keys()))
+
+
+def differences(updated, parsed):
+    """
+    :return: What differs between the map updated in place & the map parsed again, empty if they are the same
+    :rtype: list[str]
+    """
+    found = []
+    if updated._players.keys() != parsed._players.keys():
+        found.append("players %s != %s" % (sorted(updated._players), sorted(parsed._players)))
+        return found
+    for player in parsed.all_players():
+        updated_player = updated.get_player(player.id)
+        if updated_player._ships.keys() != player._ships.keys():
+            found.append("ships of player %s: %s updated, %s parsed" % (
+                player.id, sorted(updated_player._ships.keys() - player._ships.keys()),
+                sorted(player._ships.keys() - updated_player._ships.keys())))
+            continue
+        for ship in player.all_ships():
+            updated_ship = updated_player.get_ship(ship.id)
+            if describe_ship(updated_ship) != describe_ship(ship):
+                found.append("ship %s: %s != %s" % (ship.id, describe_ship(updated_ship), describe_ship(ship)))
+            # The links point to the entities of the same map
+            elif updated_ship.owner is not updated_player or \
+                    (ship.planet is not None and updated_ship.planet is not updated.get_planet(ship.planet.id)):
+                found.append("ship %s: linked to the entities of another turn" % ship.id)
+
+    if updated._planets.keys() != parsed._planets.keys():
+        found.append("planets %s != %s" % (sorted(updated._planets), sorted(parsed._planets)))
+        return found
+    for planet in parsed.all_planets():
+        updated_planet = updated.get_planet(planet.id)
+        if describe_planet(updated_planet) != describe_planet(planet):
+            found.append("planet %s: %s != %s" % (planet.id, describe_planet(updated_planet), describe_planet(planet)))
+        elif (planet.owner is not None and updated_planet.owner is not updated.get_player(planet.owner.id)) or \
+                any(ship is not updated_planet.owner.get_ship(ship_id)
+                    for ship_id, ship in updated_planet._docked_ships.items()):
+            found.append("planet %s: linked to the entities of another turn" % planet.id)
+
+    for updated_table, table in ((updated.ship_table(), parsed.ship_table()),
+                                 (updated.planet_table(), parsed.planet_table())):
+        for name, _ in table.COLUMNS:
+            if not np.array_equal(getattr(updated_table, name), getattr(table, name)):
+                found.append("column %s of %s" % (name, type(table).__name__))
+    return found
+
+
+def expected_changes(previous, parsed):
+    """
+    :return: The changes between 2 maps parsed, as Map._update should report them
+    :rtype: MapChanges
+    """
+    changes = MapChanges()
+    ships_before = {ship.id: ship for ship in previous.all_ships()}
+    ships_after = {ship.id: ship for ship in parsed.all_ships()}
+    changes.spawned_ships.update(ships_after.keys() - ships_before.keys())
+    changes.destroyed_ships.update(ships_before.keys() - ships_after.keys())
+    for ship_id in ships_after.keys() & ships_before.keys():
+        before, after = ships_before[ship_id], ships_after[ship_id]
+        if (before.pos.x, before.pos.y) != (after.pos.x, after.pos.y):
+            changes.moved_ships.add(ship_id)
+        if before.docking_status is not after.docking_status:
+            changes.docking_ships.add(ship_id)
+        if before.health != after.health:
+            changes.damaged_ships.add(ship_id)
+
+    changes.destroyed_planets.update(previous._planets.keys() - parsed._planets.keys())
+    for planet in parsed.all_planets():
+        before = previous.get_planet(planet.id)
+        if (None if before.owner is None else before.owner.id) != (None if planet.owner is None else planet.owner.id):
+            changes.owner_planets.add(planet.id)
+        if before._docked_ship_ids != planet._docked_ship_ids:
+            changes.docked_planets.add(planet.id)
+        if before.health != planet.health:
+            changes.damaged_planets.add(planet.id)
+    return changes
+
+
+def check_frames(name, my_id, width, height, frames):
+    """
+    Update a map with every frame & compare it with the frame parsed again
+    """
+    updated = Map(my_id, width, height)
+    updated._parse(frames[0], -1)
+    previous = updated
+    update_duration = 0.0
+    parse_duration = 0.0
+    first_differences = None
+    nb_different = 0
+    nb_changes_different = 0
+    for turn, frame in enumerate(frames[1:]):
+        start_time = time()
+        updated._update(frame, turn)
+        update_duration += time() - start_time
+        parsed = Map(my_id, width, height)
+        start_time = time()
+        parsed._parse(frame, turn)
+        parse_duration += time() - start_time
+
+        found = differences(updated, parsed)
+        changes = expected_changes(previous, parsed)
+        for attribute in vars(changes):
+            if getattr(updated.changes, attribute) != getattr(changes, attribute):
+                found.append("%s: %s reported, %s expected" % (attribute, sorted(getattr(updated.changes, attribute)),
+                                                               sorted(getattr(changes, attribute))))
+                nb_changes_different += 1
+        if found:
+            nb_different += 1
+            if first_differences is None:
+                first_differences = (turn, found)
+        previous = parsed
+
+    nb_turns = len(frames) - 1
+    print("%s: %s turns, %s ships on the last turn" % (name, nb_turns, len(previous.all_ships())))
+    print("update duration : %.2f ms, parse duration : %.2f ms" % (
+        update_duration * 1000.0 / nb_turns, parse_duration * 1000.0 / nb_turns))
+    print("same maps: %s (%s turns different, %s change sets different)" % (
+        nb_different == 0, nb_different, nb_changes_different))
+    if first_differences is not None:
+        print("turn %s: %s" % (first_differences[0], "\n    ".join(first_differences[1][:10])))
+
+
+if len(sys.argv) > 1:
+    for record_file in sys.argv[1:]:
+        received, _ = ReplayTransport.load(record_file)
+        width, height = (int(size) for size in received[1].split())
+        check_frames(record_file, int(received[0]), width, height, [frame for frame in received[2:] if frame])
+else:
+    for seed in range(NB_GAMES):
+        check_frames("seed %s" % seed, 0, WIDTH, HEIGHT, play_game(seed))
@@ -5,9 +5,26 @@ import time
 from pprint import pprint
 
 import math
+import os
+import random
+import sys
 
 START_TIME = time.time()
 
+if sys.platform == "win32":
+    ENGINE = "halite.exe"
+    PYTHON = "python"
+    OPPONENT = "..\\HaliteBotV68\\run_bot.bat"
+    IN_PROCESS = False
+else:
+    # Local engine, see engine/__main__.py
+    ENGINE = "python3 -m engine"
+    PYTHON = "python3"
+    OPPONENT = "python3 opponents/ClosestTargetBot.py"
+    # Play the games inside the consumers, without any bot process (see engine/inprocess.py)
+    IN_PROCESS = True
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")))
+
 class Consumer(multiprocessing.Process):
 
     def __init__(self, task_queue, result_queue,global_dic):
@@ -53,9 +70,15 @@ class Task:
         :param n: the number of the game, for log display
         :return:
         """
-        cmd = """halite.exe -r -q -d "240 160" "python MyBot.py" "..\\HaliteBotV68\\run_bot.bat" """
-        # cmd = """halite.exe -r -q  -d "384 256" "python MyBot.py" "..\\HaliteBotV59\\run_bot.bat" "..\\HaliteBotV59\\run_bot.bat" "..\\HaliteBotV59\\run_bot.bat" """
-        output = subprocess.check_output(cmd).decode("ascii")
+        if IN_PROCESS:
+            from engine.inprocess import load_policy, run_game_inprocess
+            # The consumers are forked with the same random state, the seed comes from the system
+            state, _ = run_game_inprocess([load_policy("rampa"), load_policy("closest")], 240, 160,
+                                          random.SystemRandom().randrange(2 ** 32))
+            return state.ranking()[0] == 0
+        cmd = """%s -r -q -d "240 160" "%s MyBot.py" "%s" """ % (ENGINE, PYTHON, OPPONENT)
+        # cmd = """%s -r -q  -d "384 256" "%s MyBot.py" "%s" "%s" "%s" """ % (ENGINE, PYTHON, OPPONENT, OPPONENT, OPPONENT)
+        output = subprocess.check_output(cmd, shell=True).decode("ascii")
         data = json.loads(output)
         #pprint( data)
         # return if a win
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Replay a recorded game through the bot, without the Halite engine
+    - Record a game with: RAMPA_RECORD=<directory> (see hlt.networking.RecordingTransport)
+    - Replay it with: python tools/replay.py <recording> [--first N] [--last M] [--deadline]
+
+Every turn is replayed from the start (the managers need the whole history), only the turns
+between --first and --last are reported. By default the MAX_TURN_DURATION deadline is disabled
+so the replay is deterministic.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+
+# Make the repository importable when launched as a script
+dir_path = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+sys.path.append(dir_path)
+# Import & build cython at runtime
+import pyximport
+pyximport.install()
+
+import hlt
+from hlt.networking import ReplayTransport
+from bot.rampa import Rampa
+
+
+def replay(record_file, first=0, last=None, deadline=False):
+    """
+    Feed a recording to the bot
+    :param record_file: path of the recording
+    :param first: first turn to report
+    :param last: last turn to replay & report, None for the whole game
+    :param deadline: keep the MAX_TURN_DURATION deadline (not deterministic)
+    :return: list of (turn, duration, nb_commands, same_as_recorded)
+    """
+    transport = ReplayTransport(record_file)
+    game = hlt.Game("Replay", incremental=True, transport=transport)
+    bot = Rampa()
+    results = []
+    while True:
+        start_time = datetime.utcnow()
+        if not deadline:
+            # A start time in the future will never reach MAX_TURN_DURATION
+            start_time += timedelta(days=1)
+        try:
+            game_map = game.update_map()
+        except ValueError:
+            # ValueError means the recording is over
+            break
+        turn = game_map.turn
+
+        start = perf_counter()
+        command_queue = bot.play_turn(game_map, start_time)
+        duration = perf_counter() - start
+        game.send_command_queue(command_queue)
+
+        if turn >= first:
+            # The first line sent is the bot name
+            recorded = transport.recorded[len(transport.sent) - 1] if len(transport.sent) <= len(transport.recorded) else None
+            results.append((turn, duration, len(command_queue), recorded == transport.sent[-1]))
+        if last is not None and turn >= last:
+            break
+    return results
+
+
+def print_report(results):
+    """
+    Print the per turn timing and a summary
+    :param results: output of replay
+    :return:
+    """
+    print("turn  duration(ms)  commands  same_as_recorded")
+    for turn, duration, nb_commands, same in results:
+        print("%4d  %12.2f  %8d  %s" % (turn, duration * 1000.0, nb_commands, same))
+    if not results:
+        return
+    durations = sorted(duration for _, duration, _, _ in results)
+    total = sum(durations)
+    print("\nTurns: %s, total: %.2f s, mean: %.2f ms, p95: %.2f ms, max: %.2f ms" % (
+        len(durations), total, total / len(durations) * 1000.0,
+        durations[int(0.95 * (len(durations) - 1))] * 1000.0, durations[-1] * 1000.0))
+    slowest = sorted(results, key=lambda l: l[1], reverse=True)[:5]
+    print("Slowest turns: %s" % ", ".join("%s (%.2f ms)" % (turn, duration * 1000.0) for turn, duration, _, _ in slowest))
+    nb_diverged = len([same for _, _, _, same in results if not same])
+    print("Turns with commands different from the recording: %s" % nb_diverged)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a recorded game through the bot")
+    parser.add_argument("recording", help="recording created with RAMPA_RECORD")
+    parser.add_argument("--first", type=int, default=0, help="first turn to report")
+    parser.add_argument("--last", type=int, default=None, help="last turn to replay")
+    parser.add_argument("--deadline", action="store_true", help="keep the MAX_TURN_DURATION deadline")
+    args = parser.parse_args()
+
+    print_report(replay(args.recording, args.first, args.last, args.deadline))